@@ -0,0 +1,354 @@
+"""
+In-process Tool Benchmarks
+
+Calls the tool functions of svg_mcp_server directly with a stub Context, over
+the fixed prompt corpus in corpus.py, and reports per case:
+
+- latency percentiles (p50/p90/p99) and throughput
+- allocations: median peak traced memory and net allocated blocks per call
+  (allocations made in batch worker processes are not seen)
+- output size: mean bytes of the serialized result
+
+Results can be saved as JSON and compared with an earlier run, to tell whether
+a change made things faster or slower:
+
+    python benchmarks/bench_tools.py --output before.json
+    # ... change something ...
+    python benchmarks/bench_tools.py --compare before.json
+
+Compare runs made on the same machine with the same options; the corpus is
+part of the benchmark, so edit it only together with a fresh baseline.
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import inspect
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import LONG_PROMPTS, OBJECT_PROMPTS, STYLE_PROMPTS, all_prompts  # noqa: E402
+
+with contextlib.redirect_stderr(io.StringIO()): # Keeps any notes the server prints (SVG_MCP_VERBOSE banners, snapshot warnings) out of the report
+    import svg_mcp_server as server  # noqa: E402
+
+RESULTS_VERSION = 1
+BATCH_SIZE = 50
+
+
+class StubContext:
+    """Stands in for fastmcp's Context; log messages are discarded."""
+
+    async def info(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    debug = warning = error = info
+
+    async def report_progress(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+class Case(NamedTuple):
+    """
+    One benchmark case.
+
+    Attributes:
+        name: "<group>/<name>", matched by --case
+        call: Makes the i-th call; may return a value or an awaitable
+        setup: Runs untimed before every call, e.g. to clear caches
+        weight: Fraction of --iterations to run, for expensive cases
+    """
+    name: str
+    call: Callable[[int], Any]
+    setup: Optional[Callable[[], None]] = None
+    weight: float = 1.0
+
+
+def _tool(name: str) -> Callable[..., Any]:
+    tool = getattr(server, name)
+    return getattr(tool, "fn", tool) # fastmcp 2.x wraps decorated functions in a FunctionTool
+
+
+def clear_result_cache() -> None:
+    """Drops cached tool results; compiled templates and other memoized parts stay warm."""
+    server.svg_result_cache.clear()
+
+
+def clear_all_caches() -> None:
+    """Drops cached results and every functools cache in the svg_* modules."""
+    clear_result_cache()
+    for name, module in list(sys.modules.items()):
+        if name.startswith("svg_"):
+            for value in vars(module).values():
+                if callable(getattr(value, "cache_clear", None)):
+                    value.cache_clear()
+
+
+def output_bytes(result: Any) -> int:
+    """Size of a tool result as it would be serialized: a dict as JSON, a ToolResult by its text."""
+    if isinstance(result, (dict, list)):
+        return len(json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return sum(len(getattr(item, "text", "").encode("utf-8")) for item in getattr(result, "content", None) or [])
+
+
+def synthetic_logo(size: int) -> Optional[bytes]:
+    """
+    Encodes a fixed anti-aliased test logo (a ring, a bar and a triangle on white)
+    as a PNG of `size` x `size` pixels, or returns None without Pillow.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    import numpy as np
+    # Four samples per pixel, averaged, for anti-aliased edges
+    coords = (np.arange(size * 2) + 0.5) / (size * 2) * 100
+    x, y = np.meshgrid(coords, coords)
+    radius = np.hypot(x - 50, y - 50)
+    image = np.full(x.shape + (3,), 255.0)
+    image[(radius <= 40) & (radius >= 20)] = (30, 60, 200)
+    image[(abs(x - 50) <= 5) & (y >= 5) & (y <= 95)] = (230, 40, 40)
+    image[(y <= 95) & (y >= 60 + abs(x - 25) * 1.75)] = (20, 160, 60)
+    image = image.reshape(size, 2, size, 2, 3).mean(axis=(1, 3))
+    buffer = io.BytesIO()
+    Image.fromarray(image.round().astype(np.uint8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_cases() -> List[Case]:
+    """Returns every benchmark case, in reporting order."""
+    ctx = StubContext()
+    guide, examples, practices = _tool("generate_svg_guide"), _tool("svg_prompt_examples"), _tool("svg_best_practices")
+    search = _tool("search_svg_knowledge")
+    generate, batch = _tool("generate_svg_from_prompt"), _tool("generate_svgs_from_prompts")
+    chart, trace = _tool("generate_chart_svg"), _tool("trace_raster_to_svg")
+
+    prompts = [prompt for prompt in all_prompts() if prompt not in LONG_PROMPTS]
+    coverage = list(STYLE_PROMPTS.values()) + list(OBJECT_PROMPTS.values())
+    core_jobs = [(prompt, *(server._parse_prompt_dimensions(prompt.lower()) or (300, 300))) for prompt in prompts]
+
+    def pick(items: List[Any]) -> Callable[[int], Any]:
+        return lambda i: items[i % len(items)]
+
+    prompt, long_prompt, core_job = pick(prompts), pick(LONG_PROMPTS), pick(core_jobs)
+
+    # Fixed chart data: a noisy random walk of 1M points and 1M correlated pairs
+    import numpy as np
+    rng = np.random.default_rng(7)
+    walk = np.cumsum(rng.normal(size=1_000_000)).tolist()
+    pairs = np.column_stack([xs := rng.normal(size=1_000_000), xs + rng.normal(size=1_000_000)]).tolist()
+    small = [float(value) for value in rng.integers(1, 100, size=12)]
+
+    # Tracing across image sizes; 2048 pixels exercises the scaling to the working size
+    logos = {size: synthetic_logo(size) for size in (64, 512, 2048)}
+    trace_cases = [
+        Case(f"trace/{size}px", lambda i, encoded=base64.b64encode(png).decode("ascii"): trace(ctx, png_base64=encoded),
+             weight=0.25 if size > 64 else 1)
+        for size, png in logos.items() if png is not None
+    ]
+    if not trace_cases:
+        print("Pillow is not installed (see requirements.txt); skipping the trace cases", file=sys.stderr)
+    return [
+        Case("static/generate_svg_guide", lambda i: guide(ctx)),
+        Case("static/svg_prompt_examples[all]", lambda i: examples(ctx, "all")),
+        Case("static/svg_prompt_examples[icons]", lambda i: examples(ctx, "icons")),
+        Case("static/svg_best_practices", lambda i: practices(ctx)),
+        Case("static/search_svg_knowledge", lambda i: search(ctx, prompt(i))),
+        Case("core/_generate_svg", lambda i: server._generate_svg(*core_job(i))),
+        Case("generate/cached", lambda i: generate(ctx, prompt(i))),
+        Case("generate/uncached", lambda i: generate(ctx, prompt(i)), setup=clear_result_cache),
+        Case("generate/cold", lambda i: generate(ctx, prompt(i)), setup=clear_all_caches),
+        Case("generate/coverage", lambda i: generate(ctx, coverage[i % len(coverage)]), setup=clear_result_cache),
+        Case("generate/long", lambda i: generate(ctx, long_prompt(i)), setup=clear_result_cache),
+        Case("generate/optimize", lambda i: generate(ctx, prompt(i), optimize=True),
+             setup=clear_result_cache, weight=0.25),
+        Case(f"batch/{BATCH_SIZE}", lambda i: batch(ctx, [prompt(i + k) for k in range(BATCH_SIZE)]),
+             setup=clear_result_cache, weight=0.05),
+        Case("chart/bar-small", lambda i: chart(ctx, "bar", small)),
+        Case("chart/line-1m", lambda i: chart(ctx, "line", walk), weight=0.05),
+        Case("chart/scatter-1m", lambda i: chart(ctx, "scatter", pairs), weight=0.05),
+        *trace_cases,
+    ]
+
+
+async def _call(case: Case, i: int) -> Any:
+    if case.setup:
+        case.setup()
+    result = case.call(i)
+    return await result if inspect.isawaitable(result) else result
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))]
+
+
+async def run_case(case: Case, iterations: int, warmup: int, alloc_samples: int) -> Dict[str, Any]:
+    """
+    Times one case, then measures its allocations in a separate traced pass.
+
+    Returns:
+        The case statistics; latencies are in microseconds
+    """
+    count = max(1, round(iterations * case.weight))
+    for i in range(max(1, round(warmup * case.weight))):
+        await _call(case, i)
+
+    latencies: List[float] = []
+    sizes: List[int] = []
+    for i in range(count):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter_ns()
+        result = case.call(i)
+        if inspect.isawaitable(result):
+            result = await result
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+        sizes.append(output_bytes(result))
+
+    # Tracing slows every allocation down, so it gets its own, shorter pass
+    peaks: List[int] = []
+    blocks: List[int] = []
+    tracemalloc.start()
+    try:
+        for i in range(min(count, alloc_samples)):
+            if case.setup:
+                case.setup()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            blocks_before = sys.getallocatedblocks()
+            result = case.call(i)
+            if inspect.isawaitable(result):
+                result = await result
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            blocks.append(sys.getallocatedblocks() - blocks_before)
+            del result
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    peaks.sort()
+    blocks.sort()
+    return {
+        "iterations": count,
+        "p50_us": round(percentile(latencies, 50), 1),
+        "p90_us": round(percentile(latencies, 90), 1),
+        "p99_us": round(percentile(latencies, 99), 1),
+        "mean_us": round(sum(latencies) / count, 1),
+        "min_us": round(latencies[0], 1),
+        "max_us": round(latencies[-1], 1),
+        "throughput_per_s": round(count / (sum(latencies) / 1e6), 1),
+        "alloc_peak_bytes": percentile(peaks, 50) if peaks else None,
+        "alloc_net_blocks": percentile(blocks, 50) if blocks else None,
+        "output_bytes": round(sum(sizes) / count),
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args: argparse.Namespace) -> Dict[str, Any]:
+    """Describes the run, so results from different commits or machines can be told apart."""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "results_version": RESULTS_VERSION,
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "executor": server.GENERATION_EXECUTOR,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+    }
+
+
+def print_results(cases: Dict[str, Dict[str, Any]]) -> None:
+    header = f"{'case':36} {'p50 us':>10} {'p99 us':>10} {'ops/s':>10} {'peak KiB':>9} {'blocks':>7} {'out B':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in cases.items():
+        peak = stats["alloc_peak_bytes"]
+        print(f"{name:36} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} {stats['throughput_per_s']:>10.1f} "
+              f"{(peak or 0) / 1024:>9.1f} {stats['alloc_net_blocks'] or 0:>7} {stats['output_bytes']:>8}")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: Optional[float]) -> bool:
+    """
+    Prints the change of every case present in both runs.
+
+    Returns:
+        False if some case's p50 latency grew by more than `max_regression` percent
+    """
+    print(f"\nCompared with {baseline['environment'].get('commit')} "
+          f"({baseline['environment'].get('timestamp')}):")
+    print(f"{'case':36} {'p50 before':>11} {'p50 after':>10} {'change':>8} {'p99 change':>11} {'out B change':>13}")
+    passed = True
+    for name, after in current["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        change = (after["p50_us"] - before["p50_us"]) / before["p50_us"] * 100 if before["p50_us"] else 0.0
+        tail = (after["p99_us"] - before["p99_us"]) / before["p99_us"] * 100 if before["p99_us"] else 0.0
+        flag = ""
+        if max_regression is not None and change > max_regression:
+            flag, passed = "  REGRESSION", False
+        print(f"{name:36} {before['p50_us']:>11.1f} {after['p50_us']:>10.1f} {change:>+7.1f}% {tail:>+10.1f}% "
+              f"{after['output_bytes'] - before['output_bytes']:>+13}{flag}")
+    return passed
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the SVG MCP tools in-process.")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per case (default: 200)")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls per case first (default: 20)")
+    parser.add_argument("--alloc-samples", type=int, default=20,
+                        help="calls per case in the traced allocation pass (default: 20, 0 skips it)")
+    parser.add_argument("--case", action="append", default=[],
+                        help="only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="compare with results saved by an earlier --output")
+    parser.add_argument("--max-regression", type=float,
+                        help="with --compare, exit with status 1 if a p50 latency grew by more than this percent")
+    return parser.parse_args(argv)
+
+
+async def main(args: argparse.Namespace) -> int:
+    cases = [case for case in build_cases() if not args.case or any(text in case.name for text in args.case)]
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        results[case.name] = await run_case(case, args.iterations, args.warmup, args.alloc_samples)
+    report = {"environment": environment(args), "cases": results}
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(baseline, report, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(_parse_args())))
@@ -0,0 +1,325 @@
+"""
+End-to-end Transport Benchmark
+
+Measures what tool calls cost over the wire, including process startup,
+JSON-RPC framing and serialization of large payloads. It is a load generator
+built on fastmcp.Client: it spawns the server locally, opens N concurrent
+sessions and drives a weighted mix of tools through them.
+
+With the stdio transport, every session spawns its own server process, as an
+IDE would. With http, one server is spawned (optionally with several workers)
+and every session connects to it.
+
+Reported:
+
+- cold start: time to spawn and initialize a session, and to its first response
+- requests per second over the drive phase, once every session is connected
+- latency percentiles and response size per tool
+
+    python benchmarks/bench_transport.py --sessions 4 --requests 100
+    python benchmarks/bench_transport.py --transport http --workers 2 --sessions 16
+    python benchmarks/bench_transport.py --mix generate_svg_from_prompt=3,svg_best_practices=1 --output run.json
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+from corpus import all_prompts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT, "svg_mcp_server.py")
+
+DEFAULT_MIX = "generate_svg_from_prompt=4,svg_best_practices=2,svg_prompt_examples=1,generate_svg_guide=1"
+
+SAMPLE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100" viewBox="0 0 100 100">'
+    '<defs><linearGradient id="unused"><stop offset="0" stop-color="#000000"/></linearGradient></defs>'
+    '<g fill="#ff0000"><circle cx="50.000" cy="50.000" r="40.000"/>'
+    '<path d="M 10.000 10.000 L 90.000 10.000 L 90.000 90.000 Z"/></g></svg>'
+)
+
+PROMPTS = all_prompts()
+
+
+def _prompt(n: int, unique: bool) -> str:
+    prompt = PROMPTS[n % len(PROMPTS)]
+    return f"{prompt} #{n}" if unique else prompt
+
+
+# Arguments for the n-th call of each tool; `unique` defeats the server's result cache
+TOOL_ARGUMENTS: Dict[str, Callable[[int, bool], Dict[str, Any]]] = {
+    "generate_svg_guide": lambda n, unique: {},
+    "svg_prompt_examples": lambda n, unique: {"category": "all"},
+    "svg_best_practices": lambda n, unique: {},
+    "generate_svg_from_prompt": lambda n, unique: {"prompt": _prompt(n, unique)},
+    "generate_svgs_from_prompts": lambda n, unique: {"prompts": [_prompt(n * 10 + k, unique) for k in range(10)]},
+    "optimize_svg": lambda n, unique: {"svg_code": SAMPLE_SVG},
+    "render_svg_to_png": lambda n, unique: {"svg_code": SAMPLE_SVG},
+    "svg_cache_stats": lambda n, unique: {},
+}
+
+
+def _supported(function: Callable[..., Any], **options: Any) -> Dict[str, Any]:
+    """Keeps the keyword options the installed fastmcp version accepts."""
+    parameters = inspect.signature(function).parameters
+    return {name: value for name, value in options.items() if name in parameters}
+
+
+async def _discard_log(message: Any) -> None:
+    pass # Log notifications still cross the wire; they are just not printed
+
+
+# Measure real round trips: no client-side response cache where fastmcp has one
+CLIENT_OPTIONS = _supported(Client.__init__, cache=False, log_handler=_discard_log)
+
+
+def parse_mix(mix: str) -> Tuple[List[str], List[float]]:
+    """
+    Parses a "tool=weight,tool=weight" mix.
+
+    Raises:
+        ValueError: If a tool is unknown or a weight is not a positive number
+    """
+    tools, weights = [], []
+    for item in filter(None, (part.strip() for part in mix.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in TOOL_ARGUMENTS:
+            raise ValueError(f"Unknown tool {name!r}; choose from {', '.join(TOOL_ARGUMENTS)}")
+        value = float(weight or 1)
+        if value <= 0:
+            raise ValueError(f"Weight of {name!r} must be positive")
+        tools.append(name)
+        weights.append(value)
+    if not tools:
+        raise ValueError("The tool mix is empty")
+    return tools, weights
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_http_server(transport: str, port: int, workers: int, log: Any) -> Tuple[subprocess.Popen, float]:
+    """
+    Spawns the server with an HTTP transport and waits until it accepts connections.
+
+    Returns:
+        The server process and the seconds it took to start listening
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--transport", transport, "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, stdout=log, stderr=log
+    )
+    deadline = started + 60
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with status {process.returncode} before listening")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return process, time.perf_counter() - started
+        except OSError:
+            await asyncio.sleep(0.05)
+    process.kill()
+    raise RuntimeError("The server did not start listening within 60 seconds")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _response_bytes(result: Any) -> int:
+    return sum(len(getattr(item, "text", "").encode("utf-8")) for item in getattr(result, "content", None) or [])
+
+
+async def run_session(index: int, make_client: Callable[[], Client], plan: List[str], unique: bool,
+                      ready: Callable[[], None], go: asyncio.Event) -> Dict[str, Any]:
+    """
+    Connects one session, makes its first call, waits for the drive phase and runs its plan.
+
+    Returns:
+        The session's cold-start timings and one (tool, seconds, bytes, ok) sample per call
+    """
+    samples: List[Tuple[str, float, int, bool]] = []
+    started = time.perf_counter()
+    async with make_client() as client:
+        connected = time.perf_counter()
+        await client.call_tool(plan[0], TOOL_ARGUMENTS[plan[0]](index, unique))
+        first_response = time.perf_counter()
+        ready()
+        await go.wait()
+
+        for n, tool in enumerate(plan):
+            arguments = TOOL_ARGUMENTS[tool](index * len(plan) + n + 1, unique)
+            call_started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments)
+                samples.append((tool, time.perf_counter() - call_started, _response_bytes(result), True))
+            except Exception:
+                samples.append((tool, time.perf_counter() - call_started, 0, False))
+    return {"connect_s": connected - started, "first_response_s": first_response - started, "samples": samples}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {"min_ms": round(values[0] * 1000, 2), "median_ms": round(percentile(values, 50) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2)}
+
+
+async def main(args: argparse.Namespace) -> int:
+    tools, weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plans = [rng.choices(tools, weights, k=args.requests) for _ in range(args.sessions)]
+
+    log = open(args.server_log or os.devnull, "a")
+    server: Optional[subprocess.Popen] = None
+    report: Dict[str, Any] = {
+        "transport": args.transport, "sessions": args.sessions, "requests_per_session": args.requests,
+        "mix": dict(zip(tools, weights)), "unique_prompts": args.unique_prompts,
+    }
+    try:
+        if args.transport == "stdio":
+            def make_client() -> Client:
+                transport = PythonStdioTransport(
+                    SERVER_SCRIPT, cwd=ROOT, python_cmd=sys.executable,
+                    **_supported(PythonStdioTransport.__init__, log_file=log)
+                )
+                return Client(transport, **CLIENT_OPTIONS)
+        else:
+            port = args.port or _free_port()
+            server, listen_s = await start_http_server(args.transport, port, args.workers, log)
+            report["server_listen_ms"] = round(listen_s * 1000, 2)
+            url = f"http://127.0.0.1:{port}/{'sse' if args.transport == 'sse' else 'mcp'}"
+
+            def make_client() -> Client:
+                return Client(url, **CLIENT_OPTIONS)
+
+        go = asyncio.Event()
+        pending = [args.sessions]
+        drive_started = [0.0]
+
+        def ready() -> None:
+            pending[0] -= 1
+            if not pending[0]:
+                drive_started[0] = time.perf_counter()
+                go.set()
+
+        sessions = await asyncio.gather(*(
+            run_session(index, make_client, plan, args.unique_prompts, ready, go) for index, plan in enumerate(plans)
+        ))
+        drive_s = time.perf_counter() - drive_started[0]
+    finally:
+        if server is not None:
+            stop_server(server)
+        log.close()
+
+    samples = [sample for session in sessions for sample in session["samples"]]
+    completed = sum(1 for *_, ok in samples if ok)
+    report.update({
+        "cold_start": {
+            "connect": _summary_ms([session["connect_s"] for session in sessions]),
+            "first_response": _summary_ms([session["first_response_s"] for session in sessions]),
+        },
+        "drive_seconds": round(drive_s, 3),
+        "requests": len(samples),
+        "errors": len(samples) - completed,
+        "requests_per_second": round(completed / drive_s, 1) if drive_s else None,
+        "tools": {},
+    })
+    for tool in tools:
+        latencies = sorted(seconds for name, seconds, _, ok in samples if name == tool and ok)
+        sizes = [size for name, _, size, ok in samples if name == tool and ok]
+        calls = sum(1 for name, *_ in samples if name == tool)
+        stats: Dict[str, Any] = {"calls": calls, "errors": calls - len(latencies)}
+        if latencies:
+            stats.update({
+                f"p{q}_ms": round(percentile(latencies, q) * 1000, 2) for q in (50, 90, 99)
+            })
+            stats["max_ms"] = round(latencies[-1] * 1000, 2)
+            stats["mean_response_bytes"] = round(sum(sizes) / len(sizes))
+        report["tools"][tool] = stats
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 1 if report["errors"] else 0
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    cold = report["cold_start"]
+    print(f"{report['transport']}: {report['sessions']} session(s) x {report['requests_per_session']} request(s)")
+    if "server_listen_ms" in report:
+        print(f"server listening after      {report['server_listen_ms']:.1f} ms")
+    for label, key in (("session connect", "connect"), ("first response", "first_response")):
+        stats = cold[key]
+        print(f"{label:<27} {stats['median_ms']:.1f} ms median ({stats['min_ms']:.1f}-{stats['max_ms']:.1f})")
+    print(f"throughput                  {report['requests_per_second']} req/s over {report['drive_seconds']} s, "
+          f"{report['errors']} error(s)\n")
+    header = f"{'tool':28} {'calls':>6} {'errors':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'resp KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for tool, stats in report["tools"].items():
+        if "p50_ms" not in stats:
+            print(f"{tool:28} {stats['calls']:>6} {stats['errors']:>6}")
+            continue
+        print(f"{tool:28} {stats['calls']:>6} {stats['errors']:>6} {stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f} {stats['mean_response_bytes'] / 1024:>9.1f}")
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive a locally spawned SVG MCP server through fastmcp.Client.")
+    parser.add_argument("--transport", choices=("stdio", "http", "sse"), default="stdio",
+                        help="stdio spawns a server per session; http/sse spawn one shared server (default: stdio)")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent client sessions (default: 4)")
+    parser.add_argument("--requests", type=int, default=50, help="calls per session after the first (default: 50)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted tool mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--unique-prompts", action="store_true",
+                        help="make every prompt unique, so generation is never served from the result cache")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes for http (default: 1)")
+    parser.add_argument("--port", type=int, default=0, help="port for http/sse (default: a free port)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the per-session call plans (default: 0)")
+    parser.add_argument("--server-log", help="append server output to this file instead of discarding it")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.sessions < 1 or args.requests < 1:
+        parser.error("--sessions and --requests must be at least 1")
+    if args.workers > 1 and args.transport != "http":
+        parser.error("--workers > 1 requires --transport http")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(_parse_args())))
@@ -0,0 +1,70 @@
+"""
+Benchmark Prompt Corpus
+
+A fixed set of prompts shared by the benchmarks, so results stay comparable
+between commits. It covers every style in STYLE_KEYWORDS and every object in
+OBJECT_KEYWORDS, multi-object scenes, explicit dimensions, option-bearing
+prompts (teeth, points, scan), prompts needing escaping, and very long prompts.
+
+Edit it only together with a fresh baseline: results recorded against a
+different corpus are not comparable.
+"""
+
+from typing import Dict, List
+
+# One prompt per style, each expected to be classified as that style
+STYLE_PROMPTS: Dict[str, str] = {
+    "cyberpunk": "A futuristic cyberpunk city skyline with neon lights",
+    "minimalist": "A minimalist clean logo with simple geometric shapes",
+    "abstract": "An abstract fluid composition with conceptual forms",
+    "retro": "A retro 80s pixel art arrow in vintage style",
+    "nature": "A nature scene with a tree, flowers and a leaf",
+    "corporate": "A professional corporate business logo with a modern arrow",
+    "fantasy": "A magical fantasy dragon eye with a fairy glow",
+    "artdeco": "An art deco gatsby pattern with symmetry and gold",
+    "steampunk": "A steampunk victorian gear mechanism in brass and copper",
+    "flatdesign": "A flat design 2d heart icon with a long shadow",
+    "glitchart": "A glitchy datamosh star with digital noise and static",
+    "general": "A friendly picture for a birthday card",
+}
+
+# One prompt per object, each expected to detect that object
+OBJECT_PROMPTS: Dict[str, str] = {
+    "eye": "A cybernetic eye with scanning lines tracking a target",
+    "circuit": "An electronic circuit board with a chip",
+    "city": "A quiet urban skyline at dusk",
+    "face": "A portrait of a smiling face",
+    "geometric": "A hexagon and a triangle inside a circle",
+    "landscape": "A mountain landscape",
+    "animal": "A cat and a bird",
+    "abstract": "A random abstract design",
+    "gear": "A cogwheel with 16 teeth",
+    "arrow": "A cursor arrow pointer",
+    "cloud": "A fluffy cloud in the sky",
+    "heart": "A valentine heart for romance",
+    "star": "A 7 pointed star with sparkle",
+}
+
+# Scenes with several objects, explicit sizes and option-heavy prompts
+SCENE_PROMPTS: List[str] = [
+    "A city with a star and a cloud",
+    "A gear, a heart and an arrow 800x400",
+    "Eye circuit city hexagon gear arrow cloud heart star 1200x900",
+    "A neon glitch cyberpunk eye 64x64",
+    "A 500 teeth gear 2000x2000",
+    "A 200-point starburst with sparkle",
+    "A red heart with a blue background 512 by 256",
+    'A "quoted" <heart> & star > 3 points',
+]
+
+# Long prompts exercise the term matcher, color overrides and caption truncation
+LONG_PROMPTS: List[str] = [
+    " ".join(["A sprawling futuristic neon city with flying cars, holographic billboards and rain"] * 40),
+    " ".join(["an ornate art deco frame with gold symmetry, a gear, a star and a heart"] * 120),
+    "x" * 20000 + " star",
+]
+
+
+def all_prompts() -> List[str]:
+    """Returns the whole corpus in a fixed order."""
+    return list(STYLE_PROMPTS.values()) + list(OBJECT_PROMPTS.values()) + SCENE_PROMPTS + LONG_PROMPTS
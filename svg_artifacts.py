@@ -0,0 +1,224 @@
+"""
+SVG Artifact Store
+
+A content-addressed store for generated files on the local disk: SVG documents
+behind svg:// URIs, and PNGs rendered to files. Each file is saved under the
+SHA-256 of its bytes, in directories sharded by the first two byte pairs of the
+hash (ab/cd/abcd....svg) so no directory grows large. Identical documents are stored once, and since a hash names exactly one
+document, an artifact never changes once written.
+
+The store is capped in bytes. When a write takes it over the cap, the least
+recently used artifacts are deleted until it is back under the low-water mark;
+reads and repeated writes refresh an artifact's modification time, which
+serves as its recency.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+ARTIFACT_SUFFIX = ".svg"
+URI_SCHEME = "svg://"
+# Garbage collection stops once the store is back under this fraction of its cap
+GC_LOW_WATER = 0.9
+
+_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+def artifact_uri(digest: str) -> str:
+    """The resource URI of an artifact, svg://<sha256>."""
+    return f"{URI_SCHEME}{digest}"
+
+
+class ArtifactStore:
+    """
+    Stores documents by content hash, with a size cap and LRU garbage collection.
+
+    Writes are atomic (a temporary file renamed into place), so concurrent
+    readers, including other server processes sharing the directory, never see
+    a partial artifact. Bookkeeping is guarded by a lock so the store can be
+    used from worker threads.
+
+    Args:
+        root: Directory holding the artifacts; created on first write
+        max_bytes: Total size above which the least recently used artifacts are deleted
+        suffix: File name extension of the artifacts
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024, suffix: str = ARTIFACT_SUFFIX):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._bytes: Optional[int] = None # Counted from the disk on first use
+        self._lock = threading.Lock()
+        self._counters = {"writes": 0, "deduplicated": 0, "reads": 0, "misses": 0, "collected": 0}
+
+    @classmethod
+    def from_env(cls, prefix: str = "SVG_MCP_ARTIFACT", default_dir: str = "svg-mcp-artifacts",
+                 max_bytes: int = 256 * 1024 * 1024, suffix: str = ARTIFACT_SUFFIX) -> "ArtifactStore":
+        """
+        Creates a store configured from environment variables.
+
+        With the default prefix, SVG_MCP_ARTIFACT_DIR sets the directory
+        (default: a `svg-mcp-artifacts` folder in the system temp directory)
+        and SVG_MCP_ARTIFACT_MAX_BYTES the size cap.
+
+        Args:
+            prefix: Prefix of the environment variable names
+            default_dir: Folder in the system temp directory used when <prefix>_DIR is unset
+            max_bytes: Size cap when <prefix>_MAX_BYTES is unset
+            suffix: File name extension of the artifacts
+        """
+        return cls(
+            os.environ.get(f"{prefix}_DIR") or os.path.join(tempfile.gettempdir(), default_dir),
+            int(os.environ.get(f"{prefix}_MAX_BYTES", max_bytes)),
+            suffix
+        )
+
+    def path(self, digest: str) -> str:
+        """The file path of an artifact."""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{self.suffix}")
+
+    def put(self, data: bytes) -> str:
+        """
+        Stores a document, unless an identical one is already stored.
+
+        Args:
+            data: The document bytes
+
+        Returns:
+            The SHA-256 hex digest that addresses the document
+
+        Raises:
+            OSError: If the artifact cannot be written
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            os.utime(path) # Already stored: refresh its recency
+            with self._lock:
+                self._counters["deduplicated"] += 1
+            return digest
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._counters["writes"] += 1
+            self._bytes = (self._count_bytes() if self._bytes is None else self._bytes + len(data))
+            over = self._bytes > self.max_bytes
+        if over:
+            self.collect(keep=digest)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        Reads a document by its hash.
+
+        The content is checked against the hash, so a damaged file is dropped
+        rather than served.
+
+        Args:
+            digest: A SHA-256 hex digest, as returned by `put`
+
+        Returns:
+            The document bytes, or None if no such artifact is stored
+        """
+        if not _HASH.fullmatch(digest):
+            return None
+        path = self.path(digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            data = None
+        if data is not None and hashlib.sha256(data).hexdigest() != digest:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            data = None
+        with self._lock:
+            self._counters["reads" if data is not None else "misses"] += 1
+        return data
+
+    def collect(self, keep: Optional[str] = None) -> int:
+        """
+        Deletes the least recently used artifacts until the store is under its low-water mark.
+
+        The directory is rescanned, so artifacts written or deleted by other
+        processes sharing it are accounted for.
+
+        Args:
+            keep: Digest of an artifact never to delete, such as the one just written
+
+        Returns:
+            The number of artifacts deleted
+        """
+        with self._lock:
+            artifacts = self._scan()
+            total = sum(size for _, size, _ in artifacts)
+            target = self.max_bytes * GC_LOW_WATER
+            deleted = 0
+            for path, size, _ in sorted(artifacts, key=lambda artifact: artifact[2]):
+                if total <= target:
+                    break
+                if keep and os.path.basename(path) == f"{keep}{self.suffix}":
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                deleted += 1
+            self._bytes = total
+            self._counters["collected"] += deleted
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the write/read counters and the stored size."""
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._count_bytes()
+            return {**self._counters, "bytes": self._bytes, "max_bytes": self.max_bytes, "dir": self.root}
+
+    # Internal helpers; callers must hold the lock
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """(path, size, modification time) of every artifact on disk."""
+        artifacts = []
+        stack = [self.root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(self.suffix):
+                        stat = entry.stat(follow_symlinks=False)
+                        artifacts.append((entry.path, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+        return artifacts
+
+    def _count_bytes(self) -> int:
+        return sum(size for _, size, _ in self._scan())
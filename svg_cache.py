@@ -0,0 +1,207 @@
+"""
+SVG Result Cache
+
+A bounded, content-addressed cache for generated SVG results. Entries are keyed
+by a hash of the normalized generation request, evicted in LRU order once the
+entry or byte budget is exceeded, and optionally expire after a TTL. An optional
+on-disk tier keeps results across server restarts.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Bump whenever the generator output changes, so stale disk entries are not served
+CACHE_FORMAT_VERSION = "9"
+
+
+def make_cache_key(**request: Any) -> str:
+    """
+    Builds a content address for a generation request.
+
+    The request fields are serialized as canonical JSON (sorted keys, no
+    insignificant whitespace) together with the cache format version, so two
+    requests producing the same output always hash to the same key.
+
+    Args:
+        **request: The fields that determine the generated output
+
+    Returns:
+        A hex-encoded SHA-256 digest
+    """
+    canonical = json.dumps(
+        {"version": CACHE_FORMAT_VERSION, "request": request},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SVGResultCache:
+    """
+    An in-process LRU cache with entry/byte limits, optional TTL and disk tier.
+
+    All operations are guarded by a lock so the cache can be shared between the
+    event loop and worker threads.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = None, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, prefix: str = "SVG_MCP_CACHE", max_entries: int = 256,
+                 max_bytes: int = 16 * 1024 * 1024) -> "SVGResultCache":
+        """
+        Creates a cache configured from environment variables.
+
+        With the default prefix, SVG_MCP_CACHE_MAX_ENTRIES, SVG_MCP_CACHE_MAX_BYTES
+        and SVG_MCP_CACHE_TTL (seconds, 0 disables expiry) set the limits;
+        SVG_MCP_CACHE_DIR enables the on-disk tier.
+
+        Args:
+            prefix: Prefix of the environment variable names
+            max_entries: Entry limit when <prefix>_MAX_ENTRIES is unset
+            max_bytes: Byte limit when <prefix>_MAX_BYTES is unset
+        """
+        return cls(
+            max_entries=int(os.environ.get(f"{prefix}_MAX_ENTRIES", max_entries)),
+            max_bytes=int(os.environ.get(f"{prefix}_MAX_BYTES", max_bytes)),
+            ttl_seconds=float(os.environ.get(f"{prefix}_TTL", 0)),
+            disk_dir=os.environ.get(f"{prefix}_DIR") or None
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a result, falling back to the disk tier on a memory miss.
+
+        Args:
+            key: A key produced by make_cache_key
+
+        Returns:
+            A copy of the cached result, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, stored_at = entry
+                if self.ttl_seconds is not None and now - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self._bytes -= size
+                    self._counters["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return dict(value)
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+            self._store(key, value, self._entry_size(value), now)
+        return dict(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Stores a result in memory (and on disk when the disk tier is enabled).
+
+        Results larger than the whole byte budget are not cached.
+
+        Args:
+            key: A key produced by make_cache_key
+            value: The JSON-serializable result to store
+        """
+        payload = json.dumps(value, separators=(",", ":"))
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._store(key, dict(value), size, time.monotonic())
+        self._write_disk(key, payload)
+
+    def clear(self) -> None:
+        """Drops every in-memory entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the current hit/miss counters and occupancy.
+        """
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_dir": self.disk_dir
+            }
+
+    # Internal helpers; callers of _store must hold the lock
+
+    @staticmethod
+    def _entry_size(value: Dict[str, Any]) -> int:
+        return len(json.dumps(value, separators=(",", ":")))
+
+    def _store(self, key: str, value: Dict[str, Any], size: int, stored_at: float) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = (value, size, stored_at)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if self.ttl_seconds is not None and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, payload: str) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a partial file
+        except OSError:
+            pass  # The disk tier is best-effort; the memory tier still holds the result
@@ -0,0 +1,565 @@
+"""
+SVG Charts
+
+Renders numeric data as bar, line, area, scatter and donut charts. Each series
+is scaled to pixel coordinates with one NumPy expression and its path data is
+formatted in batch (see `svg_geometry.format_rows`), so no per-point Python
+code runs.
+
+Series larger than the plot can show are reduced before drawing, so the
+output size follows the canvas rather than the data:
+
+- lines and areas keep the points that best preserve the shape of the curve
+  (Largest-Triangle-Three-Buckets), at most one per horizontal pixel;
+- scatter plots with more than `max_points` points become a hexagonal density
+  map (hexbin), each cell shaded by the number of points in it;
+- bars are averaged over equal-width bins, at most one bar per few pixels;
+- donuts keep their largest slices and merge the rest into "Other".
+"""
+
+import csv
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from svg_geometry import format_rows
+from svg_layout import Box
+from svg_scene import Circle, Group, Node, Path, Rect, Svg, Text, format_number, to_svg_string
+
+CHART_TYPES = ("bar", "line", "area", "scatter", "donut")
+
+# Space around the plot area for the title, tick labels and legend
+MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM, MARGIN_LEFT = 40, 20, 36, 56
+# On small canvases the margins shrink so the plot keeps at least this share of each dimension
+MIN_PLOT_SHARE = 0.6
+# Narrowest bar, gap included, before bars are binned
+MIN_BAR_PITCH = 4
+# Bars get a category label each up to this many
+MAX_BAR_LABELS = 24
+# Scatter plots with more points become a density map
+SCATTER_MAX_POINTS = 2000
+SCATTER_DOT_SIZE = 5
+# Circumradius of a density map cell, in pixels
+HEX_RADIUS = 6
+HEX_LEVELS = 5
+MAX_DONUT_SLICES = 10
+TICK_COUNT = 5
+# Largest magnitude of a value and smallest tick step: beyond these, spans,
+# sums and pixel scale factors can overflow a float
+MAX_ABS_VALUE = 1e150
+MIN_TICK_STEP = 1e-150
+
+_FONT = "sans-serif"
+_LABEL_SIZE = "11px"
+# Generous average advance of a label character, for fitting the donut legend
+_LABEL_CHAR_WIDTH = 6.5
+_LEGEND_ROW = 18
+_LEGEND_GAP = 24
+
+
+class ChartData(NamedTuple):
+    """
+    A parsed series.
+
+    Attributes:
+        x: X values, or None when the data only gave Y values
+        y: Y values
+        labels: One category label per value, or None
+    """
+    x: Optional[np.ndarray]
+    y: np.ndarray
+    labels: Optional[List[str]]
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_csv(text: str) -> ChartData:
+    """
+    Parses CSV text: an optional header row, an optional leading column of
+    labels, then one column of Y values or X and Y columns. Fields may be
+    separated by commas, semicolons or tabs.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("The CSV text has no rows")
+    first_line, _, rest = text.partition("\n")
+    delimiter = next((char for char in ",;\t" if char in first_line), ",")
+    first = [field.strip() for field in first_line.split(delimiter)]
+    if not all(_is_number(field) for field in first[1:]) or (len(first) == 1 and not _is_number(first[0])):
+        text = rest.strip() # Skip a header row
+        if not text:
+            raise ValueError("The CSV text has no data rows")
+        first_line = text.partition("\n")[0]
+
+    if not _is_number(first_line.split(delimiter, 1)[0].strip()):
+        # Labeled rows go through the csv module, which handles quoted labels
+        rows = [row for row in csv.reader(text.splitlines(), delimiter=delimiter) if row]
+        try:
+            values = np.array([float(row[1]) for row in rows], dtype=np.float64)
+        except (IndexError, ValueError):
+            raise ValueError("Every labeled CSV row needs a numeric value after its label") from None
+        return ChartData(None, values, [row[0].strip() for row in rows])
+
+    # Numeric rows are split and converted in bulk, without a per-row Python step
+    columns = len(first_line.split(delimiter))
+    try:
+        values = np.array(text.replace(delimiter, " ").split(), dtype=np.float64)
+    except ValueError:
+        raise ValueError("The CSV text has non-numeric values") from None
+    rows = text.count("\n") + 1
+    if values.size != columns * rows:
+        rows = sum(1 for line in text.splitlines() if line.strip()) # Blank lines are allowed
+        if values.size != columns * rows:
+            raise ValueError(f"Every CSV row needs {columns} value(s)")
+    values = values.reshape(rows, columns)
+    if columns == 1:
+        return ChartData(None, values[:, 0], None)
+    return ChartData(values[:, 0], values[:, 1], None)
+
+
+def parse_chart_data(data: Union[Sequence[float], Sequence[Sequence[float]], str],
+                     labels: Optional[Sequence[str]] = None) -> ChartData:
+    """
+    Turns chart input into arrays, dropping points with non-finite values.
+
+    Args:
+        data: Y values, [x, y] pairs, or CSV text (see `_parse_csv`)
+        labels: Category labels, one per value; they override labels from CSV
+
+    Returns:
+        The parsed series
+
+    Raises:
+        ValueError: If the data is empty or malformed, a value is beyond
+                    MAX_ABS_VALUE, or the labels do not match it
+    """
+    if isinstance(data, str):
+        parsed = _parse_csv(data)
+    else:
+        if len(data) == 0:
+            raise ValueError("No data to chart")
+        try:
+            values = np.asarray(data, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Data must be a list of numbers, a list of [x, y] pairs or CSV text") from None
+        if values.ndim == 1:
+            parsed = ChartData(None, values, None)
+        elif values.ndim == 2 and values.shape[1] >= 2:
+            parsed = ChartData(values[:, 0], values[:, 1], None)
+        else:
+            raise ValueError("Data must be a list of numbers, a list of [x, y] pairs or CSV text")
+
+    if labels is not None:
+        if len(labels) != len(parsed.y):
+            raise ValueError(f"Got {len(labels)} labels for {len(parsed.y)} values")
+        parsed = parsed._replace(labels=[str(label) for label in labels])
+
+    finite = np.isfinite(parsed.y)
+    if parsed.x is not None:
+        finite &= np.isfinite(parsed.x)
+    if not finite.all():
+        parsed = ChartData(
+            parsed.x[finite] if parsed.x is not None else None,
+            parsed.y[finite],
+            [label for label, keep in zip(parsed.labels, finite.tolist()) if keep] if parsed.labels else None
+        )
+    if not len(parsed.y):
+        raise ValueError("No finite values to chart")
+    if np.abs(parsed.y).max() > MAX_ABS_VALUE or (parsed.x is not None and np.abs(parsed.x).max() > MAX_ABS_VALUE):
+        raise ValueError(f"Values must lie within ±{MAX_ABS_VALUE:g}")
+    return parsed
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Picks the points of a series that best preserve its visual shape, with
+    Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+    The first and last points are kept; the rest are split into
+    `threshold - 2` buckets of equal count, and from each bucket the point
+    forming the largest triangle with the point kept from the previous bucket
+    and the mean of the next bucket is kept. Peaks and dips survive, unlike
+    with averaging or striding. The bucket means are computed from cumulative
+    sums up front; the loop does one vectorized area computation per bucket.
+
+    Args:
+        x: X values, ascending
+        y: Y values
+        threshold: Number of points to keep (at least 3)
+
+    Returns:
+        The indices of the kept points, ascending
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Mean of each bucket, and of the last point, which serves as the last "next bucket"
+    bounds = np.append(edges, n)
+    sums_x = np.concatenate(([0.0], np.cumsum(x)))
+    sums_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.diff(bounds)
+    mean_x = (sums_x[bounds[1:]] - sums_x[bounds[:-1]]) / counts
+    mean_y = (sums_y[bounds[1:]] - sums_y[bounds[:-1]]) / counts
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs((ax - mean_x[bucket + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (mean_y[bucket + 1] - ay))
+        previous = start + int(areas.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def bin_means(values: np.ndarray, bins: int) -> np.ndarray:
+    """Averages `values` over `bins` consecutive runs of (nearly) equal length."""
+    edges = np.linspace(0, len(values), bins + 1).astype(np.int64)
+    return np.add.reduceat(values, edges[:-1]) / np.diff(edges)
+
+
+def hexbin(px: np.ndarray, py: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts points per cell of a pointy-top hexagonal grid with its first center at the origin.
+
+    The grid is the union of two rectangular lattices (even and odd rows), so
+    the nearest center is the nearer of the nearest center in each, found by
+    rounding.
+
+    Args:
+        px: X coordinates; negative values are clamped to 0
+        py: Y coordinates; negative values are clamped to 0
+        radius: Circumradius of a cell
+
+    Returns:
+        X and Y of the centers of the non-empty cells, and their point counts
+    """
+    px, py = np.maximum(px, 0.0), np.maximum(py, 0.0)
+    dx, dy = math.sqrt(3) * radius, 1.5 * radius
+    columns = int(px.max() / dx) + 2
+    col_even, row_even = np.rint(px / dx), np.rint(py / (2 * dy)) * 2
+    col_odd, row_odd = np.rint(px / dx - 0.5), np.rint((py - dy) / (2 * dy)) * 2 + 1
+    dist_even = (px - col_even * dx) ** 2 + (py - row_even * dy) ** 2
+    dist_odd = (px - (col_odd + 0.5) * dx) ** 2 + (py - row_odd * dy) ** 2
+    odd = dist_odd < dist_even
+    cells = (np.where(odd, row_odd, row_even) * columns + np.where(odd, col_odd, col_even)).astype(np.int64)
+    counts = np.bincount(cells)
+    occupied = np.flatnonzero(counts)
+    rows, cols = np.divmod(occupied, columns)
+    return (cols + 0.5 * (rows % 2)) * dx, rows * dy, counts[occupied]
+
+
+def nice_ticks(low: float, high: float, count: int = TICK_COUNT, min_step: float = 0.0) -> np.ndarray:
+    """
+    Returns about `count` evenly spaced round tick values (steps of 1, 2, 2.5 or
+    5 times a power of ten, and at least `min_step`) covering [low, high].
+
+    Raises:
+        ValueError: If the span is not finite or the step would be below MIN_TICK_STEP
+    """
+    if high <= low:
+        spread = abs(low) * 0.5 or 1.0
+        low, high = low - spread, high + spread
+    raw_step = max((high - low) / count, min_step)
+    if not (math.isfinite(raw_step) and raw_step >= MIN_TICK_STEP):
+        raise ValueError(f"The data range is too large or too small to chart (ticks must be at least {MIN_TICK_STEP:g} apart)")
+    magnitude = 10.0 ** math.floor(math.log10(raw_step)) # A float: an int power of ten overflows NumPy past 1e18
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    first, last = math.floor(low / step), math.ceil(high / step)
+    return np.arange(first, last + 1) * step
+
+
+def _format_tick(value: float, step: float) -> str:
+    for divisor, suffix in ((1e9, "G"), (1e6, "M"), (1e3, "k")):
+        if step >= divisor:
+            return f"{value / divisor:g}{suffix}"
+    return f"{round(value / step) * step:.6g}"
+
+
+def _scale(values: np.ndarray, domain: Tuple[float, float], start: float, end: float) -> np.ndarray:
+    """Maps values linearly from `domain` onto the pixel range [start, end], which may run backwards."""
+    low, high = domain
+    return start + (values - low) * ((end - start) / (high - low))
+
+
+def _label(text: str, x: float, y: float, palette: Dict[str, str], anchor: str = "middle") -> Text:
+    return Text(text, x=float(x), y=float(y), text_anchor=anchor, font_family=_FONT, font_size=_LABEL_SIZE,
+                fill=palette["text"])
+
+
+def _axes(plot: Box, x_ticks: Optional[np.ndarray], y_ticks: np.ndarray, palette: Dict[str, str]) -> Group:
+    """Draws horizontal grid lines with Y tick labels, the axis lines and, if given, X tick labels."""
+    bottom, right = plot.y + plot.height, plot.x + plot.width
+    y_pixels = _scale(y_ticks, (y_ticks[0], y_ticks[-1]), bottom, plot.y)
+    y_step = float(y_ticks[1] - y_ticks[0])
+    grid = "".join(f"M{format_number(plot.x)} {format_number(float(y))}H{format_number(right)}" for y in y_pixels)
+    axes = Group(
+        Path(grid, stroke=palette["text"], stroke_width=1, opacity=0.15),
+        Path(f"M{format_number(plot.x)} {format_number(plot.y)}V{format_number(bottom)}H{format_number(right)}",
+             fill="none", stroke=palette["text"], stroke_width=1, opacity=0.6),
+        *(_label(_format_tick(float(value), y_step), plot.x - 6, float(y) + 4, palette, "end")
+          for value, y in zip(y_ticks, y_pixels))
+    )
+    if x_ticks is not None:
+        x_step = float(x_ticks[1] - x_ticks[0])
+        x_pixels = _scale(x_ticks, (x_ticks[0], x_ticks[-1]), plot.x, right)
+        axes.append(*(_label(_format_tick(float(value), x_step), float(x), bottom + 16, palette)
+                      for value, x in zip(x_ticks, x_pixels)))
+    return axes
+
+
+def _xy_domains(data: ChartData, x: np.ndarray, y: np.ndarray, include_zero: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """The X and Y ticks, which also bound the plot; X steps are whole numbers when X is the index."""
+    low, high = float(y.min()), float(y.max())
+    if include_zero:
+        low, high = min(low, 0.0), max(high, 0.0)
+    x_ticks = nice_ticks(float(x.min()), float(x.max()), min_step=1.0 if data.x is None else 0.0)
+    return x_ticks, nice_ticks(low, high)
+
+
+def _sorted_series(data: ChartData) -> Tuple[np.ndarray, np.ndarray]:
+    """The X (the index if none was given) and Y values, ordered by X."""
+    if data.x is None:
+        return np.arange(len(data.y), dtype=np.float64), data.y
+    if len(data.x) > 1 and (np.diff(data.x) < 0).any():
+        order = np.argsort(data.x, kind="stable")
+        return data.x[order], data.y[order]
+    return data.x, data.y
+
+
+_Drawing = Tuple[List[Node], int, str] # (nodes, points drawn, downsampling method)
+
+
+def _draw_line(data: ChartData, plot: Box, palette: Dict[str, str], max_points: Optional[int],
+               area: bool = False) -> _Drawing:
+    x, y = _sorted_series(data)
+    threshold = max_points or max(int(plot.width), 3)
+    method = "none"
+    if len(x) > threshold:
+        kept = lttb(x, y, threshold)
+        x, y, method = x[kept], y[kept], "lttb"
+    x_ticks, y_ticks = _xy_domains(data, x, y, include_zero=area)
+    px = _scale(x, (x_ticks[0], x_ticks[-1]), plot.x, plot.x + plot.width)
+    py = _scale(y, (y_ticks[0], y_ticks[-1]), plot.y + plot.height, plot.y)
+    line = format_rows(np.column_stack((px, py)), "L,", "M")
+    nodes: List[Node] = [_axes(plot, x_ticks, y_ticks, palette)]
+    if area:
+        base = format_number(float(_scale(np.array(0.0), (y_ticks[0], y_ticks[-1]), plot.y + plot.height, plot.y)))
+        nodes.append(Path(f"{line}V{base}H{format_number(float(px[0]))}Z", fill=palette["primary"], opacity=0.35))
+    nodes.append(Path(line, fill="none", stroke=palette["primary"], stroke_width=2, stroke_linejoin="round"))
+    return nodes, len(x), method
+
+
+def _draw_area(data: ChartData, plot: Box, palette: Dict[str, str], max_points: Optional[int]) -> _Drawing:
+    return _draw_line(data, plot, palette, max_points, area=True)
+
+
+def _draw_scatter(data: ChartData, plot: Box, palette: Dict[str, str], max_points: Optional[int]) -> _Drawing:
+    x, y = (data.x, data.y) if data.x is not None else (np.arange(len(data.y), dtype=np.float64), data.y)
+    x_ticks, y_ticks = _xy_domains(data, x, y, include_zero=False)
+    px = _scale(x, (x_ticks[0], x_ticks[-1]), plot.x, plot.x + plot.width)
+    py = _scale(y, (y_ticks[0], y_ticks[-1]), plot.y + plot.height, plot.y)
+    nodes: List[Node] = [_axes(plot, x_ticks, y_ticks, palette)]
+    if len(x) <= (max_points or SCATTER_MAX_POINTS):
+        # One zero-length subpath per point, drawn as a dot by the round line cap
+        dots = format_rows(np.column_stack((px, py, np.zeros_like(px))), "M h")
+        nodes.append(Path(dots, fill="none", stroke=palette["primary"], stroke_width=SCATTER_DOT_SIZE,
+                          stroke_linecap="round", opacity=0.8))
+        return nodes, len(x), "none"
+
+    cx, cy, counts = hexbin(px - plot.x, py - plot.y, HEX_RADIUS)
+    half_width, radius = math.sqrt(3) * HEX_RADIUS / 2, HEX_RADIUS
+    # The outline of a cell, relative to its top corner
+    outline = (f"l{format_number(half_width)} {format_number(radius / 2)}v{format_number(radius)}"
+               f"l-{format_number(half_width)} {format_number(radius / 2)}"
+               f"l-{format_number(half_width)}-{format_number(radius / 2)}v-{format_number(radius)}z")
+    # Cells are shaded in HEX_LEVELS steps of opacity by the logarithm of their count
+    levels = np.ceil(np.log1p(counts) / math.log1p(counts.max()) * HEX_LEVELS).astype(np.int64)
+    for level in range(1, HEX_LEVELS + 1):
+        selected = levels == level
+        if selected.any():
+            tops = zip((cx[selected] + plot.x).tolist(), (cy[selected] + plot.y - radius).tolist())
+            cells = "".join(f"M{format_number(x)} {format_number(y)}{outline}" for x, y in tops)
+            nodes.append(Path(cells, fill=palette["primary"], opacity=round(level / HEX_LEVELS, 2)))
+    return nodes, len(cx), "hexbin"
+
+
+def _draw_bar(data: ChartData, plot: Box, palette: Dict[str, str], max_points: Optional[int]) -> _Drawing:
+    y, labels, method = data.y, data.labels, "none"
+    if labels is None and data.x is not None:
+        labels = [format_number(value) for value in data.x.tolist()]
+    max_bars = max_points or max(int(plot.width // MIN_BAR_PITCH), 1)
+    if len(y) > max_bars:
+        y, labels, method = bin_means(y, max_bars), None, "bins"
+    y_ticks = nice_ticks(min(float(y.min()), 0.0), max(float(y.max()), 0.0))
+    pitch = plot.width / len(y)
+    left = plot.x + pitch * (np.arange(len(y)) + 0.1)
+    tops = _scale(y, (y_ticks[0], y_ticks[-1]), plot.y + plot.height, plot.y)
+    base = float(_scale(np.array(0.0), (y_ticks[0], y_ticks[-1]), plot.y + plot.height, plot.y))
+    # "M<left>,<base>V<top>h<width>V<base>" per bar; a fill closes each subpath
+    rows = np.column_stack((left, np.full_like(left, base), tops, np.full_like(left, pitch * 0.8), np.full_like(left, base)))
+    nodes: List[Node] = [
+        _axes(plot, None, y_ticks, palette),
+        Path(format_rows(rows, "M,VhV"), fill=palette["primary"])
+    ]
+    if labels is not None and len(labels) <= MAX_BAR_LABELS:
+        nodes.extend(_label(label, x + pitch * 0.4, plot.y + plot.height + 16, palette)
+                     for label, x in zip(labels, left.tolist()))
+    return nodes, len(y), method
+
+
+def _mix(color: str, other: str, weight: float) -> str:
+    """Blends two #rrggbb colors; `weight` is the share of `other`."""
+    channels = (
+        round(int(color[i:i + 2], 16) * (1 - weight) + int(other[i:i + 2], 16) * weight) for i in (1, 3, 5)
+    )
+    return "#" + "".join(f"{channel:02x}" for channel in channels)
+
+
+def slice_colors(palette: Dict[str, str], count: int) -> List[str]:
+    """Returns `count` colors running from the palette's primary through secondary to accent."""
+    stops = [palette["primary"], palette["secondary"], palette["accent"]]
+    if count <= len(stops):
+        return stops[:count]
+    colors = []
+    for i in range(count):
+        position = i * (len(stops) - 1) / (count - 1)
+        index = min(int(position), len(stops) - 2)
+        colors.append(_mix(stops[index], stops[index + 1], position - index))
+    return colors
+
+
+def _draw_donut(data: ChartData, plot: Box, palette: Dict[str, str], max_points: Optional[int]) -> _Drawing:
+    values = data.y
+    if (values < 0).any():
+        raise ValueError("Donut charts need non-negative values")
+    total = float(values.sum())
+    if total <= 0:
+        raise ValueError("Donut charts need at least one positive value")
+    labels = data.labels or ([format_number(value) for value in data.x.tolist()] if data.x is not None
+                             else [str(i + 1) for i in range(len(values))])
+    method, limit = "none", max_points or MAX_DONUT_SLICES
+    if len(values) > limit:
+        # The largest slices, in their original order, then everything else as one slice
+        keep = np.sort(np.argsort(-values, kind="stable")[:limit - 1])
+        other = total - float(values[keep].sum())
+        labels = [labels[i] for i in keep.tolist()] + ["Other"]
+        values, method = np.append(values[keep], other), "top-k"
+
+    entries = [f"{label} ({value / total:.1%})" for label, value in zip(labels, values.tolist())]
+    legend_width = 16 + max(len(entry) for entry in entries) * _LABEL_CHAR_WIDTH
+    radius = min(plot.height, plot.width * 0.6) / 2
+    # The legend goes right of the ring when it fits in the plot; otherwise the ring is drawn alone, centered
+    show_legend = (2 * radius + _LEGEND_GAP + legend_width <= plot.width
+                   and len(values) * _LEGEND_ROW <= plot.height)
+    if show_legend:
+        cx = plot.x + radius
+    else:
+        radius = min(plot.height, plot.width) / 2
+        cx = plot.x + plot.width / 2
+    cy = plot.y + plot.height / 2
+    ring = radius * 0.4
+    middle = radius - ring / 2
+    circumference = 2 * math.pi * middle
+    lengths = values / total * circumference
+    starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+    colors = slice_colors(palette, len(values))
+    # Each slice is a dash of the ring's stroke, starting at the top and running clockwise
+    ring_group = Group(transform=f"rotate(-90 {format_number(cx)} {format_number(cy)})")
+    for length, start, color in zip(lengths.tolist(), starts.tolist(), colors):
+        if length > 0:
+            ring_group.append(Circle(
+                cx=cx, cy=cy, r=middle, fill="none", stroke=color, stroke_width=ring,
+                stroke_dasharray=f"{format_number(length)} {format_number(circumference)}",
+                stroke_dashoffset=format_number(-start)
+            ))
+    if not show_legend:
+        return [ring_group], len(values), method
+    legend_x = cx + radius + _LEGEND_GAP
+    legend_y = cy - (len(values) - 1) * _LEGEND_ROW / 2
+    legend = Group()
+    for i, (entry, color) in enumerate(zip(entries, colors)):
+        y = legend_y + i * _LEGEND_ROW
+        legend.append(Rect(x=legend_x, y=y - 9, width=10, height=10, fill=color),
+                      _label(entry, legend_x + 16, y, palette, "start"))
+    return [ring_group, legend], len(values), method
+
+
+def plot_area(width: float, height: float) -> Box:
+    """
+    The box a chart is plotted in, inside the margins.
+
+    Margins are scaled down on canvases too small for them, so the plot keeps
+    at least MIN_PLOT_SHARE of the width and height.
+    """
+    scale_x = min(1.0, (1 - MIN_PLOT_SHARE) * width / (MARGIN_LEFT + MARGIN_RIGHT))
+    scale_y = min(1.0, (1 - MIN_PLOT_SHARE) * height / (MARGIN_TOP + MARGIN_BOTTOM))
+    return Box(MARGIN_LEFT * scale_x, MARGIN_TOP * scale_y,
+               width - (MARGIN_LEFT + MARGIN_RIGHT) * scale_x, height - (MARGIN_TOP + MARGIN_BOTTOM) * scale_y)
+
+
+_DRAWERS: Dict[str, Callable[[ChartData, Box, Dict[str, str], Optional[int]], _Drawing]] = {
+    "bar": _draw_bar,
+    "line": _draw_line,
+    "area": _draw_area,
+    "scatter": _draw_scatter,
+    "donut": _draw_donut,
+}
+
+
+def render_chart(chart_type: str, data: Union[Sequence[float], Sequence[Sequence[float]], str],
+                 palette: Dict[str, str], width: int = 600, height: int = 400, title: str = "",
+                 labels: Optional[Sequence[str]] = None, max_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Renders a chart as an SVG document.
+
+    Args:
+        chart_type: One of CHART_TYPES
+        data: Y values, [x, y] pairs, or CSV text (see `parse_chart_data`)
+        palette: Colors by role, as in the server's COLOR_PALETTES
+        width: Width of the document
+        height: Height of the document
+        title: Text above the plot, if any
+        labels: Category labels, one per value (bar and donut charts)
+        max_points: Points (bars, slices) to draw at most before the series is
+                    reduced; by default this follows the plot size
+
+    Returns:
+        A dictionary with the SVG code, the number of input points, the number
+        of points (or cells, bars, slices) drawn and the downsampling method:
+        "none", "lttb", "hexbin", "bins" or "top-k"
+
+    Raises:
+        ValueError: If the chart type or data is invalid
+    """
+    if chart_type not in _DRAWERS:
+        raise ValueError(f"Unknown chart type: {chart_type}. Use one of: {', '.join(CHART_TYPES)}")
+    parsed = parse_chart_data(data, labels)
+    plot = plot_area(width, height)
+    nodes, drawn, method = _DRAWERS[chart_type](parsed, plot, palette, max_points)
+    document = Svg(
+        width, height,
+        Text(title or f"{chart_type.capitalize()} chart", tag="title"),
+        Rect(width=width, height=height, fill=palette["background"]),
+        Text(title, x=width / 2, y=plot.y / 2 + 6, text_anchor="middle", font_family=_FONT,
+             font_size="16px", font_weight="bold", fill=palette["text"]) if title else None,
+        *nodes
+    )
+    return {
+        "svg_code": to_svg_string(document),
+        "chart_type": chart_type,
+        "points": len(parsed.y),
+        "drawn_points": drawn,
+        "downsampling": method
+    }
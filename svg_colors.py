@@ -0,0 +1,296 @@
+"""
+SVG Colors
+
+Finds the colors a prompt asks for and the palette roles they are meant for.
+The prompt is split into words once; a color is a CSS named color (written as
+one word or split, as in "light sea green"), a `#hex` literal or an
+`rgb()`/`hsl()` function, and role keywords ("background", "primary",
+"secondary", "accent") are recorded by word offset. Each color is bound to the
+nearest role keyword within a few words, whichever side it is on, so "a blue
+background" and "background in blue" mean the same.
+
+Opaque colors are normalized to a `#rrggbb` hex string, which every SVG
+renderer understands. Translucent ones become `rgba(r,g,b,a)`: SVG 1.1
+renderers and several rasterizers reject 8-digit `#rrggbbaa` hex, while rgba()
+is widely supported and keeps the opacity within the single color value a
+palette slot holds.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# The CSS Color Module Level 4 named colors
+CSS_NAMED_COLORS = {
+    "aliceblue": "#f0f8ff", "antiquewhite": "#faebd7", "aqua": "#00ffff", "aquamarine": "#7fffd4",
+    "azure": "#f0ffff", "beige": "#f5f5dc", "bisque": "#ffe4c4", "black": "#000000",
+    "blanchedalmond": "#ffebcd", "blue": "#0000ff", "blueviolet": "#8a2be2", "brown": "#a52a2a",
+    "burlywood": "#deb887", "cadetblue": "#5f9ea0", "chartreuse": "#7fff00", "chocolate": "#d2691e",
+    "coral": "#ff7f50", "cornflowerblue": "#6495ed", "cornsilk": "#fff8dc", "crimson": "#dc143c",
+    "cyan": "#00ffff", "darkblue": "#00008b", "darkcyan": "#008b8b", "darkgoldenrod": "#b8860b",
+    "darkgray": "#a9a9a9", "darkgreen": "#006400", "darkgrey": "#a9a9a9", "darkkhaki": "#bdb76b",
+    "darkmagenta": "#8b008b", "darkolivegreen": "#556b2f", "darkorange": "#ff8c00", "darkorchid": "#9932cc",
+    "darkred": "#8b0000", "darksalmon": "#e9967a", "darkseagreen": "#8fbc8f", "darkslateblue": "#483d8b",
+    "darkslategray": "#2f4f4f", "darkslategrey": "#2f4f4f", "darkturquoise": "#00ced1", "darkviolet": "#9400d3",
+    "deeppink": "#ff1493", "deepskyblue": "#00bfff", "dimgray": "#696969", "dimgrey": "#696969",
+    "dodgerblue": "#1e90ff", "firebrick": "#b22222", "floralwhite": "#fffaf0", "forestgreen": "#228b22",
+    "fuchsia": "#ff00ff", "gainsboro": "#dcdcdc", "ghostwhite": "#f8f8ff", "gold": "#ffd700",
+    "goldenrod": "#daa520", "gray": "#808080", "green": "#008000", "greenyellow": "#adff2f",
+    "grey": "#808080", "honeydew": "#f0fff0", "hotpink": "#ff69b4", "indianred": "#cd5c5c",
+    "indigo": "#4b0082", "ivory": "#fffff0", "khaki": "#f0e68c", "lavender": "#e6e6fa",
+    "lavenderblush": "#fff0f5", "lawngreen": "#7cfc00", "lemonchiffon": "#fffacd", "lightblue": "#add8e6",
+    "lightcoral": "#f08080", "lightcyan": "#e0ffff", "lightgoldenrodyellow": "#fafad2", "lightgray": "#d3d3d3",
+    "lightgreen": "#90ee90", "lightgrey": "#d3d3d3", "lightpink": "#ffb6c1", "lightsalmon": "#ffa07a",
+    "lightseagreen": "#20b2aa", "lightskyblue": "#87cefa", "lightslategray": "#778899", "lightslategrey": "#778899",
+    "lightsteelblue": "#b0c4de", "lightyellow": "#ffffe0", "lime": "#00ff00", "limegreen": "#32cd32",
+    "linen": "#faf0e6", "magenta": "#ff00ff", "maroon": "#800000", "mediumaquamarine": "#66cdaa",
+    "mediumblue": "#0000cd", "mediumorchid": "#ba55d3", "mediumpurple": "#9370db", "mediumseagreen": "#3cb371",
+    "mediumslateblue": "#7b68ee", "mediumspringgreen": "#00fa9a", "mediumturquoise": "#48d1cc", "mediumvioletred": "#c71585",
+    "midnightblue": "#191970", "mintcream": "#f5fffa", "mistyrose": "#ffe4e1", "moccasin": "#ffe4b5",
+    "navajowhite": "#ffdead", "navy": "#000080", "oldlace": "#fdf5e6", "olive": "#808000",
+    "olivedrab": "#6b8e23", "orange": "#ffa500", "orangered": "#ff4500", "orchid": "#da70d6",
+    "palegoldenrod": "#eee8aa", "palegreen": "#98fb98", "paleturquoise": "#afeeee", "palevioletred": "#db7093",
+    "papayawhip": "#ffefd5", "peachpuff": "#ffdab9", "peru": "#cd853f", "pink": "#ffc0cb",
+    "plum": "#dda0dd", "powderblue": "#b0e0e6", "purple": "#800080", "rebeccapurple": "#663399",
+    "red": "#ff0000", "rosybrown": "#bc8f8f", "royalblue": "#4169e1", "saddlebrown": "#8b4513",
+    "salmon": "#fa8072", "sandybrown": "#f4a460", "seagreen": "#2e8b57", "seashell": "#fff5ee",
+    "sienna": "#a0522d", "silver": "#c0c0c0", "skyblue": "#87ceeb", "slateblue": "#6a5acd",
+    "slategray": "#708090", "slategrey": "#708090", "snow": "#fffafa", "springgreen": "#00ff7f",
+    "steelblue": "#4682b4", "tan": "#d2b48c", "teal": "#008080", "thistle": "#d8bfd8",
+    "tomato": "#ff6347", "turquoise": "#40e0d0", "violet": "#ee82ee", "wheat": "#f5deb3",
+    "white": "#ffffff", "whitesmoke": "#f5f5f5", "yellow": "#ffff00", "yellowgreen": "#9acd32",
+}
+
+# Words naming a palette role, mapped to the role
+ROLE_KEYWORDS = {
+    "background": "background", "backgrounds": "background",
+    "primary": "primary",
+    "secondary": "secondary",
+    "accent": "accent", "accents": "accent",
+}
+
+# Largest distance, in words, between a color and the role keyword it is bound to
+ROLE_WINDOW = 4
+
+# Words, other than color names, that multi-word color names are written with ("light sea green")
+_NAME_WORDS = frozenset((
+    "alice", "almond", "antique", "blanched", "blush", "brick", "burly", "cadet", "chiffon", "cornflower", "cream",
+    "dark", "deep", "dew", "dim", "dodger", "drab", "fire", "floral", "forest", "ghost", "honey", "hot", "indian",
+    "lace", "lawn", "lemon", "light", "medium", "midnight", "mint", "misty", "navajo", "old", "pale", "papaya",
+    "peach", "powder", "puff", "rebecca", "rose", "rosy", "royal", "saddle", "sandy", "sea", "shell", "silk", "sky",
+    "slate", "smoke", "spring", "steel", "whip", "wood",
+))
+
+
+def _name_parts(name: str) -> Optional[Tuple[str, ...]]:
+    """Splits a color name into the words it may be written as, or None if it does not split."""
+    for end in range(len(name) - 1, 0, -1):
+        if name[:end] in CSS_NAMED_COLORS or name[:end] in _NAME_WORDS:
+            rest = _name_parts(name[end:])
+            if rest is not None:
+                return (name[:end],) + rest
+    if name in CSS_NAMED_COLORS or name in _NAME_WORDS:
+        return (name,)
+    return None
+
+
+def _split_names() -> Dict[str, List[Tuple[str, ...]]]:
+    """Maps the last word of every color name written as several words to those words, longest first."""
+    phrases: Dict[str, List[Tuple[str, ...]]] = {}
+    for name in CSS_NAMED_COLORS:
+        parts = _name_parts(name)
+        if parts is not None and len(parts) > 1:
+            phrases.setdefault(parts[-1], []).append(parts)
+    for words in phrases.values():
+        words.sort(key=len, reverse=True)
+    return phrases
+
+
+_SPLIT_NAMES = _split_names()
+# Words that precede another in a color name written as several words
+_NAME_PREFIXES = frozenset(word for phrases in _SPLIT_NAMES.values() for phrase in phrases for word in phrase[:-1])
+# Words the scan looks at more closely
+_WATCHED_WORDS = frozenset(CSS_NAMED_COLORS) | frozenset(ROLE_KEYWORDS) | frozenset(_SPLIT_NAMES)
+# Hex literals and color functions, which are swapped for placeholder words before splitting
+_LITERAL_RE = re.compile(r"#[0-9a-f]+\b|(?:rgb|hsl)a?\([^()]*\)")
+# Punctuation that separates words, mapped to spaces on the UTF-8 bytes (ASCII
+# bytes never occur inside a multi-byte character), which is much faster than str.translate
+_SEPARATORS = bytes.maketrans(b"-:()[]{}\"'/", b" " * 11)
+# Punctuation that becomes a word of its own; colors are not bound to a role keyword across it
+_CLAUSE_BREAKS = frozenset(",;.!?")
+_ARGUMENT_SEPARATOR_RE = re.compile(r"\s*,\s*|\s+")
+_HUE_UNITS = {"deg": 1.0, "grad": 0.9, "rad": 180 / math.pi, "turn": 360.0}
+
+
+def _clamp_byte(value: float) -> int:
+    return min(255, max(0, round(value)))
+
+
+def _number(text: str, percent_scale: float) -> float:
+    """Parses a number, or a percentage scaled so that 100% is `percent_scale`."""
+    if text.endswith("%"):
+        return float(text[:-1]) * percent_scale / 100
+    return float(text)
+
+
+def _css_color(red: float, green: float, blue: float, alpha: float = 1.0) -> str:
+    """Formats channels in 0-255 as `#rrggbb`, or as `rgba()` when `alpha` is below 1."""
+    red, green, blue = _clamp_byte(red), _clamp_byte(green), _clamp_byte(blue)
+    if alpha < 1:
+        return f"rgba({red},{green},{blue},{round(max(0.0, alpha), 3):g})"
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _hsl_to_rgb(hue: float, saturation: float, lightness: float) -> Tuple[float, float, float]:
+    """Converts HSL (hue in degrees, the rest 0-1) to RGB channels in 0-255."""
+    hue %= 360
+    chroma = (1 - abs(2 * lightness - 1)) * saturation
+
+    def channel(n: int) -> float:
+        k = (n + hue / 30) % 12
+        return (lightness - chroma / 2 * max(-1, min(k - 3, 9 - k, 1))) * 255
+
+    return channel(0), channel(8), channel(4)
+
+
+def _parse_function(token: str) -> Optional[str]:
+    """Parses an rgb(), rgba(), hsl() or hsla() literal, in comma or space syntax."""
+    name, _, arguments = token[:-1].partition("(")
+    color, _, alpha = arguments.partition("/")
+    values = [value for value in _ARGUMENT_SEPARATOR_RE.split(color.strip()) if value]
+    if alpha:
+        values.append(alpha.strip())
+    if len(values) not in (3, 4):
+        return None
+    try:
+        opacity = _number(values[3], 1) if len(values) == 4 else 1.0
+        if name.startswith("rgb"):
+            return _css_color(*(_number(value, 255) for value in values[:3]), opacity)
+        hue = values[0]
+        unit = next((unit for unit in _HUE_UNITS if hue.endswith(unit)), None)
+        degrees = float(hue[:-len(unit)]) * _HUE_UNITS[unit] if unit else float(hue)
+        saturation, lightness = (min(1.0, max(0.0, _number(value, 100) / 100)) for value in values[1:3])
+    except ValueError:
+        return None
+    return _css_color(*_hsl_to_rgb(degrees, saturation, lightness), opacity)
+
+
+def parse_color(token: str) -> Optional[str]:
+    """
+    Normalizes one lowercase CSS color: a named color, a hex literal or an rgb()/hsl() function.
+
+    Returns:
+        The color as `#rrggbb`, or `rgba(r,g,b,a)` when it is translucent, or None if it is not a valid color
+    """
+    if token.startswith("#"):
+        digits = token[1:]
+        if len(digits) not in (3, 4, 6, 8) or any(digit not in "0123456789abcdef" for digit in digits):
+            return None
+        if len(digits) < 6:
+            digits = "".join(digit * 2 for digit in digits)
+        return _css_color(*(int(digits[i:i + 2], 16) for i in (0, 2, 4)), int(digits[6:] or "ff", 16) / 255)
+    if token.endswith(")"):
+        return _parse_function(token)
+    return CSS_NAMED_COLORS.get(token)
+
+
+def _tokenize(prompt_lower: str) -> Tuple[List[str], List[str]]:
+    """
+    Splits a prompt into words, with each hex literal and color function
+    replaced by a placeholder word ("\\0" and its index).
+
+    Returns:
+        The words and the literals
+    """
+    literals: List[str] = []
+
+    def placeholder(match: "re.Match[str]") -> str:
+        literals.append(match.group())
+        return f" \0{len(literals) - 1} "
+
+    if "#" in prompt_lower or "(" in prompt_lower:
+        prompt_lower = _LITERAL_RE.sub(placeholder, prompt_lower.replace("\0", " "))
+    for char in _CLAUSE_BREAKS:
+        if char in prompt_lower:
+            prompt_lower = prompt_lower.replace(char, f" {char} ")
+    return prompt_lower.encode("utf-8").translate(_SEPARATORS).decode("utf-8").split(), literals
+
+
+def find_color_roles(prompt_lower: str, default_role: str = "primary") -> Dict[str, str]:
+    """
+    Finds the colors a lowercase prompt mentions and the palette role each is for.
+
+    Colors are bound to role keywords at most ROLE_WINDOW words away and in
+    the same clause, closest pairs first (a keyword after the color wins a
+    tie, as in "a blue background"), each color and each role at most once.
+    The first color bound to no keyword goes to `default_role`, unless a
+    keyword already claimed it.
+
+    The prompt is split into words once and only known words get a closer
+    look, so long prompts cost little more than splitting them.
+
+    Args:
+        prompt_lower: The prompt, in lowercase
+        default_role: Role of colors mentioned away from any role keyword
+
+    Returns:
+        Role mapped to its color, for every role the prompt sets
+    """
+    words, literals = _tokenize(prompt_lower)
+    colors: List[Tuple[int, int, str]] = [] # (first word, last word, color), in order
+    keyword_offsets: List[int] = []
+    keyword_roles: List[str] = []
+    for offset in [offset for offset, word in enumerate(words) if word in _WATCHED_WORDS]:
+        word = words[offset]
+        role = ROLE_KEYWORDS.get(word)
+        if role is not None:
+            keyword_offsets.append(offset)
+            keyword_roles.append(role)
+            continue
+        # A name written as several words replaces the colors its first words matched ("orange red")
+        if offset and words[offset - 1] in _NAME_PREFIXES:
+            for phrase in _SPLIT_NAMES.get(word, ()):
+                start = offset - len(phrase) + 1
+                if start >= 0 and tuple(words[start:offset + 1]) == phrase:
+                    while colors and colors[-1][0] >= start:
+                        colors.pop()
+                    colors.append((start, offset, CSS_NAMED_COLORS["".join(phrase)]))
+                    break
+            else:
+                if word in CSS_NAMED_COLORS:
+                    colors.append((offset, offset, CSS_NAMED_COLORS[word]))
+        elif word in CSS_NAMED_COLORS:
+            colors.append((offset, offset, CSS_NAMED_COLORS[word]))
+    if literals:
+        offsets = [offset for offset, word in enumerate(words) if word[0] == "\0"]
+        for offset, literal in zip(offsets, literals):
+            color = parse_color(literal)
+            if color is not None:
+                colors.append((offset, offset, color))
+        colors.sort()
+
+    # Candidate bindings: the nearest keyword on either side of each color
+    pairs: List[Tuple[int, int, int, str]] = [] # (distance, 0 if the keyword follows, color index, role)
+    for index, (start, end, _) in enumerate(colors):
+        position = bisect_left(keyword_offsets, start)
+        if position > 0 and start - keyword_offsets[position - 1] <= ROLE_WINDOW:
+            keyword = keyword_offsets[position - 1]
+            if _CLAUSE_BREAKS.isdisjoint(words[keyword + 1:start]):
+                pairs.append((start - keyword, 1, index, keyword_roles[position - 1]))
+        if position < len(keyword_offsets) and keyword_offsets[position] - end <= ROLE_WINDOW:
+            keyword = keyword_offsets[position]
+            if _CLAUSE_BREAKS.isdisjoint(words[end + 1:keyword]):
+                pairs.append((keyword - end, 0, index, keyword_roles[position]))
+
+    result: Dict[str, str] = {}
+    bound = set()
+    for _, _, index, role in sorted(pairs):
+        if index not in bound and role not in result:
+            result[role] = colors[index][2]
+            bound.add(index)
+    if default_role not in result:
+        unbound = next((color for index, (_, _, color) in enumerate(colors) if index not in bound), None)
+        if unbound is not None:
+            result[default_role] = unbound
+    return result
@@ -0,0 +1,152 @@
+"""
+SVG Deduplication
+
+A scene-graph pass that stores repeated geometry once. Element subtrees are
+keyed by their markup with the position and per-instance presentation
+attributes taken out; every shape that occurs more than once is lifted into a
+`<defs>` section and each occurrence replaced by a `<use>` at its original
+position, carrying the attributes that differ between occurrences.
+
+Only the elements' own geometry is shared, so attributes that vary between
+occurrences (color, opacity, transform...) must be ones a `<use>` can carry
+without changing the rendering: inherited presentation attributes, which the
+referenced element picks up from the `<use>`, and attributes that apply to the
+`<use>` as a whole (opacity, filter, transform). A shape is only lifted when
+that makes the markup shorter.
+
+The definitions are plain elements rather than `<symbol>`s: a symbol opens a
+viewport that clips anything drawn left of or above its origin, such as a
+circle centered there.
+"""
+
+import copy
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from svg_scene import Defs, Element, Fragment, Node, to_svg_string
+
+# Attributes holding an element's position, moved to the <use> as x and y
+POSITION_ATTRIBUTES = {"rect": ("x", "y"), "circle": ("cx", "cy"), "ellipse": ("cx", "cy"), "text": ("x", "y")}
+
+# Attributes a <use> can carry for the element it references with the same effect
+INSTANCE_ATTRIBUTES = frozenset((
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity", "stroke-linecap",
+    "stroke-linejoin", "stroke-dasharray", "stroke-dashoffset", "opacity", "filter", "transform",
+    "transform-origin", "font-family", "font-size", "font-weight", "text-anchor", "dominant-baseline"
+))
+
+# Attributes that must stay on the <use>, even when every occurrence has the same
+# value: the <use> translation to the element's position applies outside them
+_OUTER_ATTRIBUTES = frozenset(("transform", "transform-origin"))
+
+# Elements that are not drawn by themselves are never deduplicated or looked into
+_DEFINITION_TAGS = frozenset((
+    "defs", "symbol", "clipPath", "mask", "pattern", "marker", "linearGradient", "radialGradient", "filter", "title"
+))
+
+_Occurrence = Tuple[Node, int, Node] # (parent, index in parent.children, node)
+
+
+def _split(node: Node) -> Tuple[str, Dict[str, Any], Tuple[Any, Any]]:
+    """
+    Separates a node into its shared shape and its per-occurrence parts.
+
+    Returns:
+        The markup of the shape (position and instance attributes removed, which
+        keys the node), its instance attributes and its (x, y) position
+    """
+    shape = copy.copy(node)
+    positions = POSITION_ATTRIBUTES.get(node.tag, ())
+    attrs, instance, position = {}, {}, [0, 0]
+    for name, value in node.attrs.items():
+        if name in positions and value.__class__ in (int, float):
+            position[positions.index(name)] = value
+        elif name in INSTANCE_ATTRIBUTES:
+            instance[name] = value
+        else:
+            attrs[name] = value
+    shape.attrs = attrs
+    return to_svg_string(shape), instance, (position[0], position[1])
+
+
+def _occurrences(root: Node) -> Dict[str, List[Tuple[_Occurrence, Dict[str, Any], Tuple[Any, Any]]]]:
+    """Groups every candidate node below `root` by its shape markup."""
+    shapes: Dict[str, List[Tuple[_Occurrence, Dict[str, Any], Tuple[Any, Any]]]] = defaultdict(list)
+    stack = [root]
+    while stack:
+        parent = stack.pop()
+        for index, node in enumerate(parent.children):
+            if node.__class__ is Fragment or node.tag in _DEFINITION_TAGS or "id" in node.attrs:
+                continue
+            markup, instance, position = _split(node)
+            shapes[markup].append(((parent, index, node), instance, position))
+            stack.append(node)
+    return shapes
+
+
+def _use(href: str, position: Tuple[Any, Any], attrs: Dict[str, Any]) -> Element:
+    use = Element("use", href=f"#{href}")
+    if position[0]:
+        use.attrs["x"] = position[0]
+    if position[1]:
+        use.attrs["y"] = position[1]
+    use.attrs.update(attrs)
+    return use
+
+
+def deduplicate(root: Node, id_prefix: str, min_count: int = 2) -> Node:
+    """
+    Replaces repeated element subtrees below `root` by `<use>` references.
+
+    Larger shapes are considered first, and nothing inside a lifted subtree is
+    considered again. The definitions are inserted as a `<defs>` section at
+    the start of `root`, with ids `<id_prefix>0`, `<id_prefix>1`, ... in the
+    order they were lifted, so the output is deterministic.
+
+    Args:
+        root: The subtree to deduplicate in place; it must be a container such as a group
+        id_prefix: Prefix of the definition ids, which must not clash with other ids in the document
+        min_count: Occurrences needed before a shape is lifted
+
+    Returns:
+        `root`
+    """
+    lifted: set = set() # id() of every node already replaced or inside a replaced subtree
+    definitions: List[Node] = []
+    for markup, occurrences in sorted(_occurrences(root).items(), key=lambda item: -len(item[0])):
+        occurrences = [occurrence for occurrence in occurrences if id(occurrence[0][2]) not in lifted]
+        if len(occurrences) < min_count:
+            continue
+
+        # Instance attributes every occurrence sets to the same value stay on the definition
+        first = occurrences[0][1]
+        common = {
+            name: value for name, value in first.items()
+            if name not in _OUTER_ATTRIBUTES and all(instance.get(name) == value for _, instance, _ in occurrences[1:])
+        }
+        definition = copy.copy(occurrences[0][0][2])
+        definition.attrs = {"id": f"{id_prefix}{len(definitions)}", **{
+            name: value for name, value in definition.attrs.items()
+            if name not in POSITION_ATTRIBUTES.get(definition.tag, ()) or value.__class__ not in (int, float)
+            if name not in INSTANCE_ATTRIBUTES or name in common
+        }}
+        uses = [
+            _use(definition.attrs["id"], position, {name: value for name, value in instance.items() if name not in common})
+            for _, instance, position in occurrences
+        ]
+        before = sum(len(to_svg_string(node)) for (_, _, node), _, _ in occurrences)
+        if len(to_svg_string(definition)) + sum(len(to_svg_string(use)) for use in uses) >= before:
+            continue
+
+        definitions.append(definition)
+        for ((parent, index, node), _, _), use in zip(occurrences, uses):
+            parent.children[index] = use
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                lifted.add(id(node))
+                if node.__class__ is not Fragment:
+                    stack.extend(node.children)
+    if definitions:
+        root.children.insert(0, Defs(*definitions))
+    return root
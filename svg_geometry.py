@@ -0,0 +1,117 @@
+"""
+SVG Geometry
+
+Procedural point sets for radial shapes (gear outlines, star polygons and
+sunbursts), computed and formatted with NumPy in one batch per shape instead of
+per-point Python code, so shapes with hundreds of teeth or points cost little
+more than small ones.
+
+Results are memoized by shape, parameters and size. Coordinates are rounded to
+two decimals, with trailing zeros dropped.
+"""
+
+import functools
+from typing import Tuple, Union
+
+import numpy as np
+
+
+def format_rows(values: np.ndarray, prefixes: Union[str, np.ndarray], first: str = "") -> str:
+    """
+    Formats an array of coordinates into one string without a per-value Python loop.
+
+    Values are rounded to two decimals and laid out as ASCII digits in a byte
+    matrix with NumPy arithmetic; unused positions (leading zeros, trailing
+    decimal zeros, signs of positive values) are left as NUL bytes and dropped
+    in one pass.
+
+    Args:
+        values: The coordinates, one row per repeat of the pattern
+        prefixes: One character written before each value of a row, per column
+                  (such as "L," for "Lx,y"), or an array of character codes
+                  shaped like `values` to vary the prefixes between rows
+        first: Replaces the very first prefix (such as "M"), if given
+
+    Returns:
+        The formatted coordinates
+    """
+    fixed = np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+    whole, cents = np.divmod(np.abs(fixed), 100)
+    digits = len(str(int(whole.max()))) if whole.size else 1
+
+    # Per value: prefix, sign, integer digits, decimal point, two decimals
+    chars = np.zeros(fixed.shape + (digits + 5,), dtype=np.uint8)
+    chars[..., 0] = np.frombuffer(prefixes.encode("ascii"), dtype=np.uint8) if isinstance(prefixes, str) else prefixes
+    chars[..., 1] = np.where(fixed < 0, ord("-"), 0)
+    for position in range(digits + 1, 1, -1):
+        chars[..., position] = np.where(whole > 0, whole % 10 + ord("0"), 0)
+        whole //= 10
+    chars[..., digits + 1] |= ord("0") # The units digit is written even when zero
+    tenths, hundredths = np.divmod(cents, 10)
+    chars[..., -3] = np.where(cents > 0, ord("."), 0)
+    chars[..., -2] = np.where(cents > 0, tenths + ord("0"), 0)
+    chars[..., -1] = np.where(hundredths > 0, hundredths + ord("0"), 0)
+    if first and chars.size:
+        chars.flat[0] = ord(first)
+
+    flat = chars.ravel()
+    return flat[flat != 0].tobytes().decode("ascii")
+
+
+def _polar_points(angles: np.ndarray, radii: np.ndarray, center: Tuple[float, float]) -> np.ndarray:
+    return np.column_stack((center[0] + radii * np.cos(angles), center[1] + radii * np.sin(angles)))
+
+
+@functools.lru_cache(maxsize=256)
+def gear_outline(num_teeth: int, outer_radius: float, tooth_height: float,
+                 center: Tuple[float, float]) -> str:
+    """
+    Returns the closed path data of a gear's toothed outline.
+
+    Each tooth rises from the root circle at the start of its pitch, runs
+    across the outer circle over the middle half of the pitch, and drops back
+    to the root circle where the next tooth starts.
+
+    Args:
+        num_teeth: Number of teeth
+        outer_radius: Radius at the tooth tops
+        tooth_height: Depth of the teeth
+        center: The (x, y) center of the gear
+    """
+    steps = (np.arange(num_teeth)[:, None] + (0.0, 0.25, 0.75)).ravel()
+    radii = np.tile((outer_radius - tooth_height, outer_radius, outer_radius), num_teeth)
+    points = _polar_points(steps * (2 * np.pi / num_teeth), radii, center)
+    return format_rows(points, "L,", first="M") + "Z"
+
+
+@functools.lru_cache(maxsize=256)
+def star_points(num_points: int, outer_radius: float, inner_radius: float,
+                center: Tuple[float, float]) -> str:
+    """
+    Returns the "x,y x,y ..." point list of a star polygon with its first point upwards.
+
+    Args:
+        num_points: Number of points
+        outer_radius: Radius at the tips
+        inner_radius: Radius at the notches between tips
+        center: The (x, y) center of the star
+    """
+    angles = np.arange(2 * num_points) * (np.pi / num_points) - np.pi / 2
+    radii = np.tile((outer_radius, inner_radius), num_points)
+    points = _polar_points(angles, radii, center)
+    return format_rows(points, " ,")[1:] # Without the separator before the first point
+
+
+@functools.lru_cache(maxsize=64)
+def sunburst_path(num_rays: int, radius: float, center: Tuple[float, float] = (0, 0)) -> str:
+    """
+    Returns the path data of evenly spaced rays from a center, the first pointing right.
+
+    Args:
+        num_rays: Number of rays
+        radius: Length of each ray
+        center: The (x, y) point the rays start from
+    """
+    ends = _polar_points(np.arange(num_rays) * (2 * np.pi / num_rays), np.full(num_rays, radius), center)
+    rays = np.column_stack((np.broadcast_to(center, ends.shape), ends))
+    return format_rows(rays, "M,L,")
@@ -0,0 +1,78 @@
+"""
+SVG Layout
+
+Places several objects on one canvas. The content area is split into disjoint
+boxes by recursive bisection (a k-d partition), so no two objects overlap and
+no overlap-resolution pass is needed; each object is then scaled uniformly to
+fit its box.
+"""
+
+from typing import List, NamedTuple, Sequence, Tuple
+
+
+class Box(NamedTuple):
+    """An axis-aligned region of the canvas."""
+    x: float
+    y: float
+    width: float
+    height: float
+
+    def inset(self, margin: float) -> "Box":
+        """Returns the box shrunk by `margin` on every side (never below zero size)."""
+        margin = min(margin, self.width / 2, self.height / 2)
+        return Box(self.x + margin, self.y + margin, self.width - 2 * margin, self.height - 2 * margin)
+
+
+def partition(weights: Sequence[float], region: Box, gap: float = 0) -> List[Box]:
+    """
+    Splits a region into one box per weight, with areas proportional to the weights.
+
+    The items are halved recursively, in order, and each half gets a slice of
+    the current box across its longer side, so boxes stay close to square and
+    neighbouring items end up next to each other. The work is O(n log n).
+
+    Args:
+        weights: Relative size of each item; must be positive
+        region: The area to fill
+        gap: Space left between neighbouring boxes
+
+    Returns:
+        The boxes, in the order of `weights`
+    """
+    boxes: List[Box] = [region] * len(weights)
+    prefix = [0.0]
+    for weight in weights:
+        prefix.append(prefix[-1] + weight)
+
+    stack: List[Tuple[int, int, Box]] = [(0, len(weights), region)] if weights else []
+    while stack:
+        start, end, box = stack.pop()
+        if end - start == 1:
+            boxes[start] = box.inset(gap / 2)
+            continue
+        middle = (start + end) // 2
+        share = (prefix[middle] - prefix[start]) / (prefix[end] - prefix[start])
+        if box.width >= box.height:
+            split = box.width * share
+            first = Box(box.x, box.y, split, box.height)
+            second = Box(box.x + split, box.y, box.width - split, box.height)
+        else:
+            split = box.height * share
+            first = Box(box.x, box.y, box.width, split)
+            second = Box(box.x, box.y + split, box.width, box.height - split)
+        stack.append((middle, end, second))
+        stack.append((start, middle, first))
+    return boxes
+
+
+def fit(box: Box, width: float, height: float) -> Tuple[float, float, float]:
+    """
+    Works out how to draw a width x height drawing centered in a box.
+
+    Returns:
+        The (x, y) offset and the uniform scale factor
+    """
+    scale = min(box.width / width, box.height / height)
+    return (box.x + (box.width - width * scale) / 2,
+            box.y + (box.height - height * scale) / 2,
+            scale)
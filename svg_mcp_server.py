@@ -1,20 +1,365 @@
 import os
 import json
+import base64
+import hashlib
 import re
 import math
-from typing import Dict, List, Optional, Any
+import asyncio
+import functools
+import itertools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Any, Tuple, Union
 from fastmcp import FastMCP, Context
+from fastmcp.exceptions import ResourceError
+from mcp.types import TextContent
 import sys
 
-print("--- SVG MCP Server: Starting script ---", file=sys.stderr)
-print(f"--- SVG MCP Server: Received command-line arguments: {sys.argv} ---", file=sys.stderr)
+from svg_artifacts import ArtifactStore, artifact_uri
+from svg_cache import CACHE_FORMAT_VERSION, SVGResultCache, make_cache_key
+from svg_colors import find_color_roles
+from svg_dedup import deduplicate
+from svg_layout import Box, fit, partition
+from svg_metrics import ToolMetrics
+from svg_raster import RasterizationError, SVGRasterizer, resolve_output_size
+from svg_search import Document, SearchIndex
+from svg_scene import (
+    Circle, Defs, Element, Ellipse, Fragment, Group, Line, Node, Path, Polygon, Rect, Svg, Template, Text,
+    collect_references, format_number, iter_chunks, slot
+)
+from svg_startup import load_snapshot, snapshot_key, write_snapshot
+# svg_optimizer (ElementTree) and svg_geometry (NumPy) are imported where they are
+# first needed, since most sessions never use them; see "--startup-profile"
+
+try:
+    from fastmcp.tools import ToolResult
+except ImportError: # fastmcp 2.x
+    from fastmcp.tools.tool import ToolResult
+
+# Progress banners on stderr (startup steps, each registered tool) are only printed
+# with SVG_MCP_VERBOSE=1: the editor spawns a server per session and never shows them.
+# Warnings and errors are always printed.
+VERBOSE = os.environ.get("SVG_MCP_VERBOSE") == "1"
+
+
+def _log(message: str) -> None:
+    """Prints a progress banner to stderr when SVG_MCP_VERBOSE is set."""
+    if VERBOSE:
+        print(f"--- SVG MCP Server: {message} ---", file=sys.stderr)
+
+
+_log("Starting script")
+_log(f"Received command-line arguments: {sys.argv}")
 
 # Initialize the MCP server
-print("--- SVG MCP Server: Initializing FastMCP ---", file=sys.stderr)
+_log("Initializing FastMCP")
 mcp = FastMCP("Cursor SVG Generator")
-print("--- SVG MCP Server: FastMCP initialized ---", file=sys.stderr)
+_log("FastMCP initialized")
+
+# Per-tool call metrics (see svg_metrics.py); SVG_MCP_METRICS=0 disables them
+tool_metrics = ToolMetrics.from_env()
+
+# --- BEGIN STATIC PAYLOADS ---
+# The guide, prompt examples, best practices and snippets never change at runtime.
+# Each is serialized to JSON on first use, and the handlers return the ready-made
+# result instead of rebuilding and re-serializing it on every call.
+
+GENERATE_SVG_GUIDE = {
+    "title": "Guide to Generating SVG with Cursor IDE",
+    "description": "This guide provides instructions on how to use the AI model in Cursor IDE to generate SVG code directly. SVGs are powerful for creating scalable, crisp graphics for the web and beyond.",
+    "steps": [
+        "1. Create or open a file with .svg extension (e.g., 'my_icon.svg').",
+        "2. Use the Cursor IDE's AI capabilities with a clear, descriptive prompt (see examples from `svg_prompt_examples` tool).",
+        "3. The AI will generate the SVG code directly in your editor.",
+        "4. Review the generated code. You can ask the AI for modifications or edit it manually.",
+        "5. Save the file and view it in a browser or SVG viewer to ensure it meets your expectations."
+    ],
+    "styling_your_svgs": {
+        "title": "Styling Your SVGs",
+        "points": [
+            {
+                "point": "Prioritize Your Vision",
+                "details": "Clearly describe your desired style in your prompt (e.g., 'minimalist logo', 'vintage illustration', 'flat design icon', 'neumorphic button'). The AI will attempt to match it."
+            },
+            {
+                "point": "Modern by Default",
+                "details": "If you don't specify a particular style, prompts will generally guide the AI towards clean, modern aesthetics suitable for contemporary web design."
+            },
+            {
+                "point": "Leverage CSS for Styling",
+                "details": "For consistent styling across multiple elements or for complex styles, ask the AI to generate SVGs that utilize internal CSS (`<style>` tags) or are designed to be styled by external CSS. This is a best practice for web SVGs (see `svg_best_practices` tool for more)."
+            },
+            {
+                "point": "Specify Colors and Dimensions",
+                "details": "Be explicit about colors (e.g., 'a blue circle with a #FF0000 red border'), sizes (e.g., 'an icon 24x24 pixels'), and viewBox for proper scaling."
+            }
+        ]
+    },
+    "understanding_svg_fundamentals": {
+        "title": "Understanding SVG Fundamentals",
+        "points": [
+            {
+                "point": "Vector Power",
+                "details": "SVGs (Scalable Vector Graphics) use mathematical formulas, not pixels. This means they can be scaled to any size (tiny icon or large billboard) without losing quality or becoming blurry. Perfect for responsive web graphics, logos, and illustrations. (Source: Adobe, W3C)"
+            },
+            {
+                "point": "XML-Based Structure",
+                "details": "SVGs are written in XML (eXtensible Markup Language), making them text-based. You can inspect, edit, and manipulate SVG code directly. Text within SVGs remains actual text, which is excellent for accessibility (screen readers can read it) and SEO (search engines can index the content). (Source: Adobe, MDN)"
+            },
+            {
+                "point": "Common Use Cases",
+                "details": "Ideal for logos, icons, illustrations, charts, maps, and any 2D graphics that need to be crisp, scalable, and performant on the web. For complex, detailed photographs, raster formats like JPEG or PNG are often more suitable. (Source: Adobe)"
+            },
+            {
+                "point": "Interactivity and Animation",
+                "details": "SVGs can be made interactive using JavaScript and styled or animated using CSS or SMIL (Synchronized Multimedia Integration Language), though CSS is often preferred for web animations. (Source: Adobe, W3C, MDN)"
+            },
+            {
+                "point": "Key Elements",
+                "details": "Common SVG elements include `<circle>`, `<rect>`, `<line>`, `<path>` (for complex shapes), `<text>`, `<g>` (for grouping), `<defs>` (for definitions like gradients), and `<use>` (to reuse elements)."
+            },
+            {
+                "point": "Further Learning",
+                "details": "For in-depth knowledge, explore resources like the Mozilla Developer Network (MDN) SVG Tutorial, W3Schools SVG Tutorial, and the official W3C SVG Specifications."
+            }
+        ]
+    },
+    "example_prompts_info": "Use the `svg_prompt_examples` tool to get specific prompt ideas for various categories like icons, charts, and illustrations.",
+    "best_practices_info": "Consult the `svg_best_practices` tool for detailed guidelines on creating optimized, accessible, and maintainable SVGs."
+}
+
+SVG_PROMPT_EXAMPLES = {
+    "shapes": [
+        "Create an SVG of a red circle with blue border, 3px width, on a transparent background",
+        "Generate SVG code for a rounded rectangle with gradient from blue to purple",
+        "Create an SVG with three overlapping transparent circles in red, green, and blue",
+        "Generate an SVG star shape with 5 points and yellow fill",
+        "SVG of an ellipse with a dashed stroke and orange fill",
+        "Create a polygon with 7 sides, green fill and black stroke"
+    ],
+    "icons": [
+        "Create an SVG icon of a simple house with a chimney",
+        "Generate an SVG hamburger menu icon with three lines",
+        "Create an SVG search icon with a magnifying glass",
+        "Generate an SVG settings gear icon with 8 teeth",
+        "SVG user profile icon, minimalist style",
+        "Generate a download arrow icon, flat design",
+        "Create a shopping cart icon with a small badge",
+        "SVG notification bell icon with a subtle animation hint",
+        "Generate a simple folder icon in blue tones",
+        "Create an SVG checkmark icon, bold and green"
+    ],
+    "illustrations": [
+        "Create a simple SVG landscape with mountains, a sun, and trees",
+        "Generate an SVG cityscape with buildings of different heights",
+        "Create an SVG of a sailing boat on waves",
+        "Generate a simple SVG face with basic features",
+        "SVG illustration of a coffee cup with steam, retro style",
+        "Create a whimsical illustration of a cat playing with yarn",
+        "Generate an SVG for a stack of books with one open"
+    ],
+    "charts": [ # This can be deprecated or merged into data_visualizations
+        "Create a simple SVG bar chart with 4 bars in different colors",
+        "Generate an SVG pie chart divided into 3 sections",
+        "Create an SVG line graph showing an upward trend",
+        "Generate a simple SVG scatter plot with 5 points"
+    ],
+    # --- BEGIN NEW CATEGORIES AND EXAMPLES ---
+    "ui_elements": [
+        "Generate an SVG for a sleek, modern button with a slight gradient",
+        "Create an SVG toggle switch in the 'on' state, cyberpunk style",
+        "SVG for a progress bar at 75% completion, minimalist",
+        "Generate a set of 3 radio buttons, one selected, simple style",
+        "Create an SVG slider control with a circular handle"
+    ],
+    "logos": [
+        "Generate a minimalist SVG logo for a tech startup named 'Nova'",
+        "Create an abstract geometric logo with a sense of motion, using blue and green",
+        "SVG logo for a coffee shop, vintage style, with a coffee bean element",
+        "Generate a text-based logo for 'EcoWorld' with a leaf integrated into the text",
+        "Create a corporate-style shield logo with the letter 'S' in the center"
+    ],
+    "abstract_patterns": [
+        "Generate an SVG seamless pattern of intertwined circles, monochrome",
+        "Create an abstract SVG background with flowing organic shapes, nature palette",
+        "SVG of a repeating geometric pattern with triangles and hexagons, art deco style",
+        "Generate a dynamic abstract pattern with glitch art effects",
+        "Create a simple wave pattern SVG, suitable for a website footer"
+    ],
+    "data_visualizations": [
+        "Generate an SVG for a donut chart with 4 segments and percentage labels",
+        "Create a horizontal bar graph comparing three products, corporate style",
+        "SVG for a simple flowchart with 3 steps and connecting arrows",
+        "Generate a radial progress indicator for a fitness app",
+        "Create an SVG representation of a network graph with 5 nodes and connections"
+    ]
+    # --- END NEW CATEGORIES AND EXAMPLES ---
+}
+
+SVG_BEST_PRACTICES = {
+    "success": True,
+    "title": "SVG Best Practices for AI Generation and Web Use",
+    "introduction": "Follow these best practices when prompting an AI to generate SVGs and for optimizing them for web and general use. These are based on common guidelines and information from sources like Adobe, W3C, and MDN.",
+    "best_practices": [
+        {
+            "title": "Use appropriate viewBox",
+            "description": "Always include a `viewBox` attribute (e.g., `viewBox='0 0 100 100'`) to define the coordinate system and aspect ratio, ensuring proper scaling across different sizes and containers. The AI should include this by default if asked for a standard icon or graphic.",
+            "example": '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg">...</svg>'
+        },
+        {
+            "title": "Optimize Path Data",
+            "description": "Request optimized path data. This includes using relative commands (lowercase, e.g., `m` instead of `M` if appropriate), short command letters, and minimizing unnecessary precision in coordinates. Complex SVGs can be simplified using tools like SVGO.",
+            "example": "Prompt: 'Generate a compact SVG path for a heart shape.' Output: '<path d=\"M10 10L90 10L90 90L10 90z\" fill=\"red\" /> (Example, actual path will differ)'"
+        },
+        {
+            "title": "Use CSS for Styling (Highly Recommended for Web)",
+            "description": "For web use, prefer styling SVGs with CSS (either in a `<style>` block within the SVG or via external stylesheets) instead of relying solely on presentation attributes (e.g., `fill='blue'` on an element). This improves maintainability, allows for easier theming, and enables hover effects or animations with CSS. Ask the AI to 'style using CSS classes'.",
+            "example": "<style>\n  .icon-primary { fill: blue; stroke: navy; }\n</style>\n<circle class='icon-primary' cx='50' cy='50' r='40' />"
+        },
+        {
+            "title": "Reuse Elements with `<symbol>` and `<use>`",
+            "description": "For repeating graphics (like icons in a set or elements in a pattern), define them once with `<symbol>` within a `<defs>` section and then instance them with `<use href='#symbol-id'>`. This significantly reduces file size and complexity.",
+            "example": "<defs><symbol id='myIcon' viewBox='0 0 24 24'><path d='...'></path></symbol></defs> <use href='#myIcon' x='10' y='10' /> <use href='#myIcon' x='50' y='10' />"
+        },
+        {
+            "title": "Minimize Decimal Places",
+            "description": "Limit coordinate and attribute precision to 1-2 decimal places unless higher precision is absolutely necessary. This can reduce file size without noticeable visual impact. The AI should ideally do this if asked for 'optimized' SVG.",
+            "example": "Use `cx='10.5'` instead of `cx='10.4999998'`"
+        },
+        {
+            "title": "Use Semantic Element Names and IDs",
+            "description": "Give meaningful `id` attributes to important elements, especially if they will be referenced by CSS, JavaScript, or `<use>`. Use descriptive class names if styling with CSS.",
+            "example": "<circle id='main-dial' class='clock-face-element' cx='50' cy='50' r='40' fill='yellow' />"
+        },
+        {
+            "title": "Understand SVG Structure (XML-based)",
+            "description": "SVGs are XML documents. Text elements are real text (not shapes unless converted to paths), improving accessibility and SEO. Familiarize yourself with basic XML structure for easier debugging and manipulation.",
+            "example": "<!-- SVG is human-readable XML --> <svg><text x='10' y='20'>Hello World</text></svg>"
+        },
+        {
+            "title": "Choose SVG for the Right Task",
+            "description": "Excellent for logos, icons, illustrations, line art, and charts. For high-detail photographs where subtle color variations are critical, raster formats (JPEG, WebP) are often more suitable due to pixel-based rendering.",
+            "example": "Use SVG for your company logo; use JPEG/WebP for a product hero image."
+        },
+        {
+            "title": "Leverage Interactivity and Animation",
+            "description": "SVGs support scripting (e.g., JavaScript for complex interactions) and declarative animation (SMIL). For web, CSS animations and transitions on SVG elements are often preferred for performance and maintainability.",
+            "example": "Prompt: 'Create an SVG button that changes color on hover using CSS.' or '<circle cx='50' cy='50' r='20'><animate attributeName='fill' values='red;blue;red' dur='3s' repeatCount='indefinite'/></circle> (SMIL example)'"
+        },
+        {
+            "title": "Ensure Accessibility (A11y)",
+            "description": "For complex SVGs that convey information, provide a `<title>` (short description, like alt text) and optionally a `<desc>` (longer description) element as the first children of the `<svg>` tag. Use `role='img'` and `aria-labelledby` to link them if needed. Ensure text is actual text for screen readers.",
+            "example": "<svg role='img' aria-labelledby='svgTitle svgDesc'><title id='svgTitle'>Company Logo</title><desc id='svgDesc'>A circular logo with a stylized letter Q representing Quantum Solutions.</desc>...</svg>"
+        },
+        {
+            "title": "Consider File Size for Complexity",
+            "description": "While SVGs are often smaller than raster images, very complex SVGs with thousands of paths and points can become large and impact performance. Simplify paths, use symbols, and run through an optimizer like SVGO.",
+            "example": "For a detailed map with many repeating icons, define one `<symbol>` and `<use>` it multiple times instead of duplicating the icon paths."
+        },
+        {
+            "title": "Test Across Browsers and Devices",
+            "description": "While modern browser support for core SVG 1.1 and many SVG 2 features is excellent, very new or complex features (e.g., some filter effects, specific animation attributes) might have inconsistencies. Test your SVGs, especially if using advanced features.",
+            "example": "Verify SVG rendering and interactivity in current versions of Chrome, Firefox, Safari, and Edge."
+        },
+        {
+            "title": "Specify `xmlns` Namespace",
+            "description": "Always include the `xmlns='http://www.w3.org/2000/svg'` attribute on the root `<svg>` element to declare it as an SVG document.",
+            "example": "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'>...</svg>"
+        }
+    ],
+    "optimization_tools_info": {
+        "title": "SVG Optimization Tools",
+        "tools": [
+            {
+                "name": "SVGO (SVG Optimizer)",
+                "description": "A Node.js-based tool for optimizing SVG files. Highly effective at reducing file size by removing redundant information, and optimizing paths.",
+                "url": "https://github.com/svg/svgo"
+            },
+            {
+                "name": "SVGOMG (SVGO's Missing GUI)",
+                "description": "A web-based GUI for SVGO, allowing you to visually inspect changes and toggle optimization features.",
+                "url": "https://jakearchibald.github.io/svgomg/"
+            }
+        ]
+    }
+}
+
+SVG_SNIPPETS = {
+    "snippets": [
+        {
+            "name": "Basic Shape: Circle",
+            "description": "A simple circle with styling",
+            "code": '<circle cx="50" cy="50" r="40" stroke="blue" stroke-width="3" fill="red" />'
+        },
+        {
+            "name": "Basic Shape: Rectangle",
+            "description": "A rectangle with rounded corners",
+            "code": '<rect x="10" y="10" width="80" height="60" rx="5" fill="green" />'
+        },
+        {
+            "name": "Text Element",
+            "description": "Basic text with styling",
+            "code": '<text x="10" y="20" font-family="Arial" font-size="16" fill="black">Hello SVG</text>'
+        },
+        {
+            "name": "Linear Gradient",
+            "description": "Definition and use of a linear gradient",
+            "code": '<defs>\n  <linearGradient id="grad" x1="0%" y1="0%" x2="100%" y2="0%">\n    <stop offset="0%" style="stop-color:rgb(255,0,0);stop-opacity:1" />\n    <stop offset="100%" style="stop-color:rgb(0,0,255);stop-opacity:1" />\n  </linearGradient>\n</defs>\n<rect x="10" y="10" width="80" height="80" fill="url(#grad)" />'
+        },
+        {
+            "name": "Simple Path",
+            "description": "A path element creating a custom shape",
+            "code": '<path d="M10,30 A20,20 0,0,1 50,30 A20,20 0,0,1 90,30 Q90,60 50,90 Q10,60 10,30 z" fill="blue"/>'
+        },
+        {
+            "name": "Basic Animation",
+            "description": "A simple animation using animate",
+            "code": '<circle cx="50" cy="50" r="20" fill="red">\n  <animate attributeName="r" values="20;40;20" dur="2s" repeatCount="indefinite" />\n</circle>'
+        }
+    ]
+}
+
+
+def _frozen_tool_result(payload: Dict[str, Any]) -> ToolResult:
+    """
+    Serializes a static tool payload once into a ready-to-send tool result.
+
+    FastMCP passes ToolResult instances through untouched, so the JSON text is
+    not regenerated per call. The payload must not be mutated afterwards.
+
+    Args:
+        payload: The JSON-serializable payload
+
+    Returns:
+        A ToolResult carrying the payload as both JSON text and structured content
+    """
+    text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return ToolResult(content=[TextContent(type="text", text=text)], structured_content=payload)
+
+
+@functools.lru_cache(maxsize=None)
+def _guide_result() -> ToolResult:
+    return _frozen_tool_result(GENERATE_SVG_GUIDE)
+
+
+@functools.lru_cache(maxsize=None)
+def _best_practices_result() -> ToolResult:
+    return _frozen_tool_result(SVG_BEST_PRACTICES)
+
+
+@functools.lru_cache(maxsize=None)
+def _prompt_examples_result(category: str) -> ToolResult:
+    """One serialized slice per category, or the full listing for "all"; the category must exist."""
+    examples = SVG_PROMPT_EXAMPLES if category == "all" else SVG_PROMPT_EXAMPLES[category]
+    return _frozen_tool_result({"success": True, "category": category, "examples": examples})
+
+
+@functools.lru_cache(maxsize=None)
+def _svg_snippets_json() -> str:
+    return json.dumps(SVG_SNIPPETS, ensure_ascii=False, separators=(",", ":"))
+# --- END STATIC PAYLOADS ---
 
 @mcp.tool()
+@tool_metrics.instrument
 async def generate_svg_guide(ctx: Context) -> Dict[str, Any]:
     """
     Provides a guide for generating SVG using the IDE's model.
@@ -30,72 +375,11 @@ async def generate_svg_guide(ctx: Context) -> Dict[str, Any]:
     """
     await ctx.info("Retrieving SVG generation guide")
     
-    return {
-        "title": "Guide to Generating SVG with Cursor IDE",
-        "description": "This guide provides instructions on how to use the AI model in Cursor IDE to generate SVG code directly. SVGs are powerful for creating scalable, crisp graphics for the web and beyond.",
-        "steps": [
-            "1. Create or open a file with .svg extension (e.g., 'my_icon.svg').",
-            "2. Use the Cursor IDE's AI capabilities with a clear, descriptive prompt (see examples from `svg_prompt_examples` tool).",
-            "3. The AI will generate the SVG code directly in your editor.",
-            "4. Review the generated code. You can ask the AI for modifications or edit it manually.",
-            "5. Save the file and view it in a browser or SVG viewer to ensure it meets your expectations."
-        ],
-        "styling_your_svgs": {
-            "title": "Styling Your SVGs",
-            "points": [
-                {
-                    "point": "Prioritize Your Vision",
-                    "details": "Clearly describe your desired style in your prompt (e.g., 'minimalist logo', 'vintage illustration', 'flat design icon', 'neumorphic button'). The AI will attempt to match it."
-                },
-                {
-                    "point": "Modern by Default",
-                    "details": "If you don't specify a particular style, prompts will generally guide the AI towards clean, modern aesthetics suitable for contemporary web design."
-                },
-                {
-                    "point": "Leverage CSS for Styling",
-                    "details": "For consistent styling across multiple elements or for complex styles, ask the AI to generate SVGs that utilize internal CSS (`<style>` tags) or are designed to be styled by external CSS. This is a best practice for web SVGs (see `svg_best_practices` tool for more)."
-                },
-                {
-                    "point": "Specify Colors and Dimensions",
-                    "details": "Be explicit about colors (e.g., 'a blue circle with a #FF0000 red border'), sizes (e.g., 'an icon 24x24 pixels'), and viewBox for proper scaling."
-                }
-            ]
-        },
-        "understanding_svg_fundamentals": {
-            "title": "Understanding SVG Fundamentals",
-            "points": [
-                {
-                    "point": "Vector Power",
-                    "details": "SVGs (Scalable Vector Graphics) use mathematical formulas, not pixels. This means they can be scaled to any size (tiny icon or large billboard) without losing quality or becoming blurry. Perfect for responsive web graphics, logos, and illustrations. (Source: Adobe, W3C)"
-                },
-                {
-                    "point": "XML-Based Structure",
-                    "details": "SVGs are written in XML (eXtensible Markup Language), making them text-based. You can inspect, edit, and manipulate SVG code directly. Text within SVGs remains actual text, which is excellent for accessibility (screen readers can read it) and SEO (search engines can index the content). (Source: Adobe, MDN)"
-                },
-                {
-                    "point": "Common Use Cases",
-                    "details": "Ideal for logos, icons, illustrations, charts, maps, and any 2D graphics that need to be crisp, scalable, and performant on the web. For complex, detailed photographs, raster formats like JPEG or PNG are often more suitable. (Source: Adobe)"
-                },
-                {
-                    "point": "Interactivity and Animation",
-                    "details": "SVGs can be made interactive using JavaScript and styled or animated using CSS or SMIL (Synchronized Multimedia Integration Language), though CSS is often preferred for web animations. (Source: Adobe, W3C, MDN)"
-                },
-                {
-                    "point": "Key Elements",
-                    "details": "Common SVG elements include `<circle>`, `<rect>`, `<line>`, `<path>` (for complex shapes), `<text>`, `<g>` (for grouping), `<defs>` (for definitions like gradients), and `<use>` (to reuse elements)."
-                },
-                {
-                    "point": "Further Learning",
-                    "details": "For in-depth knowledge, explore resources like the Mozilla Developer Network (MDN) SVG Tutorial, W3Schools SVG Tutorial, and the official W3C SVG Specifications."
-                }
-            ]
-        },
-        "example_prompts_info": "Use the `svg_prompt_examples` tool to get specific prompt ideas for various categories like icons, charts, and illustrations.",
-        "best_practices_info": "Consult the `svg_best_practices` tool for detailed guidelines on creating optimized, accessible, and maintainable SVGs."
-    }
-print("--- SVG MCP Server: Tool 'generate_svg_guide' registered ---", file=sys.stderr)
+    return _guide_result()
+_log("Tool 'generate_svg_guide' registered")
 
 @mcp.tool()
+@tool_metrics.instrument
 async def svg_prompt_examples(ctx: Context, category: str = "all") -> Dict[str, Any]:
     """
     Provides example prompts for generating SVG with an AI model.
@@ -110,96 +394,18 @@ async def svg_prompt_examples(ctx: Context, category: str = "all") -> Dict[str,
     """
     await ctx.info(f"Retrieving SVG prompt examples for category: {category}")
     
-    examples = {
-        "shapes": [
-            "Create an SVG of a red circle with blue border, 3px width, on a transparent background",
-            "Generate SVG code for a rounded rectangle with gradient from blue to purple",
-            "Create an SVG with three overlapping transparent circles in red, green, and blue",
-            "Generate an SVG star shape with 5 points and yellow fill",
-            "SVG of an ellipse with a dashed stroke and orange fill",
-            "Create a polygon with 7 sides, green fill and black stroke"
-        ],
-        "icons": [
-            "Create an SVG icon of a simple house with a chimney",
-            "Generate an SVG hamburger menu icon with three lines",
-            "Create an SVG search icon with a magnifying glass",
-            "Generate an SVG settings gear icon with 8 teeth",
-            "SVG user profile icon, minimalist style",
-            "Generate a download arrow icon, flat design",
-            "Create a shopping cart icon with a small badge",
-            "SVG notification bell icon with a subtle animation hint",
-            "Generate a simple folder icon in blue tones",
-            "Create an SVG checkmark icon, bold and green"
-        ],
-        "illustrations": [
-            "Create a simple SVG landscape with mountains, a sun, and trees",
-            "Generate an SVG cityscape with buildings of different heights",
-            "Create an SVG of a sailing boat on waves",
-            "Generate a simple SVG face with basic features",
-            "SVG illustration of a coffee cup with steam, retro style",
-            "Create a whimsical illustration of a cat playing with yarn",
-            "Generate an SVG for a stack of books with one open"
-        ],
-        "charts": [ # This can be deprecated or merged into data_visualizations
-            "Create a simple SVG bar chart with 4 bars in different colors",
-            "Generate an SVG pie chart divided into 3 sections",
-            "Create an SVG line graph showing an upward trend",
-            "Generate a simple SVG scatter plot with 5 points"
-        ],
-        # --- BEGIN NEW CATEGORIES AND EXAMPLES ---
-        "ui_elements": [
-            "Generate an SVG for a sleek, modern button with a slight gradient",
-            "Create an SVG toggle switch in the 'on' state, cyberpunk style",
-            "SVG for a progress bar at 75% completion, minimalist",
-            "Generate a set of 3 radio buttons, one selected, simple style",
-            "Create an SVG slider control with a circular handle"
-        ],
-        "logos": [
-            "Generate a minimalist SVG logo for a tech startup named 'Nova'",
-            "Create an abstract geometric logo with a sense of motion, using blue and green",
-            "SVG logo for a coffee shop, vintage style, with a coffee bean element",
-            "Generate a text-based logo for 'EcoWorld' with a leaf integrated into the text",
-            "Create a corporate-style shield logo with the letter 'S' in the center"
-        ],
-        "abstract_patterns": [
-            "Generate an SVG seamless pattern of intertwined circles, monochrome",
-            "Create an abstract SVG background with flowing organic shapes, nature palette",
-            "SVG of a repeating geometric pattern with triangles and hexagons, art deco style",
-            "Generate a dynamic abstract pattern with glitch art effects",
-            "Create a simple wave pattern SVG, suitable for a website footer"
-        ],
-        "data_visualizations": [
-            "Generate an SVG for a donut chart with 4 segments and percentage labels",
-            "Create a horizontal bar graph comparing three products, corporate style",
-            "SVG for a simple flowchart with 3 steps and connecting arrows",
-            "Generate a radial progress indicator for a fitness app",
-            "Create an SVG representation of a network graph with 5 nodes and connections"
-        ]
-        # --- END NEW CATEGORIES AND EXAMPLES ---
-    }
-    
-    if category == "all":
-        return {
-            "success": True,
-            "category": "all",
-            "examples": {cat: exs for cat, exs in examples.items()}
-        }
-    
-    if category not in examples:
-        return {
-            "success": False,
-            "error": f"Category '{category}' not found. Available categories: all, {', '.join(examples.keys())}",
-            "examples": None
-        }
+    if category == "all" or category in SVG_PROMPT_EXAMPLES:
+        return _prompt_examples_result(category)
     
     return {
-        "success": True,
-        "category": category,
-        "examples": examples[category]
+        "success": False,
+        "error": f"Category '{category}' not found. Available categories: all, {', '.join(SVG_PROMPT_EXAMPLES.keys())}",
+        "examples": None
     }
-print("--- SVG MCP Server: Tool 'svg_prompt_examples' registered ---", file=sys.stderr)
+_log("Tool 'svg_prompt_examples' registered")
 
 @mcp.tool()
+@tool_metrics.instrument
 async def svg_best_practices(ctx: Context) -> Dict[str, Any]:
     """
     Provides best practices for SVG generation and optimization.
@@ -212,900 +418,2091 @@ async def svg_best_practices(ctx: Context) -> Dict[str, Any]:
     """
     await ctx.info("Retrieving SVG best practices")
     
-    return {
-        "success": True,
-        "title": "SVG Best Practices for AI Generation and Web Use",
-        "introduction": "Follow these best practices when prompting an AI to generate SVGs and for optimizing them for web and general use. These are based on common guidelines and information from sources like Adobe, W3C, and MDN.",
-        "best_practices": [
-            {
-                "title": "Use appropriate viewBox",
-                "description": "Always include a `viewBox` attribute (e.g., `viewBox='0 0 100 100'`) to define the coordinate system and aspect ratio, ensuring proper scaling across different sizes and containers. The AI should include this by default if asked for a standard icon or graphic.",
-                "example": '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg">...</svg>'
-            },
-            {
-                "title": "Optimize Path Data",
-                "description": "Request optimized path data. This includes using relative commands (lowercase, e.g., `m` instead of `M` if appropriate), short command letters, and minimizing unnecessary precision in coordinates. Complex SVGs can be simplified using tools like SVGO.",
-                "example": "Prompt: 'Generate a compact SVG path for a heart shape.' Output: '<path d=\"M10 10L90 10L90 90L10 90z\" fill=\"red\" /> (Example, actual path will differ)'"
-            },
-            {
-                "title": "Use CSS for Styling (Highly Recommended for Web)",
-                "description": "For web use, prefer styling SVGs with CSS (either in a `<style>` block within the SVG or via external stylesheets) instead of relying solely on presentation attributes (e.g., `fill='blue'` on an element). This improves maintainability, allows for easier theming, and enables hover effects or animations with CSS. Ask the AI to 'style using CSS classes'.",
-                "example": "<style>\n  .icon-primary { fill: blue; stroke: navy; }\n</style>\n<circle class='icon-primary' cx='50' cy='50' r='40' />"
-            },
-            {
-                "title": "Reuse Elements with `<symbol>` and `<use>`",
-                "description": "For repeating graphics (like icons in a set or elements in a pattern), define them once with `<symbol>` within a `<defs>` section and then instance them with `<use href='#symbol-id'>`. This significantly reduces file size and complexity.",
-                "example": "<defs><symbol id='myIcon' viewBox='0 0 24 24'><path d='...'></path></symbol></defs> <use href='#myIcon' x='10' y='10' /> <use href='#myIcon' x='50' y='10' />"
-            },
-            {
-                "title": "Minimize Decimal Places",
-                "description": "Limit coordinate and attribute precision to 1-2 decimal places unless higher precision is absolutely necessary. This can reduce file size without noticeable visual impact. The AI should ideally do this if asked for 'optimized' SVG.",
-                "example": "Use `cx='10.5'` instead of `cx='10.4999998'`"
-            },
-            {
-                "title": "Use Semantic Element Names and IDs",
-                "description": "Give meaningful `id` attributes to important elements, especially if they will be referenced by CSS, JavaScript, or `<use>`. Use descriptive class names if styling with CSS.",
-                "example": "<circle id='main-dial' class='clock-face-element' cx='50' cy='50' r='40' fill='yellow' />"
-            },
-            {
-                "title": "Understand SVG Structure (XML-based)",
-                "description": "SVGs are XML documents. Text elements are real text (not shapes unless converted to paths), improving accessibility and SEO. Familiarize yourself with basic XML structure for easier debugging and manipulation.",
-                "example": "<!-- SVG is human-readable XML --> <svg><text x='10' y='20'>Hello World</text></svg>"
-            },
-            {
-                "title": "Choose SVG for the Right Task",
-                "description": "Excellent for logos, icons, illustrations, line art, and charts. For high-detail photographs where subtle color variations are critical, raster formats (JPEG, WebP) are often more suitable due to pixel-based rendering.",
-                "example": "Use SVG for your company logo; use JPEG/WebP for a product hero image."
-            },
-            {
-                "title": "Leverage Interactivity and Animation",
-                "description": "SVGs support scripting (e.g., JavaScript for complex interactions) and declarative animation (SMIL). For web, CSS animations and transitions on SVG elements are often preferred for performance and maintainability.",
-                "example": "Prompt: 'Create an SVG button that changes color on hover using CSS.' or '<circle cx='50' cy='50' r='20'><animate attributeName='fill' values='red;blue;red' dur='3s' repeatCount='indefinite'/></circle> (SMIL example)'"
-            },
-            {
-                "title": "Ensure Accessibility (A11y)",
-                "description": "For complex SVGs that convey information, provide a `<title>` (short description, like alt text) and optionally a `<desc>` (longer description) element as the first children of the `<svg>` tag. Use `role='img'` and `aria-labelledby` to link them if needed. Ensure text is actual text for screen readers.",
-                "example": "<svg role='img' aria-labelledby='svgTitle svgDesc'><title id='svgTitle'>Company Logo</title><desc id='svgDesc'>A circular logo with a stylized letter Q representing Quantum Solutions.</desc>...</svg>"
-            },
-            {
-                "title": "Consider File Size for Complexity",
-                "description": "While SVGs are often smaller than raster images, very complex SVGs with thousands of paths and points can become large and impact performance. Simplify paths, use symbols, and run through an optimizer like SVGO.",
-                "example": "For a detailed map with many repeating icons, define one `<symbol>` and `<use>` it multiple times instead of duplicating the icon paths."
-            },
-            {
-                "title": "Test Across Browsers and Devices",
-                "description": "While modern browser support for core SVG 1.1 and many SVG 2 features is excellent, very new or complex features (e.g., some filter effects, specific animation attributes) might have inconsistencies. Test your SVGs, especially if using advanced features.",
-                "example": "Verify SVG rendering and interactivity in current versions of Chrome, Firefox, Safari, and Edge."
-            },
-            {
-                "title": "Specify `xmlns` Namespace",
-                "description": "Always include the `xmlns='http://www.w3.org/2000/svg'` attribute on the root `<svg>` element to declare it as an SVG document.",
-                "example": "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'>...</svg>"
-            }
-        ],
-        "optimization_tools_info": {
-            "title": "SVG Optimization Tools",
-            "tools": [
-                {
-                    "name": "SVGO (SVG Optimizer)",
-                    "description": "A Node.js-based tool for optimizing SVG files. Highly effective at reducing file size by removing redundant information, and optimizing paths.",
-                    "url": "https://github.com/svg/svgo"
-                },
-                {
-                    "name": "SVGOMG (SVGO's Missing GUI)",
-                    "description": "A web-based GUI for SVGO, allowing you to visually inspect changes and toggle optimization features.",
-                    "url": "https://jakearchibald.github.io/svgomg/"
-                }
-            ]
-        }
-    }
-print("--- SVG MCP Server: Tool 'svg_best_practices' registered ---", file=sys.stderr)
+    return _best_practices_result()
+_log("Tool 'svg_best_practices' registered")
+
+# --- BEGIN KNOWLEDGE SEARCH ---
+# The guide points, prompt examples, best practices and snippets are indexed
+# once at startup (see svg_search.py), so a search returns a page of matching
+# entries instead of whole listings.
+SEARCH_MAX_LIMIT = 20
+
+
+def _knowledge_documents() -> List[Document]:
+    """Every searchable entry of the static payloads, one document each."""
+    documents = []
+    for section in ("styling_your_svgs", "understanding_svg_fundamentals"):
+        for number, point in enumerate(GENERATE_SVG_GUIDE[section]["points"]):
+            documents.append(Document(
+                f"guide:{section}:{number}", "guide", point["point"], point["details"],
+                {"section": GENERATE_SVG_GUIDE[section]["title"], **point}
+            ))
+    for number, step in enumerate(GENERATE_SVG_GUIDE["steps"]):
+        documents.append(Document(f"guide:steps:{number}", "guide", "", step, {"section": "Steps", "step": step}))
+    for category, prompts in SVG_PROMPT_EXAMPLES.items():
+        for number, prompt in enumerate(prompts):
+            documents.append(Document(
+                f"example:{category}:{number}", "example", category.replace("_", " "), prompt,
+                {"category": category, "prompt": prompt}
+            ))
+    for number, practice in enumerate(SVG_BEST_PRACTICES["best_practices"]):
+        documents.append(Document(
+            f"best_practice:{number}", "best_practice", practice["title"],
+            f"{practice['description']} {practice['example']}", practice
+        ))
+    for number, tool in enumerate(SVG_BEST_PRACTICES["optimization_tools_info"]["tools"]):
+        documents.append(Document(f"best_practice:tools:{number}", "best_practice", tool["name"], tool["description"], tool))
+    for number, snippet in enumerate(SVG_SNIPPETS["snippets"]):
+        documents.append(Document(
+            f"snippet:{number}", "snippet", snippet["name"], f"{snippet['description']} {snippet['code']}", snippet
+        ))
+    return documents
+
+
+knowledge_index = SearchIndex(_knowledge_documents())
 
 @mcp.tool()
-async def generate_svg_from_prompt(ctx: Context, prompt: str) -> Dict[str, Any]:
+@tool_metrics.instrument
+async def search_svg_knowledge(ctx: Context, query: str, kinds: Optional[List[str]] = None,
+                               limit: int = 5, offset: int = 0) -> Dict[str, Any]:
     """
-    Generates a basic SVG image based on a textual prompt.
+    Searches the prompt examples, best practices, guide points and SVG snippets.
+
+    Results are ranked with BM25, so entries sharing rarer words with the
+    query come first. Use `offset` to page through more results.
 
-    This is a simplified version for demonstration. In a real scenario, 
-    this would involve a more complex AI model to convert text to a rich SVG.
-    
     Args:
         ctx: The MCP context
-        prompt: The textual prompt to generate the SVG from.
-        
+        query: What to look for, e.g. "reuse icons with symbols" or "gradient"
+        kinds: Entry kinds to search ("example", "best_practice", "guide", "snippet"); all by default
+        limit: Results per page (1-20)
+        offset: Results to skip, for the next pages
+
     Returns:
-        A dictionary containing the success status and the generated SVG code.
+        A dictionary with the page of results (best first, with their score), the total number of matches and the offset of the next page
     """
-    await ctx.info(f"Generating SVG from prompt: {prompt[:50]}...") # Log a snippet of the prompt
+    await ctx.info(f"Searching SVG knowledge for: {query}")
 
-    # This function uses Claude's internal knowledge to interpret the prompt and style appropriately
-    
-    # Extract style keywords from prompt
-    prompt_lower = prompt.lower()
-    
-    # These variables will be used to customize the SVG based on the prompt analysis
-    svg_width = 300
-    svg_height = 300
-    
-    # --- BEGIN MODIFICATION: Prompt-based dimensions ---
-    dimension_match = re.search(r'(\d+)\s*(?:x|by)\s*(\d+)', prompt_lower)
-    if dimension_match:
-        try:
-            parsed_width = int(dimension_match.group(1))
-            parsed_height = int(dimension_match.group(2))
-            if 50 <= parsed_width <= 2000 and 50 <= parsed_height <= 2000: # Basic sanity check
-                svg_width = parsed_width
-                svg_height = parsed_height
-                await ctx.info(f"Dimensions set from prompt: {svg_width}x{svg_height}")
-        except ValueError:
-            pass # Ignore if parsing fails
-    # --- END MODIFICATION ---
-    
-    svg_parts = []
-    
-    # Available style categories and their associated color palettes
-    style_keywords = {
-        "cyberpunk": ["cyberpunk", "neon", "futuristic", "glitch", "dystopian", "cyber", "tech"],
-        "minimalist": ["minimalist", "minimal", "clean", "simple", "geometric", "flat"],
-        "abstract": ["abstract", "fluid", "organic", "conceptual", "non-representational"],
-        "retro": ["retro", "vintage", "80s", "90s", "old-school", "pixel", "8-bit"],
-        "nature": ["nature", "organic", "floral", "plant", "tree", "leaf", "flower", "water"],
-        "corporate": ["corporate", "professional", "business", "formal", "clean", "modern"],
-        "fantasy": ["fantasy", "magical", "mythical", "medieval", "dragon", "fairy", "wizard"],
-        "artdeco": ["art deco", "artdeco", "gatsby", "roaring twenties", "geometric patterns", "symmetry", "streamlined"],
-        # --- BEGIN NEW STYLES KEYWORDS ---
-        "steampunk": ["steampunk", "victorian", "cogs", "gears", "industrial", "brass", "copper", "steam-powered"],
-        "flatdesign": ["flat design", "flat", "2d", "simple color", "no gradient", "long shadow"], # minimalist can be similar but flat has its own aesthetic
-        "glitchart": ["glitch", "glitchy", "datamosh", "data mosh", "corrupted", "digital noise", "distortion", "static"]
-        # --- END NEW STYLES KEYWORDS ---
-    }
-    
-    color_palettes = {
-        "cyberpunk": {"primary": "#00ffff", "secondary": "#ff00ff", "accent": "#00ff88", 
-                     "background": "#111122", "text": "#ffffff"},
-        "minimalist": {"primary": "#000000", "secondary": "#ffffff", "accent": "#ff3333", 
-                      "background": "#f7f7f7", "text": "#333333"},
-        "abstract": {"primary": "#ff6b35", "secondary": "#2ec4b6", "accent": "#fdfffc", 
-                    "background": "#293241", "text": "#ffffff"},
-        "retro": {"primary": "#f8333c", "secondary": "#44af69", "accent": "#fcab10", 
-                 "background": "#2b9eb3", "text": "#dbd5b5"},
-        "nature": {"primary": "#2d6a4f", "secondary": "#40916c", "accent": "#95d5b2", 
-                  "background": "#d8f3dc", "text": "#1b4332"},
-        "corporate": {"primary": "#003366", "secondary": "#336699", "accent": "#ff9900", 
-                     "background": "#ffffff", "text": "#333333"},
-        "fantasy": {"primary": "#7b2cbf", "secondary": "#c77dff", "accent": "#ffff3f", 
-                   "background": "#240046", "text": "#e0aaff"},
-        "artdeco": {"primary": "#DAA520", "secondary": "#000000", "accent": "#C0C0C0", 
-                   "background": "#F5F5DC", "text": "#2E2E2E"},
-        # --- BEGIN NEW STYLE PALETTES ---
-        "steampunk": {"primary": "#B87333", "secondary": "#5E2605", "accent": "#CD7F32", # Copper, Dark Brown, Bronze
-                     "background": "#F5DEB3", "text": "#3B2F2F"}, # Wheat, Dark Brown text
-        "flatdesign": {"primary": "#3498db", "secondary": "#2ecc71", "accent": "#e74c3c", # Blue, Green, Red
-                      "background": "#ecf0f1", "text": "#2c3e50"}, # Light Gray BG, Dark Blue text
-        "glitchart": {"primary": "#FF00FF", "secondary": "#00FFFF", "accent": "#FFFF00", # Magenta, Cyan, Yellow
-                     "background": "#1A1A1A", "text": "#FFFFFF"}, # Dark BG, White text
-        # --- END NEW STYLE PALETTES ---
-        "general": {"primary": "#0077b6", "secondary": "#48cae4", "accent": "#fb8500", 
-                   "background": "#caf0f8", "text": "#03045e"}
-    }
-    
-    # STYLE DETERMINATION - Using a more reasoning-based approach
-    # This is where Claude's language understanding helps interpret style intention
-    
-    # Analyze the prompt for style cues beyond just keywords
-    style_indicators = {
-        "cyberpunk": 0,
-        "minimalist": 0,
-        "abstract": 0,
-        "retro": 0,
-        "nature": 0,
-        "corporate": 0,
-        "fantasy": 0,
-        "artdeco": 0,
-        # --- BEGIN NEW STYLES INDICATORS ---
-        "steampunk": 0,
-        "flatdesign": 0,
-        "glitchart": 0,
-        # --- END NEW STYLES INDICATORS ---
-        "general": 0
+    if not 1 <= limit <= SEARCH_MAX_LIMIT or offset < 0:
+        return {
+            "success": False,
+            "error": f"'limit' must be between 1 and {SEARCH_MAX_LIMIT} and 'offset' at least 0",
+            "results": None
+        }
+    unknown = [kind for kind in kinds or () if kind not in knowledge_index.kinds]
+    if unknown:
+        return {
+            "success": False,
+            "error": f"Unknown kinds: {', '.join(unknown)}. Use any of: {', '.join(knowledge_index.kinds)}",
+            "results": None
+        }
+
+    page, total = knowledge_index.search(query, limit, offset, kinds)
+    next_offset = offset + limit if offset + limit < total else None
+    await ctx.info(f"Found {total} matches")
+    return {
+        "success": True,
+        "query": query,
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset,
+        "results": [
+            {"id": document.id, "kind": document.kind, "score": round(score, 3), **document.payload}
+            for document, score in page
+        ]
     }
-    
-    # Initial keyword-based scoring to give a baseline
-    for style, keywords in style_keywords.items():
-        style_indicators[style] = sum(1 for kw in keywords if kw in prompt_lower)
-    
-    # Enhanced style reasoning - looking for contextual clues beyond keywords
-    
+_log("Tool 'search_svg_knowledge' registered")
+# --- END KNOWLEDGE SEARCH ---
+
+# --- BEGIN STYLE CLASSIFICATION TABLES ---
+# Everything the prompt analysis looks for is declared here once and compiled into
+# a single matcher on first use. Classifying a prompt is then one scan over the
+# text followed by set lookups, instead of one substring scan per keyword.
+
+# Available style categories and their associated keywords
+STYLE_KEYWORDS = {
+    "cyberpunk": ["cyberpunk", "neon", "futuristic", "glitch", "dystopian", "cyber", "tech"],
+    "minimalist": ["minimalist", "minimal", "clean", "simple", "geometric", "flat"],
+    "abstract": ["abstract", "fluid", "organic", "conceptual", "non-representational"],
+    "retro": ["retro", "vintage", "80s", "90s", "old-school", "pixel", "8-bit"],
+    "nature": ["nature", "organic", "floral", "plant", "tree", "leaf", "flower", "water"],
+    "corporate": ["corporate", "professional", "business", "formal", "clean", "modern"],
+    "fantasy": ["fantasy", "magical", "mythical", "medieval", "dragon", "fairy", "wizard"],
+    "artdeco": ["art deco", "artdeco", "gatsby", "roaring twenties", "geometric patterns", "symmetry", "streamlined"],
+    "steampunk": ["steampunk", "victorian", "cogs", "gears", "industrial", "brass", "copper", "steam-powered"],
+    "flatdesign": ["flat design", "flat", "2d", "simple color", "no gradient", "long shadow"], # minimalist can be similar but flat has its own aesthetic
+    "glitchart": ["glitch", "glitchy", "datamosh", "data mosh", "corrupted", "digital noise", "distortion", "static"]
+}
+
+COLOR_PALETTES = {
+    "cyberpunk": {"primary": "#00ffff", "secondary": "#ff00ff", "accent": "#00ff88", 
+                 "background": "#111122", "text": "#ffffff"},
+    "minimalist": {"primary": "#000000", "secondary": "#ffffff", "accent": "#ff3333", 
+                  "background": "#f7f7f7", "text": "#333333"},
+    "abstract": {"primary": "#ff6b35", "secondary": "#2ec4b6", "accent": "#fdfffc", 
+                "background": "#293241", "text": "#ffffff"},
+    "retro": {"primary": "#f8333c", "secondary": "#44af69", "accent": "#fcab10", 
+             "background": "#2b9eb3", "text": "#dbd5b5"},
+    "nature": {"primary": "#2d6a4f", "secondary": "#40916c", "accent": "#95d5b2", 
+              "background": "#d8f3dc", "text": "#1b4332"},
+    "corporate": {"primary": "#003366", "secondary": "#336699", "accent": "#ff9900", 
+                 "background": "#ffffff", "text": "#333333"},
+    "fantasy": {"primary": "#7b2cbf", "secondary": "#c77dff", "accent": "#ffff3f", 
+               "background": "#240046", "text": "#e0aaff"},
+    "artdeco": {"primary": "#DAA520", "secondary": "#000000", "accent": "#C0C0C0", 
+               "background": "#F5F5DC", "text": "#2E2E2E"},
+    "steampunk": {"primary": "#B87333", "secondary": "#5E2605", "accent": "#CD7F32", # Copper, Dark Brown, Bronze
+                 "background": "#F5DEB3", "text": "#3B2F2F"}, # Wheat, Dark Brown text
+    "flatdesign": {"primary": "#3498db", "secondary": "#2ecc71", "accent": "#e74c3c", # Blue, Green, Red
+                  "background": "#ecf0f1", "text": "#2c3e50"}, # Light Gray BG, Dark Blue text
+    "glitchart": {"primary": "#FF00FF", "secondary": "#00FFFF", "accent": "#FFFF00", # Magenta, Cyan, Yellow
+                 "background": "#1A1A1A", "text": "#FFFFFF"}, # Dark BG, White text
+    "general": {"primary": "#0077b6", "secondary": "#48cae4", "accent": "#fb8500", 
+               "background": "#caf0f8", "text": "#03045e"}
+}
+
+# Contextual clues beyond plain keywords, as (style, bonus, all_of, none_of).
+# A rule adds its bonus when every group in `all_of` has at least one term in
+# the prompt and no term from `none_of` appears.
+STYLE_CONTEXT_RULES = (
     # Cyberpunk context clues
-    if any(term in prompt_lower for term in ["dystopian", "future", "tech", "neon", "digital"]):
-        style_indicators["cyberpunk"] += 1
-    if "city" in prompt_lower and any(term in prompt_lower for term in ["dark", "future", "tech", "neon"]):
-        style_indicators["cyberpunk"] += 2
-    if any(pair in prompt_lower for pair in ["high tech", "low life", "neural interface", "cyber enhancement", "virtual reality", "digital reality"]):
-        style_indicators["cyberpunk"] += 2
-        
+    ("cyberpunk", 1, (("dystopian", "future", "tech", "neon", "digital"),), ()),
+    ("cyberpunk", 2, (("city",), ("dark", "future", "tech", "neon")), ()),
+    ("cyberpunk", 2, (("high tech", "low life", "neural interface", "cyber enhancement", "virtual reality", "digital reality"),), ()),
     # Minimalist context clues
-    if any(term in prompt_lower for term in ["clean lines", "simple shapes", "uncluttered", "minimalism"]):
-        style_indicators["minimalist"] += 2
-    if "simple" in prompt_lower and "elegant" in prompt_lower:
-        style_indicators["minimalist"] += 1
-    if "geometric" in prompt_lower and not any(term in prompt_lower for term in ["complex", "ornate", "detailed"]):
-        style_indicators["minimalist"] += 1
-        
+    ("minimalist", 2, (("clean lines", "simple shapes", "uncluttered", "minimalism"),), ()),
+    ("minimalist", 1, (("simple",), ("elegant",)), ()),
+    ("minimalist", 1, (("geometric",),), ("complex", "ornate", "detailed")),
     # Abstract context clues
-    if any(term in prompt_lower for term in ["non-representational", "conceptual", "non-figurative"]):
-        style_indicators["abstract"] += 2
-    if "expression" in prompt_lower and not any(term in prompt_lower for term in ["realistic", "literal"]):
-        style_indicators["abstract"] += 1
-        
+    ("abstract", 2, (("non-representational", "conceptual", "non-figurative"),), ()),
+    ("abstract", 1, (("expression",),), ("realistic", "literal")),
     # Retro context clues
-    if any(term in prompt_lower for term in ["vintage style", "old school", "retro gaming", "pixel art"]):
-        style_indicators["retro"] += 2
-    if any(decade in prompt_lower for decade in ["70s", "80s", "90s", "1970s", "1980s", "1990s"]):
-        style_indicators["retro"] += 1
-        
+    ("retro", 2, (("vintage style", "old school", "retro gaming", "pixel art"),), ()),
+    ("retro", 1, (("70s", "80s", "90s", "1970s", "1980s", "1990s"),), ()),
     # Nature context clues
-    if any(term in prompt_lower for term in ["organic shape", "natural form", "floral pattern", "landscape"]):
-        style_indicators["nature"] += 2
-    if "environment" in prompt_lower or "eco" in prompt_lower:
-        style_indicators["nature"] += 1
-        
+    ("nature", 2, (("organic shape", "natural form", "floral pattern", "landscape"),), ()),
+    ("nature", 1, (("environment", "eco"),), ()),
     # Corporate context clues
-    if any(term in prompt_lower for term in ["professional logo", "business card", "corporate identity", "brand"]):
-        style_indicators["corporate"] += 2
-    if "company" in prompt_lower or "professional" in prompt_lower:
-        style_indicators["corporate"] += 1
-        
+    ("corporate", 2, (("professional logo", "business card", "corporate identity", "brand"),), ()),
+    ("corporate", 1, (("company", "professional"),), ()),
     # Fantasy context clues
-    if any(term in prompt_lower for term in ["magical realm", "mythical creature", "enchanted", "fairy tale"]):
-        style_indicators["fantasy"] += 2
-    if "spell" in prompt_lower or "quest" in prompt_lower or "dragon" in prompt_lower:
-        style_indicators["fantasy"] += 1
-    
+    ("fantasy", 2, (("magical realm", "mythical creature", "enchanted", "fairy tale"),), ()),
+    ("fantasy", 1, (("spell", "quest", "dragon"),), ()),
     # Art Deco context clues
-    if any(term in prompt_lower for term in ["art deco style", "gatsby", "roaring twenties", "1920s style", "deco pattern"]):
-        style_indicators["artdeco"] += 2
-    if "geometric" in prompt_lower and ("gold" in prompt_lower or "symmetry" in prompt_lower or "streamlined" in prompt_lower):
-        style_indicators["artdeco"] += 1
-    if "symmetric" in prompt_lower or "ornate geometric" in prompt_lower:
-        style_indicators["artdeco"] += 1
-    
+    ("artdeco", 2, (("art deco style", "gatsby", "roaring twenties", "1920s style", "deco pattern"),), ()),
+    ("artdeco", 1, (("geometric",), ("gold", "symmetry", "streamlined")), ()),
+    ("artdeco", 1, (("symmetric", "ornate geometric"),), ()),
     # Steampunk context clues
-    if any(term in prompt_lower for term in ["steampunk", "victorian", "cogs", "gears", "industrial era", "steam powered"]):
-        style_indicators["steampunk"] += 2
-    if ("brass" in prompt_lower or "copper" in prompt_lower or "bronze" in prompt_lower) and "mechanism" in prompt_lower:
-        style_indicators["steampunk"] += 1
-        
+    ("steampunk", 2, (("steampunk", "victorian", "cogs", "gears", "industrial era", "steam powered"),), ()),
+    ("steampunk", 1, (("brass", "copper", "bronze"), ("mechanism",)), ()),
     # Flat Design context clues
-    if any(term in prompt_lower for term in ["flat design", "flat style", "2d simple", "no shadows", "material design basic"]): # material can sometimes mean flat
-        style_indicators["flatdesign"] += 2
-    if "long shadow" in prompt_lower: # A specific flat design trend
-        style_indicators["flatdesign"] += 1
-    if "minimal" in prompt_lower and "solid color" in prompt_lower:
-        style_indicators["flatdesign"] +=1
-
+    ("flatdesign", 2, (("flat design", "flat style", "2d simple", "no shadows", "material design basic"),), ()), # material can sometimes mean flat
+    ("flatdesign", 1, (("long shadow",),), ()), # A specific flat design trend
+    ("flatdesign", 1, (("minimal",), ("solid color",)), ()),
     # Glitch Art context clues
-    if any(term in prompt_lower for term in ["glitch effect", "datamosh", "data corruption", "digital noise", "pixel sorting", "screen tear"]):
-        style_indicators["glitchart"] += 2
-    if ("distorted" in prompt_lower or "corrupted" in prompt_lower) and ("digital" in prompt_lower or "signal" in prompt_lower):
-        style_indicators["glitchart"] += 1
-    
-    # Determine the dominant style from our enhanced analysis
+    ("glitchart", 2, (("glitch effect", "datamosh", "data corruption", "digital noise", "pixel sorting", "screen tear"),), ()),
+    ("glitchart", 1, (("distorted", "corrupted"), ("digital", "signal")), ()),
+)
+
+# Tie-breakers, tried in order: the first tied style with one of its terms wins
+STYLE_TIE_BREAKERS = (
+    ("cyberpunk", ("digital", "tech", "future", "cyber", "ai", "virtual")), # tech-related elements
+    ("nature", ("tree", "flower", "plant", "river", "mountain", "forest")), # nature elements
+    ("minimalist", ("minimal", "simple", "clean", "basic")), # simplicity is emphasized
+    ("fantasy", ("magic", "mystic", "dragon", "sword", "wizard")), # magical elements
+    ("artdeco", ("geometric", "gold", "symmetry", "1920s", "gatsby", "streamline")),
+    ("steampunk", ("gear", "cog", "victorian", "industrial", "brass")),
+    ("flatdesign", ("flat", "2d", "simple icon", "no gradient")),
+    ("glitchart", ("glitchy", "corrupt", "noise", "distort")),
+)
+
+# Potential shapes or objects to extract from the prompt
+OBJECT_KEYWORDS = {
+    "eye": ("eye", "vision", "optic", "sight"),
+    "circuit": ("circuit", "chip", "electronic", "board", "tech"),
+    "city": ("city", "skyline", "building", "urban"),
+    "face": ("face", "head", "portrait"),
+    "geometric": ("circle", "square", "triangle", "hexagon", "geometric"),
+    "landscape": ("landscape", "mountain", "nature", "scene"),
+    "animal": ("animal", "creature", "beast", "dog", "cat", "bird"),
+    "abstract": ("abstract", "pattern", "design", "random"),
+    "gear": ("gear", "cog", "cogwheel", "mechanism"),
+    "arrow": ("arrow", "pointer", "direction", "indicator", "cursor"),
+    "cloud": ("cloud", "sky", "weather", "cumulus", "fluffy cloud"),
+    "heart": ("heart", "love", "valentine", "romance"),
+    "star": ("star", "celestial", "rating", "sparkle", "five-pointed star")
+}
+
+
+def _compile_term_matcher(terms):
+    """
+    Compiles a collection of literal terms into a single matching function.
+
+    The terms are folded into a trie and emitted as one nested regex alternation,
+    wrapped in a lookahead so that every start position of the text is tried in a
+    single pass and reports the longest term beginning there. Shorter terms hidden
+    inside a reported match are recovered from a precomputed containment table, so
+    the result is exactly ``{t for t in terms if t in text}``.
+
+    Args:
+        terms: The literal terms to look for
+
+    Returns:
+        A function taking a lowercase string and returning the set of terms it contains
+    """
+    terms = sorted(set(terms))
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def to_regex(node):
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    pattern = re.compile(f"(?=({to_regex(trie)}))")
+    contained = {term: frozenset(other for other in terms if other in term) for term in terms}
+
+    def match(text):
+        found = set()
+        for term in set(pattern.findall(text)):
+            found |= contained[term]
+        return found
+
+    return match
+
+
+_STYLE_ORDER = list(STYLE_KEYWORDS) + ["general"]
+_STYLE_KEYWORD_SETS = {style: frozenset(keywords) for style, keywords in STYLE_KEYWORDS.items()}
+_STYLE_CONTEXT_RULES = tuple(
+    (style, bonus, tuple(frozenset(group) for group in all_of), frozenset(none_of))
+    for style, bonus, all_of, none_of in STYLE_CONTEXT_RULES
+)
+_STYLE_TIE_BREAKERS = tuple((style, frozenset(terms)) for style, terms in STYLE_TIE_BREAKERS)
+_OBJECT_KEYWORD_SETS = {name: frozenset(terms) for name, terms in OBJECT_KEYWORDS.items()}
+
+
+@functools.lru_cache(maxsize=1)
+def _prompt_term_matcher():
+    # Compiling the regex takes a few milliseconds, so it is not done at import
+    return _compile_term_matcher(
+        [kw for keywords in STYLE_KEYWORDS.values() for kw in keywords]
+        + [term for _, _, all_of, none_of in STYLE_CONTEXT_RULES for group in all_of + (none_of,) for term in group]
+        + [term for _, terms in STYLE_TIE_BREAKERS for term in terms]
+        + [term for terms in OBJECT_KEYWORDS.values() for term in terms]
+    )
+
+
+def _match_prompt_terms(prompt_lower):
+    """Returns the set of known terms found in a lowercase prompt."""
+    return _prompt_term_matcher()(prompt_lower)
+
+
+def _score_styles(matched_terms):
+    """
+    Scores every style against the set of terms found in the prompt.
+
+    Args:
+        matched_terms: Terms found in the prompt by `_match_prompt_terms`
+
+    Returns:
+        A dictionary mapping each style (including "general") to its score
+    """
+    # Initial keyword-based scoring to give a baseline
+    style_indicators = {style: 0 for style in _STYLE_ORDER}
+    for style, keywords in _STYLE_KEYWORD_SETS.items():
+        style_indicators[style] = len(keywords & matched_terms)
+
+    # Enhanced style reasoning - looking for contextual clues beyond keywords
+    for style, bonus, all_of, none_of in _STYLE_CONTEXT_RULES:
+        if all(not group.isdisjoint(matched_terms) for group in all_of) and none_of.isdisjoint(matched_terms):
+            style_indicators[style] += bonus
+
+    return style_indicators
+
+
+def _classify_style(matched_terms):
+    """
+    Determines the dominant style from the terms found in the prompt.
+
+    Args:
+        matched_terms: Terms found in the prompt by `_match_prompt_terms`
+
+    Returns:
+        The name of the dominant style, or "general" if the analysis is inconclusive
+    """
+    style_indicators = _score_styles(matched_terms)
+
     # If we have inconclusive results, fall back to "general"
-    if max(style_indicators.values()) > 0:
+    max_score = max(style_indicators.values())
+    if max_score > 0:
         dominant_style = max(style_indicators.items(), key=lambda x: x[1])[0]
     else:
         dominant_style = "general"
-        
+
     # If we have a tie, make a more contextual decision
-    max_score = max(style_indicators.values())
     tied_styles = [style for style, score in style_indicators.items() if score == max_score and score > 0]
-    
     if len(tied_styles) > 1:
-        # Break ties with additional analysis
-        
-        # Favor cyberpunk if tech-related elements are mentioned
-        if "cyberpunk" in tied_styles and any(term in prompt_lower for term in ["digital", "tech", "future", "cyber", "ai", "virtual"]):
-            dominant_style = "cyberpunk"
-            
-        # Favor nature if nature elements are specified
-        elif "nature" in tied_styles and any(term in prompt_lower for term in ["tree", "flower", "plant", "river", "mountain", "forest"]):
-            dominant_style = "nature"
-            
-        # Favor minimalist if simplicity is emphasized
-        elif "minimalist" in tied_styles and any(term in prompt_lower for term in ["minimal", "simple", "clean", "basic"]):
-            dominant_style = "minimalist"
-            
-        # Favor fantasy if magical elements are present
-        elif "fantasy" in tied_styles and any(term in prompt_lower for term in ["magic", "mystic", "dragon", "sword", "wizard"]):
-            dominant_style = "fantasy"
-            
-        # Tie-breaking for Art Deco
-        elif "artdeco" in tied_styles and any(term in prompt_lower for term in ["geometric", "gold", "symmetry", "1920s", "gatsby", "streamline"]):
-            dominant_style = "artdeco"
-        # --- BEGIN TIE-BREAKING FOR NEW STYLES ---
-        elif "steampunk" in tied_styles and any(term in prompt_lower for term in ["gear", "cog", "victorian", "industrial", "brass"]):
-            dominant_style = "steampunk"
-        elif "flatdesign" in tied_styles and any(term in prompt_lower for term in ["flat", "2d", "simple icon", "no gradient"]):
-            dominant_style = "flatdesign"
-        elif "glitchart" in tied_styles and any(term in prompt_lower for term in ["glitchy", "corrupt", "noise", "distort"]):
-            dominant_style = "glitchart"
-        # --- END TIE-BREAKING FOR NEW STYLES ---
-    
-    # Set the color palette based on the dominant style
-    palette = color_palettes[dominant_style]
-    
-    # Check for specific color mentions and override
-    color_mapping = {
-        "red": "#ff0000", "blue": "#0000ff", "green": "#00ff00", "yellow": "#ffff00",
-        "purple": "#800080", "pink": "#ff69b4", "orange": "#ffa500", "black": "#000000",
-        "white": "#ffffff", "gray": "#808080", "gold": "#ffd700", "silver": "#c0c0c0"
-    }
-    
-    # Override palette colors if specific colors are mentioned
-    for color_name, color_hex in color_mapping.items():
-        if color_name in prompt_lower:
-            if "background" in prompt_lower and color_name in prompt_lower.split("background")[1][:20]:
-                palette["background"] = color_hex
-            elif "primary" in prompt_lower and color_name in prompt_lower.split("primary")[1][:20]:
-                palette["primary"] = color_hex
-            elif "secondary" in prompt_lower and color_name in prompt_lower.split("secondary")[1][:20]:
-                palette["secondary"] = color_hex
-            elif "accent" in prompt_lower and color_name in prompt_lower.split("accent")[1][:20]:
-                palette["accent"] = color_hex
-            else:
-                # If color is mentioned but not associated with any specific element,
-                # use it as the primary color
-                palette["primary"] = color_hex
-    
-    # Extract potential shapes or objects from prompt
-    common_objects = {
-        "eye": True if any(x in prompt_lower for x in ["eye", "vision", "optic", "sight"]) else False,
-        "circuit": True if any(x in prompt_lower for x in ["circuit", "chip", "electronic", "board", "tech"]) else False,
-        "city": True if any(x in prompt_lower for x in ["city", "skyline", "building", "urban"]) else False,
-        "face": True if any(x in prompt_lower for x in ["face", "head", "portrait"]) else False,
-        "geometric": True if any(x in prompt_lower for x in ["circle", "square", "triangle", "hexagon", "geometric"]) else False,
-        "landscape": True if any(x in prompt_lower for x in ["landscape", "mountain", "nature", "scene"]) else False,
-        "animal": True if any(x in prompt_lower for x in ["animal", "creature", "beast", "dog", "cat", "bird"]) else False,
-        "abstract": True if any(x in prompt_lower for x in ["abstract", "pattern", "design", "random"]) else False,
-        "gear": True if any(x in prompt_lower for x in ["gear", "cog", "cogwheel", "mechanism"]) else False,
-        # --- BEGIN NEW COMMON OBJECTS ---
-        "arrow": True if any(x in prompt_lower for x in ["arrow", "pointer", "direction", "indicator", "cursor"]) else False,
-        "cloud": True if any(x in prompt_lower for x in ["cloud", "sky", "weather", "cumulus", "fluffy cloud"]) else False,
-        "heart": True if any(x in prompt_lower for x in ["heart", "love", "valentine", "romance"]) else False,
-        "star": True if any(x in prompt_lower for x in ["star", "celestial", "rating", "sparkle", "five-pointed star"]) else False
-        # --- END NEW COMMON OBJECTS ---
-    }
-    
-    # Define SVG defs section with reusable components
-    svg_parts.append(f'''<defs>
-        <!-- Filter: Glow Effect -->
-        <filter id="glow" x="-20%" y="-20%" width="140%" height="140%">
-            <feGaussianBlur stdDeviation="5" result="blur"/>
-            <feComposite in="SourceGraphic" in2="blur" operator="over"/>
-        </filter>
-        
-        <!-- Gradient: Primary to Secondary -->
-        <linearGradient id="primaryGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" style="stop-color:{palette['primary']};stop-opacity:1" />
-            <stop offset="100%" style="stop-color:{palette['secondary']};stop-opacity:1" />
-        </linearGradient>
-        
-        <!-- Pattern: Background texture -->
-        <pattern id="bgPattern" patternUnits="userSpaceOnUse" width="100" height="100">
-            <rect width="100" height="100" fill="{palette['background']}"/>
-            <path d="M0 10 H100 M0 30 H100 M0 50 H100 M0 70 H100 M0 90 H100" stroke="{palette['primary']}" stroke-width="0.5" opacity="0.1"/>
-            <path d="M10 0 V100 M30 0 V100 M50 0 V100 M70 0 V100 M90 0 V100" stroke="{palette['primary']}" stroke-width="0.5" opacity="0.1"/>
-        </pattern>
-        
-        <!-- Filter: Glitch effect for cyberpunk style -->
-        <filter id="glitchEffect">
-            <feTurbulence type="fractalNoise" baseFrequency="0.05" numOctaves="2" result="noise"/>
-            <feDisplacementMap in="SourceGraphic" in2="noise" scale="5" xChannelSelector="R" yChannelSelector="G"/>
-        </filter>
-        
-        <!-- Filter: Retro pixelation effect -->
-        <filter id="pixelate" x="0%" y="0%" width="100%" height="100%">
-            <feFlood x="4" y="4" height="2" width="2"/>
-            <feComposite width="8" height="8"/>
-            <feTile result="a"/>
-            <feComposite in="SourceGraphic" in2="a" operator="in"/>
-            <feMorphology operator="dilate" radius="2"/>
-        </filter>
-    </defs>''')
-    
-    # Add background
-    svg_parts.append(f'<rect width="{svg_width}" height="{svg_height}" fill="{palette["background"]}"/>')
-    
-    # For abstract/pattern designs, add background patterns
-    if dominant_style in ["abstract", "cyberpunk", "retro"]:
-        svg_parts.append(f'<rect width="{svg_width}" height="{svg_height}" fill="url(#bgPattern)" opacity="0.3"/>')
-    
-    # Generate content based on detected objects and style
-    
-    # Center position for most objects
-    center_x = svg_width / 2
-    center_y = svg_height / 2
-    
-    # Cybernetic Eye
-    if common_objects["eye"]:
-        # Determine if it has scanning effects
-        has_scan = "scan" in prompt_lower or "tracking" in prompt_lower or "target" in prompt_lower
-        
-        svg_parts.append(f'''
-        <!-- Eye element -->
-        <g transform="translate({center_x}, {center_y})">
-            <!-- Eye outer shape -->
-            <ellipse cx="0" cy="0" rx="60" ry="35" fill="#000000" stroke="{palette['primary']}" stroke-width="2"/>
-            
-            <!-- Iris -->
-            <circle cx="0" cy="0" r="25" fill="url(#primaryGradient)" filter="url(#glow)"/>
-            
-            <!-- Pupil -->
-            <circle cx="0" cy="0" r="12" fill="#000000"/>
-            
-            <!-- Tech details -->
-            <circle cx="0" cy="0" r="18" fill="none" stroke="{palette['accent']}" stroke-width="0.8" stroke-dasharray="2,1"/>
-            
-            <!-- Scanning effect if requested -->
-            {f'<line x1="-40" y1="-10" x2="40" y2="-10" stroke="{palette["accent"]}" stroke-width="1" opacity="0.7"/>' if has_scan else ''}
-            {f'<line x1="-40" y1="10" x2="40" y2="10" stroke="{palette["accent"]}" stroke-width="1" opacity="0.7"/>' if has_scan else ''}
-            {f'<path d="M-40 0 Q0 -5 40 0" stroke="{palette["secondary"]}" stroke-width="1" fill="none" opacity="0.8"/>' if has_scan else ''}
-            {f'<path d="M-40 0 Q0 5 40 0" stroke="{palette["secondary"]}" stroke-width="1" fill="none" opacity="0.8"/>' if has_scan else ''}
-        </g>''')
+        for style, terms in _STYLE_TIE_BREAKERS:
+            if style in tied_styles and not terms.isdisjoint(matched_terms):
+                dominant_style = style
+                break
+
+    return dominant_style
+
+
+def _detect_objects(matched_terms):
+    """
+    Flags which of the known objects are mentioned in the prompt.
+
+    Args:
+        matched_terms: Terms found in the prompt by `_match_prompt_terms`
+
+    Returns:
+        A dictionary mapping each object name in OBJECT_KEYWORDS to a boolean
+    """
+    return {name: not terms.isdisjoint(matched_terms) for name, terms in _OBJECT_KEYWORD_SETS.items()}
+# --- END STYLE CLASSIFICATION TABLES ---
+
+# Generated results are cached by request hash (see svg_cache.py)
+svg_result_cache = SVGResultCache.from_env()
+
+
+def _parse_prompt_dimensions(prompt_lower: str) -> Optional[Tuple[int, int]]:
+    """
+    Extracts explicit "<width>x<height>" or "<width> by <height>" dimensions from a prompt.
+
+    Args:
+        prompt_lower: The lowercased prompt
+
+    Returns:
+        A (width, height) tuple, or None if no dimensions in the 50-2000 range were found
+    """
+    dimension_match = re.search(r'(\d+)\s*(?:x|by)\s*(\d+)', prompt_lower)
+    if dimension_match:
+        try:
+            parsed_width = int(dimension_match.group(1))
+            parsed_height = int(dimension_match.group(2))
+            if 50 <= parsed_width <= 2000 and 50 <= parsed_height <= 2000: # Basic sanity check
+                return parsed_width, parsed_height
+        except ValueError:
+            pass # Ignore if parsing fails
+    return None
+
+
+# --- BEGIN OBJECT RENDERERS ---
+# Each renderer builds the scene graph for one kind of object. They all take the
+# palette and the dominant style, plus keyword options parsed from the prompt by
+# their companion `_<object>_options` function, and return a single node to add
+# to the document.
+#
+# Renderers draw in a fixed DESIGN_SIZE x DESIGN_SIZE box whatever the document
+# size; `_place_object` scales the result to its place on the canvas. They only
+# place palette colors into attributes and never compute with them, so each one
+# is compiled once into a template with palette slots per set of options and
+# serves every document size (see `_render_object`).
+
+# Side of the square every renderer draws in
+DESIGN_SIZE = 300
+
+
+def _translate(x: float, y: float) -> str:
+    return f"translate({format_number(x)},{format_number(y)})"
+
+
+_DESIGN_CENTER = _translate(DESIGN_SIZE / 2, DESIGN_SIZE / 2)
+
+
+# Reusable definitions, referenced via url(#...). Each builder takes the primary,
+# secondary and background colors. Only the definitions a document actually
+# references are emitted, in this order.
+def _glow_filter(primary, secondary, background):
+    # Filter: Glow Effect
+    return Element("filter",
+                   Element("feGaussianBlur", stdDeviation=5, result="blur"),
+                   Element("feComposite", in_="SourceGraphic", in2="blur", operator="over"),
+                   id="glow", x="-20%", y="-20%", width="140%", height="140%")
+
+
+def _primary_gradient(primary, secondary, background):
+    # Gradient: Primary to Secondary
+    return Element("linearGradient",
+                   Element("stop", offset="0%", style=f"stop-color:{primary};stop-opacity:1"),
+                   Element("stop", offset="100%", style=f"stop-color:{secondary};stop-opacity:1"),
+                   id="primaryGradient", x1="0%", y1="0%", x2="100%", y2="100%")
+
+
+def _bg_pattern(primary, secondary, background):
+    # Pattern: Background texture
+    return Element("pattern",
+                   Rect(width=100, height=100, fill=background),
+                   Path("M0 10H100M0 30H100M0 50H100M0 70H100M0 90H100", stroke=primary, stroke_width=0.5, opacity=0.1),
+                   Path("M10 0V100M30 0V100M50 0V100M70 0V100M90 0V100", stroke=primary, stroke_width=0.5, opacity=0.1),
+                   id="bgPattern", patternUnits="userSpaceOnUse", width=100, height=100)
+
+
+def _glitch_filter(primary, secondary, background):
+    # Filter: Glitch effect for cyberpunk style
+    return Element("filter",
+                   Element("feTurbulence", type="fractalNoise", baseFrequency=0.05, numOctaves=2, result="noise"),
+                   Element("feDisplacementMap", in_="SourceGraphic", in2="noise", scale=5, xChannelSelector="R", yChannelSelector="G"),
+                   id="glitchEffect")
+
+
+def _pixelate_filter(primary, secondary, background):
+    # Filter: Retro pixelation effect
+    return Element("filter",
+                   Element("feFlood", x=4, y=4, height=2, width=2),
+                   Element("feComposite", width=8, height=8),
+                   Element("feTile", result="a"),
+                   Element("feComposite", in_="SourceGraphic", in2="a", operator="in"),
+                   Element("feMorphology", operator="dilate", radius=2),
+                   id="pixelate", x="0%", y="0%", width="100%", height="100%")
+
+
+DEF_BUILDERS = (
+    ("glow", _glow_filter),
+    ("primaryGradient", _primary_gradient),
+    ("bgPattern", _bg_pattern),
+    ("glitchEffect", _glitch_filter),
+    ("pixelate", _pixelate_filter),
+)
+# Definitions that are filters, reported per document since filters dominate rasterization cost
+FILTER_DEF_IDS = frozenset(("glow", "glitchEffect", "pixelate"))
+
+
+@functools.lru_cache(maxsize=256)
+def _render_defs(used_ids: FrozenSet[str], primary: str, secondary: str, background: str) -> Optional[Fragment]:
+    """
+    Builds the `<defs>` section holding only the definitions in `used_ids`.
+
+    The section only depends on the referenced ids and three palette colors, so
+    it is serialized once per combination and reused as a fragment.
+
+    Returns:
+        The serialized section, or None if nothing is referenced
+    """
+    definitions = [build(primary, secondary, background) for def_id, build in DEF_BUILDERS if def_id in used_ids]
+    return Fragment.of(Defs(*definitions)) if definitions else None
+
+
+def _no_options(prompt_lower):
+    return {}
+
+
+def _eye_options(prompt_lower):
+    # Determine if it has scanning effects
+    return {"has_scan": "scan" in prompt_lower or "tracking" in prompt_lower or "target" in prompt_lower}
+
+
+def _render_eye(palette, dominant_style, has_scan=False):
+    eye = Group(
+        # Eye outer shape
+        Ellipse(cx=0, cy=0, rx=60, ry=35, fill="#000000", stroke=palette["primary"], stroke_width=2),
+        # Iris
+        Circle(cx=0, cy=0, r=25, fill="url(#primaryGradient)", filter="url(#glow)"),
+        # Pupil
+        Circle(cx=0, cy=0, r=12, fill="#000000"),
+        # Tech details
+        Circle(cx=0, cy=0, r=18, fill="none", stroke=palette["accent"], stroke_width=0.8, stroke_dasharray="2,1"),
+        transform=_DESIGN_CENTER
+    )
+    if has_scan:
+        eye.append(
+            Line(x1=-40, y1=-10, x2=40, y2=-10, stroke=palette["accent"], stroke_width=1, opacity=0.7),
+            Line(x1=-40, y1=10, x2=40, y2=10, stroke=palette["accent"], stroke_width=1, opacity=0.7),
+            Path("M-40 0Q0-5 40 0", stroke=palette["secondary"], stroke_width=1, fill="none", opacity=0.8),
+            Path("M-40 0Q0 5 40 0", stroke=palette["secondary"], stroke_width=1, fill="none", opacity=0.8)
+        )
+    return eye
+
+
+def _render_circuit(palette, dominant_style):
+    # Variation depending on style
+    if dominant_style == "cyberpunk":
+        # Glowing tech circuit
+        return Group(
+            Rect(x=-70, y=-70, width=140, height=140, fill="none", stroke=palette["primary"], stroke_width=2),
+            Path("M-70-30H70M-70 0H70M-70 30H70", stroke=palette["accent"], stroke_width=1.5, stroke_dasharray="5,3"),
+            Path("M-30-70V70M0-70V70M30-70V70", stroke=palette["accent"], stroke_width=1.5, stroke_dasharray="5,3"),
+            Circle(cx=0, cy=0, r=20, fill="none", stroke=palette["secondary"], stroke_width=2),
+            Circle(cx=-30, cy=-30, r=5, fill=palette["primary"]),
+            Circle(cx=30, cy=-30, r=5, fill=palette["primary"]),
+            Circle(cx=-30, cy=30, r=5, fill=palette["primary"]),
+            Circle(cx=30, cy=30, r=5, fill=palette["primary"]),
+            Path("M-60-60L-40-40M60-60L40-40M-60 60L-40 40M60 60L40 40", stroke=palette["accent"], stroke_width=2),
+            transform=_DESIGN_CENTER
+        )
+    # Cleaner circuit design for other styles
+    return Group(
+        Rect(x=-60, y=-60, width=120, height=120, fill="none", stroke=palette["primary"], stroke_width=2, rx=5),
+        Circle(cx=0, cy=0, r=20, fill=palette["primary"], opacity=0.2),
+        Path("M-60-20H-20V-60M-60 20H-20V60M60-20H20V-60M60 20H20V60", fill="none", stroke=palette["primary"], stroke_width=1.5),
+        Rect(x=-10, y=-10, width=20, height=20, fill=palette["accent"]),
+        Circle(cx=-40, cy=-40, r=4, fill=palette["secondary"]),
+        Circle(cx=40, cy=-40, r=4, fill=palette["secondary"]),
+        Circle(cx=-40, cy=40, r=4, fill=palette["secondary"]),
+        Circle(cx=40, cy=40, r=4, fill=palette["secondary"]),
+        transform=_DESIGN_CENTER
+    )
+
+
+def _render_city(palette, dominant_style):
+    if dominant_style == "cyberpunk":
+        # Futuristic cyberpunk city
+        background, primary, secondary, accent = palette["background"], palette["primary"], palette["secondary"], palette["accent"]
+        return Group(
+            # Background atmosphere
+            Rect(width=DESIGN_SIZE, height=DESIGN_SIZE, fill="url(#primaryGradient)", opacity=0.3),
+            # Buildings
+            Rect(x=20, y=100, width=30, height=200, fill=background, stroke=primary, stroke_width=1),
+            Rect(x=60, y=150, width=40, height=150, fill=background, stroke=secondary, stroke_width=1),
+            Rect(x=110, y=80, width=20, height=220, fill=background, stroke=primary, stroke_width=1),
+            Rect(x=140, y=130, width=50, height=170, fill=background, stroke=accent, stroke_width=1),
+            Rect(x=200, y=100, width=35, height=200, fill=background, stroke=secondary, stroke_width=1),
+            Rect(x=245, y=120, width=25, height=180, fill=background, stroke=primary, stroke_width=1),
+            # Building windows
+            Group(
+                Rect(x=25, y=120, width=5, height=8, fill=accent, opacity=0.8),
+                Rect(x=35, y=120, width=5, height=8, fill=accent, opacity=0.8),
+                Rect(x=25, y=140, width=5, height=8, fill=accent, opacity=0.8),
+                Rect(x=35, y=140, width=5, height=8, fill=accent, opacity=0.5),
+                Rect(x=25, y=160, width=5, height=8, fill=accent, opacity=0.8),
+                Rect(x=35, y=160, width=5, height=8, fill=accent, opacity=0.5),
+                Rect(x=70, y=170, width=6, height=10, fill=primary, opacity=0.7),
+                Rect(x=84, y=170, width=6, height=10, fill=primary, opacity=0.7),
+                Rect(x=70, y=190, width=6, height=10, fill=primary, opacity=0.4),
+                Rect(x=84, y=190, width=6, height=10, fill=primary, opacity=0.7),
+                # More windows on other buildings
+                Rect(x=115, y=100, width=4, height=7, fill=secondary, opacity=0.6),
+                Rect(x=115, y=120, width=4, height=7, fill=secondary, opacity=0.6),
+                Rect(x=115, y=140, width=4, height=7, fill=secondary, opacity=0.6)
+            ),
+            # Flying vehicles if it's futuristic
+            Group(
+                Ellipse(cx=70, cy=80, rx=10, ry=3, fill=secondary, filter="url(#glow)", opacity=0.8),
+                Ellipse(cx=180, cy=50, rx=12, ry=4, fill=primary, filter="url(#glow)", opacity=0.8),
+                Ellipse(cx=240, cy=90, rx=8, ry=3, fill=accent, filter="url(#glow)", opacity=0.8)
+            )
+        )
+    # More conventional city skyline
+    primary = palette["primary"]
+    return Group(
+        # Sky
+        Rect(width=DESIGN_SIZE, height=DESIGN_SIZE, fill=palette["background"], opacity=0.4),
+        Rect(width=DESIGN_SIZE, height=DESIGN_SIZE / 2, fill=palette["secondary"], opacity=0.2),
+        # Buildings - simpler for non-cyberpunk
+        Rect(x=30, y=100, width=40, height=200, fill=primary, opacity=0.8),
+        Rect(x=80, y=140, width=30, height=160, fill=primary, opacity=0.7),
+        Rect(x=120, y=120, width=50, height=180, fill=primary, opacity=0.9),
+        Rect(x=180, y=150, width=45, height=150, fill=primary, opacity=0.8),
+        Rect(x=235, y=130, width=35, height=170, fill=primary, opacity=0.7),
+        # Details
+        Rect(x=110, y=90, width=10, height=30, fill=primary, opacity=0.9),
+        Path("M160 120L150 100L170 100Z", fill=primary, opacity=0.9)
+    )
+
+
+def _geometric_options(prompt_lower):
+    return {shape: shape in prompt_lower for shape in ("hexagon", "triangle", "circle")}
+
+
+def _render_geometric(palette, dominant_style, hexagon=False, triangle=False, circle=False):
+    transform = _DESIGN_CENTER
+    # Different geometric patterns based on style
+    if hexagon or dominant_style == "cyberpunk":
+        # Hexagonal Grid Pattern
+        return Group(
+            Path("M-50-87L0-100L50-87L50-50L0-37L-50-50Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            Path("M-50-13L0-26L50-13L50 24L0 37L-50 24Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            Path("M-50 61L0 48L50 61L50 98L0 111L-50 98Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            # Central element
+            Circle(cx=0, cy=0, r=30, fill="none", stroke=palette["secondary"], stroke_width=2),
+            Circle(cx=0, cy=0, r=20, fill="url(#primaryGradient)", opacity=0.7),
+            transform=transform
+        )
+    if triangle:
+        return Group(
+            Path("M0-70L60 40L-60 40Z", fill="none", stroke=palette["primary"], stroke_width=2),
+            Path("M0-40L35 22L-35 22Z", fill=palette["primary"], opacity=0.3),
+            Path("M0 70L-60-40L60-40Z", fill="none", stroke=palette["secondary"], stroke_width=2),
+            Path("M0 40L-35-22L35-22Z", fill=palette["secondary"], opacity=0.3),
+            transform=transform
+        )
+    if circle:
+        return Group(
+            Circle(cx=0, cy=0, r=60, fill="none", stroke=palette["primary"], stroke_width=2),
+            Circle(cx=0, cy=0, r=45, fill="none", stroke=palette["accent"], stroke_width=1, stroke_dasharray="4,2"),
+            Circle(cx=0, cy=0, r=30, fill=palette["secondary"], opacity=0.2),
+            Circle(cx=0, cy=0, r=15, fill=palette["primary"], opacity=0.5),
+            transform=transform
+        )
+    # Mixed Geometric Pattern
+    return Group(
+        Rect(x=-50, y=-50, width=100, height=100, fill="none", stroke=palette["primary"], stroke_width=2, rx=5),
+        Circle(cx=0, cy=0, r=30, fill="none", stroke=palette["secondary"], stroke_width=2),
+        Path("M-20-20L20-20L0 20Z", fill=palette["accent"], opacity=0.5),
+        transform=transform
+    )
+
+
+# Largest tooth and point counts accepted from a prompt
+MAX_GEAR_TEETH = 500
+MAX_STAR_POINTS = 200
+
+
+def _gear_options(prompt_lower):
+    num_teeth = 8
+    if "teeth" in prompt_lower:
+        teeth_match = re.search(r'(\d+)\s*teeth', prompt_lower)
+        if teeth_match:
+            try:
+                parsed_teeth = int(teeth_match.group(1))
+                if 4 <= parsed_teeth <= MAX_GEAR_TEETH:
+                    num_teeth = parsed_teeth
+            except ValueError:
+                pass # Ignore if parsing fails to keep default
+    return {"num_teeth": num_teeth}
+
+
+def _render_gear(palette, dominant_style, num_teeth=8):
+    outer_radius = DESIGN_SIZE * 0.30 # Slightly smaller for better fit
+    hole_radius = outer_radius * 0.25
+    tooth_height = outer_radius * 0.20 # Height of the tooth from its base
+    center = DESIGN_SIZE / 2
+
+    # Central hole (drawn as a separate sub-path for fill-rule to work)
+    r, y = format_number(hole_radius), format_number(center)
+    right, left = format_number(center + hole_radius), format_number(center - hole_radius)
+    hole = f"M{right},{y}A{r},{r} 0 1 0 {left},{y}A{r},{r} 0 1 0 {right},{y}Z"
+
+    from svg_geometry import gear_outline
+
+    return Group(Path(
+        gear_outline(num_teeth, outer_radius, tooth_height, (center, center)) + hole,
+        fill=palette["primary"], stroke=palette["secondary"], stroke_width=1.5, fill_rule="evenodd"
+    ))
+
+
+def _render_arrow(palette, dominant_style):
+    arrow_length = DESIGN_SIZE * 0.6
+    arrow_head_size = arrow_length * 0.25
+    stroke_w = max(2, arrow_length * 0.05)
+    head_x = format_number(arrow_length - arrow_head_size)
+    head_y = format_number(arrow_head_size * 0.7)
+    return Group(
+        Line(x1=0, y1=0, x2=arrow_length - arrow_head_size, y2=0),
+        Polygon(f"{head_x},-{head_y} {format_number(arrow_length)},0 {head_x},{head_y}"),
+        transform=_translate(DESIGN_SIZE / 2 - arrow_length / 2, DESIGN_SIZE / 2),
+        fill=palette["primary"], stroke=palette["secondary"], stroke_width=stroke_w
+    )
+
+
+def _render_cloud(palette, dominant_style):
+    center_x, center_y = DESIGN_SIZE / 2, DESIGN_SIZE / 2
+    cloud_w = DESIGN_SIZE * 0.5
+    cloud_h = cloud_w * 0.6
+    # Simple cloud made of overlapping circles
+    cloud = Group(Group(
+        Circle(cx=cloud_w * 0.3, cy=cloud_h * 0.6, r=cloud_w * 0.25),
+        Circle(cx=cloud_w * 0.5, cy=cloud_h * 0.4, r=cloud_w * 0.3),
+        Circle(cx=cloud_w * 0.7, cy=cloud_h * 0.7, r=cloud_w * 0.28),
+        Rect(x=cloud_w * 0.2, y=cloud_h * 0.5, width=cloud_w * 0.6, height=cloud_h * 0.4, rx=5),
+        transform=_translate(center_x - cloud_w / 2, center_y - cloud_h / 2),
+        fill=palette["primary"], opacity=0.8 if dominant_style != "flatdesign" else 1
+    ))
+    if dominant_style == "nature":
+        cloud.append(Path(
+            f"M{format_number(center_x - cloud_w * 0.2)} {format_number(center_y + cloud_h * 0.3)}"
+            f"Q{format_number(center_x)} {format_number(center_y + cloud_h * 0.4)} "
+            f"{format_number(center_x + cloud_w * 0.2)} {format_number(center_y + cloud_h * 0.3)}",
+            stroke=palette["secondary"], stroke_width=2, fill="none", opacity=0.5
+        ))
+    return cloud
+
+
+def _heart_path(heart_size: float) -> str:
+    r = format_number(heart_size * 0.2)
+    top = format_number(-heart_size * 0.4)
+    peak = format_number(-heart_size * 0.6)
+    lobe = format_number(heart_size * 0.2)
+    side = format_number(heart_size * 0.4)
+    return (f"M0,{top}A{r},{r} 0 0,1 {lobe},{peak}A{r},{r} 0 0,1 {side},{top}"
+            f"L0,{side}L-{side},{top}A{r},{r} 0 0,1 -{lobe},{peak}A{r},{r} 0 0,1 0,{top}Z")
+
+
+def _render_heart(palette, dominant_style):
+    center_x, center_y = DESIGN_SIZE / 2, DESIGN_SIZE / 2
+    heart_size = DESIGN_SIZE * 0.4
+    heart_path = _heart_path(heart_size)
+    heart = Group(Group(
+        Path(heart_path, fill=palette["primary"], stroke=palette["secondary"], stroke_width=1.5),
+        transform=_translate(center_x, center_y - heart_size * 0.1)
+    ))
+    if dominant_style == "retro":
+        heart.append(Path(
+            heart_path, transform=_translate(center_x + heart_size * 0.05, center_y - heart_size * 0.05),
+            fill=palette["accent"], opacity=0.3
+        ))
+    return heart
+
+
+def _star_options(prompt_lower):
+    num_points = 5
+    if "point" in prompt_lower:
+        # "7 points", "7 pointed star", "200-point starburst"
+        star_match = re.search(r'(\d+)[\s-]*point(?:s|ed)?\b', prompt_lower)
+        if star_match:
+            try: parsed_points = int(star_match.group(1)); num_points = max(3, min(MAX_STAR_POINTS, parsed_points))
+            except ValueError: pass
+    return {"num_points": num_points, "sparkle": "sparkle" in prompt_lower}
+
+
+def _render_star(palette, dominant_style, num_points=5, sparkle=False):
+    center_x, center_y = DESIGN_SIZE / 2, DESIGN_SIZE / 2
+
+    outer_r = DESIGN_SIZE * 0.3
+    inner_r = outer_r * (0.382 if num_points == 5 else 0.5) # Golden ratio for 5-point star, 0.5 for others
+    from svg_geometry import star_points
+
+    points = star_points(num_points, outer_r, inner_r, (center_x, center_y))
+
+    star = Group(Polygon(points, fill=palette["primary"], stroke=palette["secondary"], stroke_width=1.5))
+    if dominant_style == "fantasy" or sparkle:
+        star.append(Polygon(
+            points, fill="none", stroke=palette["accent"], stroke_width=3, filter="url(#glow)", opacity=0.5,
+            transform="scale(0.95)", transform_origin=f"{format_number(center_x)} {format_number(center_y)}"
+        ))
+    return star
+
+
+def _render_abstract(palette, dominant_style):
+    transform = _DESIGN_CENTER
+    # Different abstract styles based on dominant style
+    if dominant_style == "cyberpunk":
+        return Group(
+            # Hexagonal grid pattern
+            Path("M-50-87L0-100L50-87L50-50L0-37L-50-50Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            Path("M-50-13L0-26L50-13L50 24L0 37L-50 24Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            Path("M-50 61L0 48L50 61L50 98L0 111L-50 98Z", fill="none", stroke=palette["primary"], stroke_width=2, opacity=0.8),
+            # Central circular element
+            Circle(cx=0, cy=0, r=40, fill="none", stroke=palette["secondary"], stroke_width=3, stroke_dasharray="1,1"),
+            Circle(cx=0, cy=0, r=30, fill="none", stroke=palette["accent"], stroke_width=2),
+            Circle(cx=0, cy=0, r=20, fill="url(#primaryGradient)", filter="url(#glow)"),
+            # Decorative lines
+            Path("M-100 0L-50 0M50 0L100 0M0-100L0-50M0 50L0 100", stroke=palette["accent"], stroke_width=2, opacity=0.8),
+            transform=transform
+        )
+    if dominant_style == "minimalist":
+        return Group(
+            Rect(x=-40, y=-40, width=80, height=80, fill="none", stroke=palette["primary"], stroke_width=2),
+            Circle(cx=0, cy=0, r=25, fill=palette["accent"], opacity=0.8),
+            Line(x1=-60, y1=-60, x2=60, y2=60, stroke=palette["primary"], stroke_width=1.5),
+            Line(x1=-60, y1=60, x2=60, y2=-60, stroke=palette["primary"], stroke_width=1.5),
+            transform=transform
+        )
+    if dominant_style == "retro":
+        return Group(
+            Rect(x=-50, y=-50, width=100, height=100, fill=palette["secondary"], stroke=palette["primary"], stroke_width=4),
+            Circle(cx=0, cy=0, r=30, fill=palette["primary"]),
+            Path("M-30-30L30 30M-30 30L30-30", stroke=palette["accent"], stroke_width=5),
+            transform=transform, filter="url(#pixelate)"
+        )
+    if dominant_style == "artdeco":
+        from svg_geometry import sunburst_path
+
+        half_w, half_h = DESIGN_SIZE * 0.3, DESIGN_SIZE * 0.3
+        group = Group(
+            # Symmetrical background lines
+            Path(f"M{format_number(-DESIGN_SIZE * 0.4)} 0L{format_number(DESIGN_SIZE * 0.4)} 0"
+                 f"M0 {format_number(-DESIGN_SIZE * 0.4)}L0 {format_number(DESIGN_SIZE * 0.4)}",
+                 stroke=palette["secondary"], stroke_width=1, opacity=0.5),
+            Rect(x=-half_w, y=-half_h, width=DESIGN_SIZE * 0.6, height=DESIGN_SIZE * 0.6, fill="none", stroke=palette["primary"], stroke_width=3, rx=5),
+            transform=transform
+        )
+        group.append(
+            # Sunburst/Radiating lines from center
+            Path(sunburst_path(12, DESIGN_SIZE * 0.35), stroke=palette["accent"], stroke_width=1.5, opacity=0.7),
+            Circle(cx=0, cy=0, r=DESIGN_SIZE * 0.1, fill=palette["primary"], stroke=palette["accent"], stroke_width=2),
+            Circle(cx=0, cy=0, r=DESIGN_SIZE * 0.05, fill=palette["background"]),
+            # Corner Elements
+            Rect(x=-half_w + 5, y=-half_h + 5, width=15, height=15, fill=palette["accent"], opacity=0.6),
+            Rect(x=half_w - 20, y=-half_h + 5, width=15, height=15, fill=palette["accent"], opacity=0.6),
+            Rect(x=-half_w + 5, y=half_h - 20, width=15, height=15, fill=palette["accent"], opacity=0.6),
+            Rect(x=half_w - 20, y=half_h - 20, width=15, height=15, fill=palette["accent"], opacity=0.6)
+        )
+        return group
+    # Generic Abstract Design
+    return Group(
+        Path("M-50-50C-30-70,30-70,50-50C70-30,70 30,50 50C30 70,-30 70,-50 50C-70 30,-70-30,-50-50Z",
+             fill="none", stroke=palette["primary"], stroke_width=2),
+        Circle(cx=0, cy=0, r=30, fill=palette["secondary"], opacity=0.3),
+        Path("M-25 0A25 25 0 0 0 25 0", fill="none", stroke=palette["accent"], stroke_width=2),
+        Path("M-25 0A25 25 0 0 1 25 0", fill="none", stroke=palette["accent"], stroke_width=2),
+        transform=transform
+    )
+
+
+# Object renderers and their option parsers, in priority order. Every detected
+# object is drawn, each in its own part of the canvas (see `_compose_scene`),
+# and the abstract design is the default if no specific object is detected
+OBJECT_RENDERERS = (
+    ("eye", _render_eye, _eye_options),
+    ("circuit", _render_circuit, _no_options),
+    ("city", _render_city, _no_options),
+    ("geometric", _render_geometric, _geometric_options),
+    ("gear", _render_gear, _gear_options),
+    ("arrow", _render_arrow, _no_options),
+    ("cloud", _render_cloud, _no_options),
+    ("heart", _render_heart, _no_options),
+    ("star", _render_star, _star_options),
+)
+DEFAULT_RENDERER = ("abstract", _render_abstract, _no_options)
+
+# Palette entries a renderer can use, in the order they are passed to _render_object
+PALETTE_SLOTS = ("primary", "secondary", "accent", "background", "text")
+_SLOT_PALETTE = {name: slot(name) for name in PALETTE_SLOTS}
+
+
+# Object names by renderer; each object's repeated shapes are defined under ids
+# starting with its name (see svg_dedup.py), so objects in one scene never clash
+_RENDERER_NAMES = {render: name for name, render, _ in OBJECT_RENDERERS + (DEFAULT_RENDERER,)}
+
+
+def _compile_object(render, dominant_style, options) -> Template:
+    """Renders an object with palette slots, stores its repeated shapes once and compiles it."""
+    drawing = render(_SLOT_PALETTE, dominant_style, **dict(options))
+    return Template(deduplicate(drawing, f"{_RENDERER_NAMES[render]}-"))
+
+
+@functools.lru_cache(maxsize=512)
+def _object_template(render, dominant_style, options) -> Template:
+    """Compiles a renderer's output for one set of non-color inputs, with palette slots."""
+    template = _snapshot_templates().get((render.__name__, dominant_style, options))
+    if template is None:
+        template = _compile_object(render, dominant_style, options)
+    return template
+
+
+@functools.lru_cache(maxsize=2048)
+def _render_object(render, dominant_style, options, colors) -> Fragment:
+    """
+    Renders an object by filling its compiled template with palette colors.
+
+    Args:
+        render: The object renderer
+        dominant_style: The detected style
+        options: The renderer's options as sorted (name, value) pairs
+        colors: The palette colors, in PALETTE_SLOTS order
+
+    Returns:
+        The rendered object in design coordinates, memoized per template and
+        palette; the same markup serves every document size
+    """
+    template = _object_template(render, dominant_style, options)
+    return template.fill(dict(zip(PALETTE_SLOTS, colors)))
+# --- END OBJECT RENDERERS ---
+
+# --- BEGIN STARTUP SNAPSHOT ---
+# A new process compiles object templates as prompts need them. With SVG_MCP_SNAPSHOT
+# pointing at a file written by "--build-snapshot", the templates of every object
+# and style with default options are loaded from it instead, so the first requests
+# of a session skip rendering (and importing NumPy for gears and stars). The file is
+# tied to the sources that wrote it and ignored once they change.
+SNAPSHOT_PATH = os.environ.get("SVG_MCP_SNAPSHOT")
+_SNAPSHOT_SOURCES = ("svg_mcp_server.py", "svg_scene.py", "svg_geometry.py", "svg_dedup.py")
+
+
+def _snapshot_key() -> str:
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return snapshot_key([os.path.join(directory, name) for name in _SNAPSHOT_SOURCES], CACHE_FORMAT_VERSION)
+
+
+def _snapshot_option_sets(parse_options) -> List[Tuple[Tuple[str, Any], ...]]:
+    """A renderer's default options, once with every combination of its on/off flags."""
+    defaults = parse_options("")
+    flags = [name for name, value in defaults.items() if isinstance(value, bool)]
+    return [
+        tuple(sorted({**defaults, **dict(zip(flags, values))}.items()))
+        for values in itertools.product((False, True), repeat=len(flags))
+    ]
+
+
+def build_snapshot(path: str) -> int:
+    """
+    Writes the templates of every object and style, with default options, to a snapshot file.
+
+    Args:
+        path: The file to write
+
+    Returns:
+        The number of templates written
+    """
+    templates = []
+    for _, render, parse_options in OBJECT_RENDERERS + (DEFAULT_RENDERER,):
+        for options in _snapshot_option_sets(parse_options):
+            for style in _STYLE_ORDER:
+                template = _compile_object(render, style, options)
+                templates.append([render.__name__, style, options, template.parts, sorted(template.references)])
+    write_snapshot(path, _snapshot_key(), {"object_templates": templates})
+    return len(templates)
+
+
+@functools.lru_cache(maxsize=1)
+def _snapshot_templates() -> Dict[Tuple[str, str, Tuple[Tuple[str, Any], ...]], Template]:
+    """Object templates from the snapshot file, keyed by renderer name, style and options."""
+    if not SNAPSHOT_PATH:
+        return {}
+    tables = load_snapshot(SNAPSHOT_PATH, _snapshot_key())
+    if tables is None:
+        print(f"--- SVG MCP Server: Snapshot {SNAPSHOT_PATH} is missing or stale, ignoring it ---", file=sys.stderr)
+        return {}
+    return {
+        (name, style, tuple(tuple(option) for option in options)): Template.from_parts(parts, references)
+        for name, style, options, parts, references in tables["object_templates"]
+    }
+# --- END STARTUP SNAPSHOT ---
+
+
+_EMPTY_FRAGMENT = Fragment("")
+
+# Multi-object scenes are laid out above the caption bar, with this much space
+# between objects and around the edges
+SCENE_CAPTION_HEIGHT = 35
+SCENE_GAP = 10
+
+
+@functools.lru_cache(maxsize=256)
+def _scene_boxes(count: int, svg_width: int, svg_height: int) -> Tuple[Box, ...]:
+    region = Box(0, 0, svg_width, svg_height - SCENE_CAPTION_HEIGHT).inset(SCENE_GAP / 2)
+    return tuple(partition([1] * count, region, SCENE_GAP))
+
+
+def _place_object(drawing: Fragment, box: Box) -> Node:
+    """
+    Scales a drawing from design coordinates to fit a box of the canvas, centered.
+
+    The drawing's markup is used as is, inside a single transformed group; it
+    is returned unchanged when the box is the design box itself.
+    """
+    x, y, scale = fit(box, DESIGN_SIZE, DESIGN_SIZE)
+    if x == 0 and y == 0 and scale == 1:
+        return drawing
+    return Group(drawing, transform=f"{_translate(x, y)} scale({scale:.4g})")
+
+
+def _compose_scene(drawings: List[Fragment], svg_width: int, svg_height: int) -> Node:
+    """
+    Lays out several drawings side by side.
+
+    Every drawing gets its own box of the canvas and is scaled uniformly to
+    fit it, so objects never overlap.
+
+    Args:
+        drawings: The rendered objects, in priority order
+        svg_width: Width of the document
+        svg_height: Height of the document
+
+    Returns:
+        The composed drawing
+    """
+    boxes = _scene_boxes(len(drawings), svg_width, svg_height)
+    return Group(*(_place_object(drawing, box) for drawing, box in zip(drawings, boxes)))
+
+
+@functools.lru_cache(maxsize=256)
+def _document_template(svg_width: int, svg_height: int, has_pattern: bool, has_glitch: bool, has_glow: bool) -> Template:
+    """
+    Compiles the document around the drawing for one size and set of effects.
+
+    The title, caption and palette colors are slots, as are the defs section
+    and the drawing, which are filled in with pre-rendered fragments.
+    """
+    document = Svg(
+        svg_width, svg_height,
+        Text(slot("title"), tag="title"),
+        Fragment(slot("defs")),
+        # Add background
+        Rect(width=svg_width, height=svg_height, fill=slot("background"))
+    )
+    if has_pattern:
+        document.append(Rect(width=svg_width, height=svg_height, fill="url(#bgPattern)", opacity=0.3))
+    document.append(Fragment(slot("drawing")))
+    if has_glitch:
+        document.append(Rect(width=svg_width, height=svg_height, fill="none", stroke="none", filter="url(#glitchEffect)", opacity=0.7))
+    if has_glow:
+        document.append(Rect(x=30, y=30, width=svg_width - 60, height=svg_height - 60, fill="none", stroke=slot("accent"), stroke_width=2, filter="url(#glow)", opacity=0.7))
+    document.append(
+        Rect(x=10, y=svg_height - 35, width=svg_width - 20, height=25, fill="#000000", opacity=0.6, rx=3),
+        Text(slot("caption"), x="50%", y=svg_height - 22.5, dominant_baseline="middle",
+             text_anchor="middle", font_family="monospace", font_size="11px", fill=slot("text"))
+    )
+    return Template(document)
+
+
+def _prepare_svg(prompt: str, svg_width: int, svg_height: int) -> Tuple[Template, Dict[str, Any], Dict[str, Any]]:
+    """
+    Analyzes a prompt and renders its parts, short of joining them into a document.
+
+    Args:
+        prompt: The textual prompt to generate the SVG from.
+        svg_width: Width of the generated document
+        svg_height: Height of the generated document
+
+    Returns:
+        The document template, the values filling it, and the result fields
+        describing the drawing (detected style, objects and filters)
+    """
+    # Extract style keywords from prompt
+    prompt_lower = prompt.lower()
+    
+    # STYLE DETERMINATION - every style is scored in one pass over the prompt
+    matched_terms = _match_prompt_terms(prompt_lower)
+    dominant_style = _classify_style(matched_terms)
+    
+    # Set the color palette based on the dominant style
+    palette = dict(COLOR_PALETTES[dominant_style])
+    
+    # Override palette colors with the colors the prompt mentions, bound to the
+    # role keyword ("background", "primary", ...) nearest to each
+    palette.update(find_color_roles(prompt_lower))
+    
+    # Extract potential shapes or objects from prompt
+    common_objects = _detect_objects(matched_terms)
+    
+    # Generate content based on detected objects and style
+    objects = [(name, render, options) for name, render, options in OBJECT_RENDERERS if common_objects[name]]
+    if not objects:
+        objects = [DEFAULT_RENDERER]
+    colors = tuple(palette[name] for name in PALETTE_SLOTS)
+    drawings = [
+        _render_object(render, dominant_style, tuple(sorted(parse_options(prompt_lower).items())), colors)
+        for _, render, parse_options in objects
+    ]
+    if len(drawings) == 1:
+        drawing = _place_object(drawings[0], Box(0, 0, svg_width, svg_height))
+    else:
+        drawing = _compose_scene(drawings, svg_width, svg_height)
+    
+    document = _document_template(
+        svg_width, svg_height,
+        # For abstract/pattern designs, add background patterns
+        dominant_style in ["abstract", "cyberpunk", "retro"],
+        # Add supplementary effects based on prompt
+        "glitch" in prompt_lower or "distorted" in prompt_lower,
+        "glow" in prompt_lower or "neon" in prompt_lower
+    )
+    
+    # Add style info at the bottom
+    caption_text = prompt
+    max_caption_len = int((svg_width - 60) / 7) # Approximate chars based on font size and rect width
+    if len(caption_text) > max_caption_len:
+        caption_text = caption_text[:max_caption_len-3] + "..."
+    
+    # Emit only the reusable definitions something points at
+    used_ids = document.references | collect_references(drawing)
+    defs = _render_defs(used_ids, palette["primary"], palette["secondary"], palette["background"])
+    
+    values = {
+        "title": f"Generated from: {prompt}",
+        "defs": defs or _EMPTY_FRAGMENT,
+        "drawing": drawing,
+        "caption": f"{caption_text} [{dominant_style}]",
+        **palette
+    }
+    return document, values, {
+        "detected_style": dominant_style,
+        "objects": [name for name, _, _ in objects],
+        "filters": [def_id for def_id, _ in DEF_BUILDERS if def_id in used_ids and def_id in FILTER_DEF_IDS]
+    }
+
+
+def _generate_svg(prompt: str, svg_width: int = 300, svg_height: int = 300) -> Dict[str, Any]:
+    """
+    Renders the SVG for a prompt. This is the synchronous core of `generate_svg_from_prompt`.
+
+    The output depends only on the arguments, which is what makes results cacheable.
+
+    Args:
+        prompt: The textual prompt to generate the SVG from.
+        svg_width: Width of the generated document
+        svg_height: Height of the generated document
+
+    Returns:
+        A dictionary containing the success status and the generated SVG code.
+    """
+    document, values, info = _prepare_svg(prompt, svg_width, svg_height)
+    return {"success": True, "svg_code": document.fill(values).markup, **info}
+
+# --- BEGIN GENERATION EXECUTOR ---
+# Generation and optimization are CPU-bound, so they run in an executor instead of
+# on the event loop, where they would stall every other request. The static tools
+# stay inline. SVG_MCP_EXECUTOR picks a "thread" or "process" pool of
+# SVG_MCP_EXECUTOR_WORKERS workers; at most SVG_MCP_MAX_CONCURRENCY jobs are in
+# flight, and a request gives up after SVG_MCP_GENERATION_TIMEOUT seconds (0 disables).
+GENERATION_EXECUTOR = os.environ.get("SVG_MCP_EXECUTOR", "thread")
+GENERATION_WORKERS = int(os.environ.get("SVG_MCP_EXECUTOR_WORKERS", 0)) or os.cpu_count() or 1
+GENERATION_MAX_CONCURRENCY = int(os.environ.get("SVG_MCP_MAX_CONCURRENCY", 0)) or 2 * GENERATION_WORKERS
+GENERATION_TIMEOUT = float(os.environ.get("SVG_MCP_GENERATION_TIMEOUT", 30))
+
+_generation_executor: Optional[Executor] = None
+_generation_slots = asyncio.Semaphore(GENERATION_MAX_CONCURRENCY)
+
+
+def _get_generation_executor() -> Executor:
+    """Returns the shared generation executor, creating it on first use."""
+    global _generation_executor
+    if _generation_executor is None:
+        if GENERATION_EXECUTOR == "process":
+            _generation_executor = ProcessPoolExecutor(max_workers=GENERATION_WORKERS)
+        else:
+            _generation_executor = ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="svg-generation")
+    return _generation_executor
+
+
+async def _run_generation(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs CPU-bound work in the generation executor.
+
+    The deadline covers both waiting for a free slot and the work itself. A
+    job that has already started keeps its worker busy until it finishes, but
+    the request returns as soon as the deadline passes.
+
+    Args:
+        func: A picklable module-level function (required for the process pool)
+        *args: Arguments for `func`
+
+    Returns:
+        The return value of `func`
+
+    Raises:
+        asyncio.TimeoutError: If the deadline passes first
+    """
+    async def run():
+        async with _generation_slots:
+            return await asyncio.get_running_loop().run_in_executor(_get_generation_executor(), func, *args)
+    return await asyncio.wait_for(run(), GENERATION_TIMEOUT or None)
+
+
+async def _run_generation_chunks(executor: Executor, func: Callable[[Any], Any], chunks: List[Any]) -> List[Any]:
+    """
+    Runs CPU-bound work over several chunks in a given executor, such as the batch pool.
+
+    Each chunk takes a generation slot while it runs, so concurrent requests
+    together stay within SVG_MCP_MAX_CONCURRENCY, and one deadline covers the
+    whole call. When it passes, chunks still waiting for a slot are never
+    submitted and submitted ones that have not started are cancelled.
+
+    Args:
+        executor: The executor to run the chunks in
+        func: A picklable module-level function taking one chunk
+        chunks: The chunks, one call of `func` each
+
+    Returns:
+        The return values of `func`, in chunk order
+
+    Raises:
+        asyncio.TimeoutError: If the deadline passes first
+    """
+    submitted = []
+
+    async def run(chunk):
+        async with _generation_slots:
+            future = executor.submit(func, chunk)
+            submitted.append(future)
+            return await asyncio.wrap_future(future)
+
+    try:
+        return await asyncio.wait_for(asyncio.gather(*(run(chunk) for chunk in chunks)), GENERATION_TIMEOUT or None)
+    except asyncio.TimeoutError:
+        for future in submitted:
+            future.cancel()
+        raise
+
+
+def _timeout_error() -> str:
+    return f"Generation timed out after {GENERATION_TIMEOUT:g} seconds"
+# --- END GENERATION EXECUTOR ---
+
+# --- BEGIN RASTERIZATION ---
+# PNGs are rendered by a bounded pool of renderer processes (see svg_raster.py)
+# and cached by SVG hash and output size. PNGs written to files go to a
+# size-capped content-addressed store (see svg_artifacts.py), configured by
+# SVG_MCP_RASTER_DIR and SVG_MCP_RASTER_MAX_BYTES.
+svg_rasterizer = SVGRasterizer.from_env()
+svg_raster_cache = SVGResultCache.from_env("SVG_MCP_RASTER_CACHE", max_entries=64, max_bytes=64 * 1024 * 1024)
+svg_png_files = ArtifactStore.from_env("SVG_MCP_RASTER", default_dir="svg-mcp-png", suffix=".png")
+
+
+async def _rasterize(svg_code: str, width: Optional[int], height: Optional[int], output: str) -> Dict[str, Any]:
+    """
+    Renders SVG markup to PNG, serving repeated renders from the raster cache.
+
+    Args:
+        svg_code: The SVG markup to render
+        width: Output width in pixels, or None to derive it from the document
+        height: Output height in pixels, or None to derive it from the document
+        output: "base64" to inline the PNG, or "path" to write it to the PNG file store
+
+    Returns:
+        The output size, the PNG size in bytes and either `png_base64` or `path`
+
+    Raises:
+        RasterizationError: If the SVG cannot be rendered
+    """
+    png_width, png_height = resolve_output_size(svg_code, width, height)
+    svg_rasterizer.check_size(png_width, png_height)
+
+    cache_key = make_cache_key(
+        svg_sha256=hashlib.sha256(svg_code.encode("utf-8")).hexdigest(), width=png_width, height=png_height
+    )
+    raster = svg_raster_cache.get(cache_key)
+    if raster is None:
+        png = await svg_rasterizer.render(svg_code, png_width, png_height)
+        raster = {"png_base64": base64.b64encode(png).decode("ascii"), "png_bytes": len(png)}
+        svg_raster_cache.put(cache_key, raster)
+
+    result = {"width": png_width, "height": png_height, "png_bytes": raster["png_bytes"]}
+    if output == "path":
+        try:
+            digest = await asyncio.to_thread(svg_png_files.put, base64.b64decode(raster["png_base64"]))
+        except OSError as e:
+            raise RasterizationError(f"Could not write the PNG to {svg_png_files.root}: {e}") from e
+        result["path"] = svg_png_files.path(digest)
+    else:
+        result["png_base64"] = raster["png_base64"]
+    return result
+# --- END RASTERIZATION ---
+
+# --- BEGIN ARTIFACTS ---
+# With output="uri", generated documents are written to a content-addressed
+# store on disk (see svg_artifacts.py) and results carry an svg://<sha256> URI
+# instead of the markup; the svg:// resource template serves the bytes.
+svg_artifacts = ArtifactStore.from_env()
+
+
+def _store_artifact(svg_code: str) -> Dict[str, Any]:
+    """Writes a document to the artifact store and returns the result fields that point at it."""
+    data = svg_code.encode("utf-8")
+    digest = svg_artifacts.put(data)
+    return {"svg_uri": artifact_uri(digest), "sha256": digest, "svg_bytes": len(data)}
+# --- END ARTIFACTS ---
+
+def _generate_svg_result(prompt: str, svg_width: int, svg_height: int, optimize: bool) -> Dict[str, Any]:
+    """Renders a prompt and, if requested, optimizes the result. Runs in the generation executor."""
+    result = _generate_svg(prompt, svg_width, svg_height)
+    if optimize:
+        from svg_optimizer import optimize_svg as _optimize_svg_markup
+
+        optimized = _optimize_svg_markup(result["svg_code"])
+        result["svg_code"] = optimized.pop("svg_code")
+        result["optimization"] = optimized
+    return result
+
+# --- BEGIN STREAMING ---
+# With stream=True, the SVG is sent to the client as MCP progress notifications,
+# one SVG_MCP_STREAM_CHUNK_SIZE-character chunk per notification message, instead
+# of inside the result. Fresh renders are serialized piece by piece as they are
+# sent, so the whole document is never held as one string (nor cached).
+STREAM_CHUNK_SIZE = int(os.environ.get("SVG_MCP_STREAM_CHUNK_SIZE", 16384))
+
+
+def _progress_token(ctx: Context) -> Any:
+    """Returns the progress token the client sent with the request, or None."""
+    meta = getattr(ctx.request_context, "meta", None)
+    if isinstance(meta, dict): # Newer FastMCP exposes the raw _meta block
+        return meta.get("progressToken")
+    return getattr(meta, "progressToken", None)
+
+
+async def _stream_chunks(ctx: Context, chunks: Iterable[str]) -> Dict[str, int]:
+    """
+    Sends markup to the client as progress notifications, one chunk per message.
+
+    The progress value is the number of characters sent so far; no total is
+    given, since it is not known until the last chunk.
+
+    Args:
+        ctx: The MCP context of the request
+        chunks: The markup, in order
+
+    Returns:
+        The number of chunks, characters and UTF-8 bytes sent
+    """
+    count = sent = sent_bytes = 0
+    for chunk in chunks:
+        count += 1
+        sent += len(chunk)
+        sent_bytes += len(chunk) if chunk.isascii() else len(chunk.encode("utf-8"))
+        await ctx.report_progress(sent, None, chunk)
+    return {"chunks": count, "chars": sent, "bytes": sent_bytes}
+# --- END STREAMING ---
+
+@mcp.tool()
+@tool_metrics.instrument
+async def generate_svg_from_prompt(ctx: Context, prompt: str, optimize: bool = False, format: str = "svg",
+                                   stream: bool = False, output: str = "inline") -> Dict[str, Any]:
+    """
+    Generates a basic SVG image based on a textual prompt.
+
+    This is a simplified version for demonstration. In a real scenario, 
+    this would involve a more complex AI model to convert text to a rich SVG.
+    Results are cached, so repeated prompts are served without re-rendering.
+    
+    Args:
+        ctx: The MCP context
+        prompt: The textual prompt to generate the SVG from.
+        optimize: Run the result through `optimize_svg` and report its size before and after
+        format: "svg", or "png" to also return the image rendered as base64-encoded PNG
+        stream: Send the SVG in chunks as progress notification messages instead of in
+                the result, which then reports the chunk and character counts under
+                "streamed". Requires a progress token; without one the SVG is returned as usual.
+        output: "inline" to return the SVG code in the result, or "uri" to store it on the
+                server and return an svg://<sha256> resource URI to read it from instead
+        
+    Returns:
+        A dictionary containing the success status and the generated SVG code.
+    """
+    await ctx.info(f"Generating SVG from prompt: {prompt[:50]}...") # Log a snippet of the prompt
+
+    if format not in ("svg", "png"):
+        return {
+            "success": False,
+            "error": f"Unknown format: {format}. Use 'svg' or 'png'",
+            "svg_code": None
+        }
+    if stream and format != "svg":
+        return {
+            "success": False,
+            "error": "Streaming is only available for SVG output",
+            "svg_code": None
+        }
+    if output not in ("inline", "uri"):
+        return {
+            "success": False,
+            "error": f"Unknown output: {output}. Use 'inline' or 'uri'",
+            "svg_code": None
+        }
+    if stream and output == "uri":
+        return {
+            "success": False,
+            "error": "Streaming cannot be combined with URI output",
+            "svg_code": None
+        }
+    if stream and _progress_token(ctx) is None:
+        await ctx.info("No progress token to stream to; returning the SVG in the result")
+        stream = False
+
+    # These variables will be used to customize the SVG based on the prompt analysis
+    svg_width = 300
+    svg_height = 300
     
-    # Circuit design
-    elif common_objects["circuit"]:
-        # Variation depending on style
-        if dominant_style == "cyberpunk":
-            # Glowing tech circuit
-            svg_parts.append(f'''
-            <!-- Circuit design -->
-            <g transform="translate({center_x}, {center_y})">
-                <rect x="-70" y="-70" width="140" height="140" fill="none" stroke="{palette['primary']}" stroke-width="2"/>
-                <path d="M-70 -30 H70 M-70 0 H70 M-70 30 H70" stroke="{palette['accent']}" stroke-width="1.5" stroke-dasharray="5,3"/>
-                <path d="M-30 -70 V70 M0 -70 V70 M30 -70 V70" stroke="{palette['accent']}" stroke-width="1.5" stroke-dasharray="5,3"/>
-                <circle cx="0" cy="0" r="20" fill="none" stroke="{palette['secondary']}" stroke-width="2"/>
-                <circle cx="-30" cy="-30" r="5" fill="{palette['primary']}"/>
-                <circle cx="30" cy="-30" r="5" fill="{palette['primary']}"/>
-                <circle cx="-30" cy="30" r="5" fill="{palette['primary']}"/>
-                <circle cx="30" cy="30" r="5" fill="{palette['primary']}"/>
-                <path d="M-60 -60 L-40 -40 M60 -60 L40 -40 M-60 60 L-40 40 M60 60 L40 40" stroke="{palette['accent']}" stroke-width="2"/>
-            </g>''')
-        else:
-            # Cleaner circuit design for other styles
-            svg_parts.append(f'''
-            <!-- Circuit design - clean -->
-            <g transform="translate({center_x}, {center_y})">
-                <rect x="-60" y="-60" width="120" height="120" fill="none" stroke="{palette['primary']}" stroke-width="2" rx="5"/>
-                <circle cx="0" cy="0" r="20" fill="{palette['primary']}" opacity="0.2"/>
-                <path d="M-60 -20 H-20 V-60 M-60 20 H-20 V60 M60 -20 H20 V-60 M60 20 H20 V60" 
-                      fill="none" stroke="{palette['primary']}" stroke-width="1.5"/>
-                <rect x="-10" y="-10" width="20" height="20" fill="{palette['accent']}"/>
-                <circle cx="-40" cy="-40" r="4" fill="{palette['secondary']}"/>
-                <circle cx="40" cy="-40" r="4" fill="{palette['secondary']}"/>
-                <circle cx="-40" cy="40" r="4" fill="{palette['secondary']}"/>
-                <circle cx="40" cy="40" r="4" fill="{palette['secondary']}"/>
-            </g>''')
+    dimensions = _parse_prompt_dimensions(prompt.lower())
+    if dimensions:
+        svg_width, svg_height = dimensions
+        await ctx.info(f"Dimensions set from prompt: {svg_width}x{svg_height}")
+    
+    cache_key = make_cache_key(prompt=prompt, width=svg_width, height=svg_height, optimize=optimize)
+    result = svg_result_cache.get(cache_key)
+    if result is not None:
+        await ctx.info("Serving SVG from result cache")
+    elif stream and not optimize:
+        # The optimizer needs the whole document, so only plain renders stream as they are serialized
+        try:
+            document, values, info = await _run_generation(_prepare_svg, prompt, svg_width, svg_height)
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": _timeout_error(),
+                "svg_code": None
+            }
+        streamed = await _stream_chunks(ctx, iter_chunks(document.iter_fill(values), STREAM_CHUNK_SIZE))
+        return {"success": True, **info, "streamed": streamed}
+    else:
+        try:
+            result = await _run_generation(_generate_svg_result, prompt, svg_width, svg_height, optimize)
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": _timeout_error(),
+                "svg_code": None
+            }
+        svg_result_cache.put(cache_key, result)
+    
+    if stream:
+        streamed = await _stream_chunks(ctx, iter_chunks((result["svg_code"],), STREAM_CHUNK_SIZE))
+        return {**{key: value for key, value in result.items() if key != "svg_code"}, "streamed": streamed}
+    
+    if format == "png":
+        try:
+            result["png"] = await _rasterize(result["svg_code"], svg_width, svg_height, "base64")
+        except RasterizationError as e:
+            return {**result, "success": False, "error": f"PNG rendering failed: {e}"}
+    if output == "uri":
+        try:
+            artifact = await asyncio.to_thread(_store_artifact, result.pop("svg_code"))
+        except OSError as e:
+            return {
+                "success": False,
+                "error": f"Could not store the SVG: {e}",
+                "svg_code": None
+            }
+        await ctx.info(f"Stored SVG as {artifact['svg_uri']}")
+        result.update(artifact)
+    return result
+_log("Tool 'generate_svg_from_prompt' registered")
+
+# --- BEGIN BATCH GENERATION ---
+# Small batches are rendered in-process. Batches of at least
+# SVG_MCP_BATCH_POOL_THRESHOLD uncached items are split into chunks and rendered
+# by a process pool of SVG_MCP_BATCH_WORKERS workers, created on first use. Each
+# chunk takes a generation slot, so batches share the SVG_MCP_MAX_CONCURRENCY limit.
+BATCH_MAX_ITEMS = int(os.environ.get("SVG_MCP_BATCH_MAX_ITEMS", 1000))
+BATCH_POOL_THRESHOLD = int(os.environ.get("SVG_MCP_BATCH_POOL_THRESHOLD", 32))
+BATCH_WORKERS = int(os.environ.get("SVG_MCP_BATCH_WORKERS", 0)) or os.cpu_count() or 1
+
+_batch_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_batch_pool() -> ProcessPoolExecutor:
+    """Returns the shared batch process pool, creating it on first use."""
+    global _batch_pool
+    if _batch_pool is None:
+        _batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+    return _batch_pool
+
+
+def _parse_batch_item(item: Union[str, Dict[str, Any]]) -> Tuple[str, int, int]:
+    """
+    Normalizes one batch item into (prompt, width, height).
+
+    Explicit dimensions take precedence over dimensions parsed from the prompt.
+
+    Args:
+        item: A prompt string, or a dict with "prompt" and optional "width"/"height"
+
+    Returns:
+        The prompt and the dimensions to render it at
+
+    Raises:
+        ValueError: If the item is malformed or its dimensions are out of range
+    """
+    if isinstance(item, str):
+        item = {"prompt": item}
+    if not isinstance(item, dict) or not isinstance(item.get("prompt"), str):
+        raise ValueError("Each item must be a prompt string or an object with a 'prompt' string")
+
+    svg_width, svg_height = _parse_prompt_dimensions(item["prompt"].lower()) or (300, 300)
+    width = item.get("width", svg_width)
+    height = item.get("height", svg_height)
+    if not all(isinstance(v, int) and not isinstance(v, bool) and 50 <= v <= 2000 for v in (width, height)):
+        raise ValueError("'width' and 'height' must be integers between 50 and 2000")
+    return item["prompt"], width, height
+
+
+def _generate_svg_batch(jobs: List[Tuple[str, int, int]]) -> List[Dict[str, Any]]:
+    """
+    Renders a chunk of batch jobs, reporting failures per item instead of raising.
+
+    Runs either in-process or inside a batch pool worker.
+
+    Args:
+        jobs: (prompt, width, height) tuples
+
+    Returns:
+        One result dictionary per job, in order
+    """
+    results = []
+    for prompt, svg_width, svg_height in jobs:
+        try:
+            results.append(_generate_svg(prompt, svg_width, svg_height))
+        except Exception as e:
+            results.append({"success": False, "error": f"Generation failed: {e}"})
+    return results
+
+@mcp.tool()
+@tool_metrics.instrument
+async def generate_svgs_from_prompts(ctx: Context, prompts: List[Union[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Generates several SVG images in a single call.
+
+    Each item is either a prompt string or an object such as
+    {"prompt": "a gear icon", "width": 64, "height": 64}. Failures are reported
+    on the individual item and do not abort the rest of the batch.
+    
+    Args:
+        ctx: The MCP context
+        prompts: The prompts to generate, optionally with per-item dimensions
+        
+    Returns:
+        A dictionary with one result per item, in the order given
+    """
+    await ctx.info(f"Generating batch of {len(prompts)} SVGs")
+    
+    if len(prompts) > BATCH_MAX_ITEMS:
+        return {
+            "success": False,
+            "error": f"Batch too large: {len(prompts)} items (maximum {BATCH_MAX_ITEMS})",
+            "results": None
+        }
     
-    # City/Skyline
-    elif common_objects["city"]:
-        if dominant_style == "cyberpunk":
-            # Futuristic cyberpunk city
-            svg_parts.append(f'''
-            <!-- Cyberpunk City Skyline -->
-            <g>
-                <!-- Background atmosphere -->
-                <rect width="{svg_width}" height="{svg_height}" fill="url(#primaryGradient)" opacity="0.3"/>
-                
-                <!-- Buildings -->
-                <rect x="20" y="100" width="30" height="200" fill="{palette['background']}" stroke="{palette['primary']}" stroke-width="1"/>
-                <rect x="60" y="150" width="40" height="150" fill="{palette['background']}" stroke="{palette['secondary']}" stroke-width="1"/>
-                <rect x="110" y="80" width="20" height="220" fill="{palette['background']}" stroke="{palette['primary']}" stroke-width="1"/>
-                <rect x="140" y="130" width="50" height="170" fill="{palette['background']}" stroke="{palette['accent']}" stroke-width="1"/>
-                <rect x="200" y="100" width="35" height="200" fill="{palette['background']}" stroke="{palette['secondary']}" stroke-width="1"/>
-                <rect x="245" y="120" width="25" height="180" fill="{palette['background']}" stroke="{palette['primary']}" stroke-width="1"/>
-                
-                <!-- Building windows -->
-                <g>
-                    <rect x="25" y="120" width="5" height="8" fill="{palette['accent']}" opacity="0.8"/>
-                    <rect x="35" y="120" width="5" height="8" fill="{palette['accent']}" opacity="0.8"/>
-                    <rect x="25" y="140" width="5" height="8" fill="{palette['accent']}" opacity="0.8"/>
-                    <rect x="35" y="140" width="5" height="8" fill="{palette['accent']}" opacity="0.5"/>
-                    <rect x="25" y="160" width="5" height="8" fill="{palette['accent']}" opacity="0.8"/>
-                    <rect x="35" y="160" width="5" height="8" fill="{palette['accent']}" opacity="0.5"/>
-                    
-                    <rect x="70" y="170" width="6" height="10" fill="{palette['primary']}" opacity="0.7"/>
-                    <rect x="84" y="170" width="6" height="10" fill="{palette['primary']}" opacity="0.7"/>
-                    <rect x="70" y="190" width="6" height="10" fill="{palette['primary']}" opacity="0.4"/>
-                    <rect x="84" y="190" width="6" height="10" fill="{palette['primary']}" opacity="0.7"/>
-                    
-                    <!-- More windows on other buildings -->
-                    <rect x="115" y="100" width="4" height="7" fill="{palette['secondary']}" opacity="0.6"/>
-                    <rect x="115" y="120" width="4" height="7" fill="{palette['secondary']}" opacity="0.6"/>
-                    <rect x="115" y="140" width="4" height="7" fill="{palette['secondary']}" opacity="0.6"/>
-                </g>
-                
-                <!-- Flying vehicles if it's futuristic -->
-                <g>
-                    <ellipse cx="70" cy="80" rx="10" ry="3" fill="{palette['secondary']}" filter="url(#glow)" opacity="0.8"/>
-                    <ellipse cx="180" cy="50" rx="12" ry="4" fill="{palette['primary']}" filter="url(#glow)" opacity="0.8"/>
-                    <ellipse cx="240" cy="90" rx="8" ry="3" fill="{palette['accent']}" filter="url(#glow)" opacity="0.8"/>
-                </g>
-            </g>''')
+    results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+    pending = []  # (index, cache_key, job) for items not served from cache
+    for index, item in enumerate(prompts):
+        try:
+            job = _parse_batch_item(item)
+        except ValueError as e:
+            results[index] = {"success": False, "error": str(e)}
+            continue
+        cache_key = make_cache_key(prompt=job[0], width=job[1], height=job[2], optimize=False)
+        cached = svg_result_cache.get(cache_key)
+        if cached is not None:
+            results[index] = cached
         else:
-            # More conventional city skyline
-            svg_parts.append(f'''
-            <!-- City Skyline -->
-            <g>
-                <!-- Sky -->
-                <rect width="{svg_width}" height="{svg_height}" fill="{palette['background']}" opacity="0.4"/>
-                <rect width="{svg_width}" height="{svg_height/2}" fill="{palette['secondary']}" opacity="0.2"/>
-                
-                <!-- Buildings - simpler for non-cyberpunk -->
-                <rect x="30" y="100" width="40" height="200" fill="{palette['primary']}" opacity="0.8"/>
-                <rect x="80" y="140" width="30" height="160" fill="{palette['primary']}" opacity="0.7"/>
-                <rect x="120" y="120" width="50" height="180" fill="{palette['primary']}" opacity="0.9"/>
-                <rect x="180" y="150" width="45" height="150" fill="{palette['primary']}" opacity="0.8"/>
-                <rect x="235" y="130" width="35" height="170" fill="{palette['primary']}" opacity="0.7"/>
-                
-                <!-- Details -->
-                <rect x="110" y="90" width="10" height="30" fill="{palette['primary']}" opacity="0.9"/>
-                <path d="M160 120 L150 100 L170 100 Z" fill="{palette['primary']}" opacity="0.9"/>
-            </g>''')
+            pending.append((index, cache_key, job))
     
-    # Geometric design
-    elif common_objects["geometric"]:
-        # Different geometric patterns based on style
-        if "hexagon" in prompt_lower or dominant_style == "cyberpunk":
-            svg_parts.append(f'''
-            <!-- Hexagonal Grid Pattern -->
-            <g transform="translate({center_x}, {center_y})">
-                <path d="M-50 -87 L0 -100 L50 -87 L50 -50 L0 -37 L-50 -50 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                <path d="M-50 -13 L0 -26 L50 -13 L50 24 L0 37 L-50 24 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                <path d="M-50 61 L0 48 L50 61 L50 98 L0 111 L-50 98 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                
-                <!-- Central element -->
-                <circle cx="0" cy="0" r="30" fill="none" stroke="{palette['secondary']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="20" fill="url(#primaryGradient)" opacity="0.7"/>
-            </g>''')
-        elif "triangle" in prompt_lower:
-            svg_parts.append(f'''
-            <!-- Triangle Pattern -->
-            <g transform="translate({center_x}, {center_y})">
-                <path d="M0 -70 L60 40 L-60 40 Z" fill="none" stroke="{palette['primary']}" stroke-width="2"/>
-                <path d="M0 -40 L35 22 L-35 22 Z" fill="{palette['primary']}" opacity="0.3"/>
-                <path d="M0 70 L-60 -40 L60 -40 Z" fill="none" stroke="{palette['secondary']}" stroke-width="2"/>
-                <path d="M0 40 L-35 -22 L35 -22 Z" fill="{palette['secondary']}" opacity="0.3"/>
-            </g>''')
-        elif "circle" in prompt_lower:
-            svg_parts.append(f'''
-            <!-- Circular Pattern -->
-            <g transform="translate({center_x}, {center_y})">
-                <circle cx="0" cy="0" r="60" fill="none" stroke="{palette['primary']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="45" fill="none" stroke="{palette['accent']}" stroke-width="1" stroke-dasharray="4,2"/>
-                <circle cx="0" cy="0" r="30" fill="{palette['secondary']}" opacity="0.2"/>
-                <circle cx="0" cy="0" r="15" fill="{palette['primary']}" opacity="0.5"/>
-            </g>''')
+    jobs = [job for _, _, job in pending]
+    try:
+        if len(jobs) >= BATCH_POOL_THRESHOLD and BATCH_WORKERS > 1:
+            await ctx.info(f"Rendering {len(jobs)} uncached SVGs in a pool of {BATCH_WORKERS} processes")
+            chunk_size = max(1, math.ceil(len(jobs) / (BATCH_WORKERS * 4)))
+            chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+            chunk_results = await _run_generation_chunks(_get_batch_pool(), _generate_svg_batch, chunks)
+            rendered = [result for chunk in chunk_results for result in chunk]
+        elif jobs:
+            rendered = await _run_generation(_generate_svg_batch, jobs)
         else:
-            svg_parts.append(f'''
-            <!-- Mixed Geometric Pattern -->
-            <g transform="translate({center_x}, {center_y})">
-                <rect x="-50" y="-50" width="100" height="100" fill="none" stroke="{palette['primary']}" stroke-width="2" rx="5"/>
-                <circle cx="0" cy="0" r="30" fill="none" stroke="{palette['secondary']}" stroke-width="2"/>
-                <path d="M-20 -20 L20 -20 L0 20 Z" fill="{palette['accent']}" opacity="0.5"/>
-            </g>''')
+            rendered = []
+    except asyncio.TimeoutError:
+        rendered = [{"success": False, "error": _timeout_error()} for _ in jobs]
     
-    # Gear
-    elif common_objects["gear"]:
-        num_teeth = 8
-        if "teeth" in prompt_lower:
-            teeth_match = re.search(r'(\d+)\s*teeth', prompt_lower)
-            if teeth_match:
-                try:
-                    parsed_teeth = int(teeth_match.group(1))
-                    if 4 <= parsed_teeth <= 20: # Min 4, Max 20 teeth
-                        num_teeth = parsed_teeth
-                except ValueError:
-                    pass # Ignore if parsing fails to keep default
-
-        outer_radius = min(svg_width, svg_height) * 0.30 # Slightly smaller for better fit
-        inner_radius_factor = 0.65 # Proportion of outer_radius for the base of teeth
-        hole_radius = outer_radius * 0.25
-        tooth_height = outer_radius * 0.20 # Height of the tooth from its base
-        
-        # For path drawing
-        path_data = []
-        center_x_gear, center_y_gear = center_x, center_y # Use the general center
-
-        # Start path for the gear outline
-        current_path = []
-
-        for i in range(num_teeth):
-            # Angle for the start of the tooth base (valley)
-            angle1 = (i / num_teeth) * 2 * math.pi
-            # Angle for the start of the tooth top
-            angle2 = ((i + 0.25) / num_teeth) * 2 * math.pi
-            # Angle for the end of the tooth top
-            angle3 = ((i + 0.75) / num_teeth) * 2 * math.pi
-            # Angle for the end of the tooth base (next valley)
-            angle4 = ((i + 1.0) / num_teeth) * 2 * math.pi
-
-            # Valley point 1 (start of tooth base)
-            x_v1 = center_x_gear + (outer_radius - tooth_height) * math.cos(angle1)
-            y_v1 = center_y_gear + (outer_radius - tooth_height) * math.sin(angle1)
-
-            # Tooth top point 1 (start of tooth top)
-            x_t1 = center_x_gear + outer_radius * math.cos(angle2)
-            y_t1 = center_y_gear + outer_radius * math.sin(angle2)
-
-            # Tooth top point 2 (end of tooth top)
-            x_t2 = center_x_gear + outer_radius * math.cos(angle3)
-            y_t2 = center_y_gear + outer_radius * math.sin(angle3)
-            
-            # Valley point 2 (end of tooth base for this tooth)
-            # This point is also the start of the next tooth's base if not the last tooth
-            x_v2 = center_x_gear + (outer_radius - tooth_height) * math.cos(angle4)
-            y_v2 = center_y_gear + (outer_radius - tooth_height) * math.sin(angle4)
-
-            if i == 0:
-                current_path.append(f"M {x_v1:.2f},{y_v1:.2f}")
-            else:
-                 # Smooth transition from previous tooth's end valley to this tooth's start valley (should be same point)
-                current_path.append(f"L {x_v1:.2f},{y_v1:.2f}") 
-            
-            current_path.append(f"L {x_t1:.2f},{y_t1:.2f}") # Line to start of tooth top
-            current_path.append(f"L {x_t2:.2f},{y_t2:.2f}") # Line across tooth top
-            current_path.append(f"L {x_v2:.2f},{y_v2:.2f}") # Line to end of tooth base / next valley
-            
-        current_path.append("Z") # Close the outer gear shape
-
-        # Central hole (drawn as a separate sub-path for fill-rule to work)
-        current_path.append(f" M {center_x_gear + hole_radius:.2f},{center_y_gear:.2f}")
-        current_path.append(f" A {hole_radius:.2f},{hole_radius:.2f} 0 1 0 {center_x_gear - hole_radius:.2f},{center_y_gear:.2f}")
-        current_path.append(f" A {hole_radius:.2f},{hole_radius:.2f} 0 1 0 {center_x_gear + hole_radius:.2f},{center_y_gear:.2f}")
-        current_path.append("Z")
-
-        svg_parts.append(f'''
-        <!-- Gear -->
-        <g>
-             <path d="{" ".join(current_path)}" fill="{palette['primary']}" stroke="{palette['secondary']}" stroke-width="1.5" fill-rule="evenodd"/>
-        </g>''')
+    for (index, cache_key, _), result in zip(pending, rendered):
+        if result.get("success"):
+            svg_result_cache.put(cache_key, result)
+        results[index] = result
     
-    # --- BEGIN SVG GENERATION FOR NEW OBJECTS ---
-    elif common_objects["arrow"]:
-        arrow_length = min(svg_width, svg_height) * 0.6
-        arrow_head_size = arrow_length * 0.25
-        stroke_w = max(2, arrow_length * 0.05)
-        svg_parts.append(f'''
-        <!-- Arrow -->
-        <g transform="translate({center_x - arrow_length / 2}, {center_y})" fill="{palette['primary']}" stroke="{palette['secondary']}" stroke-width="{stroke_w}">
-            <line x1="0" y1="0" x2="{arrow_length - arrow_head_size}" y2="0" />
-            <polygon points="{arrow_length - arrow_head_size},-{arrow_head_size*0.7} {arrow_length},0 {arrow_length - arrow_head_size},{arrow_head_size*0.7}" />
-        </g>''')
-
-    elif common_objects["cloud"]:
-        cloud_w = min(svg_width, svg_height) * 0.5
-        cloud_h = cloud_w * 0.6
-        # Simple cloud made of overlapping circles
-        svg_parts.append(f'''
-        <!-- Cloud -->
-        <g transform="translate({center_x - cloud_w/2}, {center_y - cloud_h/2})" fill="{palette['primary']}" opacity="{0.8 if dominant_style != 'flatdesign' else 1.0}">
-            <circle cx="{cloud_w*0.3}" cy="{cloud_h*0.6}" r="{cloud_w*0.25}" />
-            <circle cx="{cloud_w*0.5}" cy="{cloud_h*0.4}" r="{cloud_w*0.3}" />
-            <circle cx="{cloud_w*0.7}" cy="{cloud_h*0.7}" r="{cloud_w*0.28}" />
-            <rect x="{cloud_w*0.2}" y="{cloud_h*0.5}" width="{cloud_w*0.6}" height="{cloud_h*0.4}" rx="5"/>
-        </g>''')
-        if dominant_style == "nature":
-             svg_parts.append(f'<path d="M {center_x - cloud_w*0.2} {center_y + cloud_h*0.3} Q {center_x} {center_y + cloud_h*0.4} {center_x + cloud_w*0.2} {center_y + cloud_h*0.3}" stroke="{palette['secondary']}" stroke-width="2" fill="none" opacity="0.5"/>')
-
-    elif common_objects["heart"]:
-        heart_size = min(svg_width, svg_height) * 0.4
-        # Standard heart path, scaled
-        # Path data for a heart: M0,0 C0,-10 -10,-10 -10,0 C-10,10 0,10 0,20 C0,10 10,10 10,0 C10,-10 0,-10 0,0 Z
-        # Scaled: M cx,cy+s*k1 C cx,cy-s*k2 cx-s*k3,cy-s*k2 cx-s*k3,cy+s*k1 C cx-s*k3,cy+s*k2 cx,cy+s*k2 cx,cy+s*k4 ...
-        # Simpler path:
-        svg_parts.append(f'''
-        <!-- Heart -->
-        <g transform="translate({center_x}, {center_y - heart_size*0.1})">
-             <path d="M0,{-heart_size*0.4}
-                      A{heart_size*0.2},{heart_size*0.2} 0 0,1 {heart_size*0.2},{-heart_size*0.6}
-                      A{heart_size*0.2},{heart_size*0.2} 0 0,1 {heart_size*0.4},{-heart_size*0.4}
-                      L0,{heart_size*0.4}
-                      L{-heart_size*0.4},{-heart_size*0.4}
-                      A{heart_size*0.2},{heart_size*0.2} 0 0,1 {-heart_size*0.2},{-heart_size*0.6}
-                      A{heart_size*0.2},{heart_size*0.2} 0 0,1 0,{-heart_size*0.4} Z"
-                   fill="{palette['primary']}" stroke="{palette['secondary']}" stroke-width="1.5"/>
-        </g>''')
-        if dominant_style == "retro":
-             svg_parts.append(f'<path transform="translate({center_x + heart_size*0.05}, {center_y - heart_size*0.05})" d="M0,{-heart_size*0.4} A{heart_size*0.2},{heart_size*0.2} 0 0,1 {heart_size*0.2},{-heart_size*0.6} A{heart_size*0.2},{heart_size*0.2} 0 0,1 {heart_size*0.4},{-heart_size*0.4} L0,{heart_size*0.4} L{-heart_size*0.4},{-heart_size*0.4} A{heart_size*0.2},{heart_size*0.2} 0 0,1 {-heart_size*0.2},{-heart_size*0.6} A{heart_size*0.2},{heart_size*0.2} 0 0,1 0,{-heart_size*0.4} Z" fill="{palette['accent']}" opacity="0.3"/>')
-
-    elif common_objects["star"]:
-        num_points = 5
-        if "points" in prompt_lower or "pointed star" in prompt_lower:
-            star_match = re.search(r'(\d+)\s*(?:points|pointed star)\', prompt_lower)
-            if star_match:
-                try: parsed_points = int(star_match.group(1)); num_points = max(3, min(12, parsed_points)) # 3-12 points
-                except ValueError: pass
-
-        outer_r = min(svg_width, svg_height) * 0.3
-        inner_r = outer_r * (0.382 if num_points == 5 else 0.5) # Golden ratio for 5-point star, 0.5 for others
-        
-        points_str = []
-        for i in range(num_points * 2):
-            radius = outer_r if i % 2 == 0 else inner_r
-            angle = (i / (num_points * 2)) * 2 * math.pi - (math.pi / 2) # Adjust to make a point go upwards
-            x_pt = center_x + radius * math.cos(angle)
-            y_pt = center_y + radius * math.sin(angle)
-            points_str.append(f"{x_pt:.2f},{y_pt:.2f}")
+    failed = sum(1 for result in results if not result.get("success"))
+    return {
+        "success": True,
+        "count": len(results),
+        "failed": failed,
+        "results": results
+    }
+_log("Tool 'generate_svgs_from_prompts' registered")
+# --- END BATCH GENERATION ---
+
+# --- BEGIN CHARTS ---
+# Charts are drawn from data by svg_chart.py (NumPy), imported on first use.
+# Series larger than the plot can show are downsampled, so the SVG size follows
+# the canvas; SVG_MCP_CHART_MAX_POINTS caps the input size.
+CHART_MAX_POINTS = int(os.environ.get("SVG_MCP_CHART_MAX_POINTS", 5_000_000))
+
+@mcp.tool()
+@tool_metrics.instrument
+async def generate_chart_svg(ctx: Context, chart_type: str, data: Union[List[float], List[List[float]], str],
+                             labels: Optional[List[str]] = None, title: str = "", style: str = "general",
+                             width: int = 600, height: int = 400, max_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Generates a bar, line, area, scatter or donut chart SVG from data.
+
+    Large series are reduced to what the plot can show: lines and areas keep
+    the points that preserve their shape (LTTB), scatter plots become a
+    hexagonal density map, bars are averaged into bins and donuts merge their
+    smallest slices into "Other".
+
+    Args:
+        ctx: The MCP context
+        chart_type: "bar", "line", "area", "scatter" or "donut"
+        data: Y values, [x, y] pairs, or CSV text (optional header row, optional
+              label column, then a Y column or X and Y columns)
+        labels: Category labels, one per value (bar and donut charts)
+        title: Title drawn above the chart
+        style: The color palette to use, by style name (see `generate_svg_from_prompt`)
+        width: Width of the chart (50-2000)
+        height: Height of the chart (50-2000)
+        max_points: Points, bars or slices to draw at most before downsampling; by default this follows the chart size
+
+    Returns:
+        A dictionary with the SVG code, the number of input and drawn points, and the downsampling method used
+    """
+    await ctx.info(f"Generating {chart_type} chart")
+
+    if style not in COLOR_PALETTES:
+        return {
+            "success": False,
+            "error": f"Unknown style: {style}. Use one of: {', '.join(COLOR_PALETTES)}",
+            "svg_code": None
+        }
+    if not (50 <= width <= 2000 and 50 <= height <= 2000):
+        return {
+            "success": False,
+            "error": "'width' and 'height' must be between 50 and 2000",
+            "svg_code": None
+        }
+    if max_points is not None and max_points < 3:
+        return {
+            "success": False,
+            "error": "'max_points' must be at least 3",
+            "svg_code": None
+        }
+    points = data.count("\n") + 1 if isinstance(data, str) else len(data)
+    if points > CHART_MAX_POINTS:
+        return {
+            "success": False,
+            "error": f"Too much data: {points} points (maximum {CHART_MAX_POINTS})",
+            "svg_code": None
+        }
+
+    from svg_chart import render_chart
+
+    try:
+        result = await _run_generation(
+            render_chart, chart_type, data, COLOR_PALETTES[style], width, height, title, labels, max_points
+        )
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "svg_code": None
+        }
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": _timeout_error(),
+            "svg_code": None
+        }
+
+    if result["downsampling"] != "none":
+        await ctx.info(f"Downsampled {result['points']} points to {result['drawn_points']} ({result['downsampling']})")
+    return {"success": True, **result}
+_log("Tool 'generate_chart_svg' registered")
+# --- END CHARTS ---
+
+# --- BEGIN TRACING ---
+# Raster images are traced by svg_trace.py (NumPy, and Pillow to decode them),
+# imported on first use. Large images are scaled down to a working size before
+# tracing; these caps apply to the encoded file and to the decoded image. The
+# input is read and decoded in the generation executor, like the tracing itself.
+TRACE_MAX_BYTES = int(os.environ.get("SVG_MCP_TRACE_MAX_BYTES", 20 * 1024 * 1024))
+TRACE_MAX_PIXELS = int(os.environ.get("SVG_MCP_TRACE_MAX_PIXELS", 25_000_000))
+
+
+def _read_image_input(png_base64: Optional[str], path: Optional[str]) -> bytes:
+    """
+    Returns the encoded image given to `trace_raster_to_svg`, inline or as a file path.
+
+    Raises:
+        ValueError: If neither or both are given, or the image cannot be read or is too large
+    """
+    if (png_base64 is None) == (path is None):
+        raise ValueError("Give either 'png_base64' or 'path'")
+    if path is not None:
+        if not os.path.isfile(path):
+            raise ValueError(f"No such file: {path}")
+        if os.path.getsize(path) > TRACE_MAX_BYTES:
+            raise ValueError(f"Image too large: {os.path.getsize(path)} bytes (maximum {TRACE_MAX_BYTES})")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError as e:
+            raise ValueError(f"Could not read {path}: {e}") from None
+    encoded = png_base64.split(",", 1)[1] if png_base64.startswith("data:") else png_base64
+    if len(encoded) * 3 // 4 > TRACE_MAX_BYTES:
+        raise ValueError(f"Image too large: about {len(encoded) * 3 // 4} bytes (maximum {TRACE_MAX_BYTES})")
+    try:
+        return base64.b64decode(encoded, validate=True)
+    except ValueError:
+        raise ValueError("'png_base64' is not valid base64") from None
+
+
+def _trace_image_input(png_base64: Optional[str], path: Optional[str], colors: int, tolerance: float,
+                       min_area: float, max_size: int, title: str) -> Dict[str, Any]:
+    """
+    Reads, decodes and traces the image given to `trace_raster_to_svg`.
+
+    Runs in the generation executor, so the file read and the base64 decoding
+    stay off the event loop along with the tracing.
+
+    Raises:
+        ValueError: If the image cannot be read (see `_read_image_input`)
+        TracingError: If the image cannot be decoded or traced
+    """
+    from svg_trace import trace_image
+
+    data = _read_image_input(png_base64, path)
+    return trace_image(data, colors, tolerance, min_area, max_size, TRACE_MAX_PIXELS, title)
+
+@mcp.tool()
+@tool_metrics.instrument
+async def trace_raster_to_svg(ctx: Context, png_base64: Optional[str] = None, path: Optional[str] = None,
+                              colors: int = 8, tolerance: float = 1.0, min_area: float = 4.0,
+                              max_size: int = 1024) -> Dict[str, Any]:
+    """
+    Converts a raster image, such as a PNG logo or icon, into an SVG of filled paths.
+
+    The image is reduced to a few colors, the outline of each color is traced
+    with marching squares and the outlines are simplified. The SVG keeps the
+    image's size; an opaque image's most common color becomes the background.
+
+    Args:
+        ctx: The MCP context
+        png_base64: The image, base64-encoded (a "data:" URL prefix is accepted)
+        path: Path of the image file on the server, instead of `png_base64`
+        colors: Number of colors to reduce the image to (1-32)
+        tolerance: How far, in pixels, simplified outlines may stray from the traced ones (0-10)
+        min_area: Shapes and holes smaller than this many square pixels are dropped
+        max_size: Longer side, in pixels, the image is scaled down to before tracing (16-4096)
+
+    Returns:
+        A dictionary with the SVG code, its size, the traced size, the colors used and the number of shapes
+    """
+    await ctx.info(f"Tracing image from {path or 'base64 input'}")
+
+    if not 1 <= colors <= 32:
+        return {
+            "success": False,
+            "error": "'colors' must be between 1 and 32",
+            "svg_code": None
+        }
+    if not (0 <= tolerance <= 10 and min_area >= 0 and 16 <= max_size <= 4096):
+        return {
+            "success": False,
+            "error": "'tolerance' must be between 0 and 10, 'min_area' at least 0 and 'max_size' between 16 and 4096",
+            "svg_code": None
+        }
+
+    title = f"Traced from: {os.path.basename(path)}" if path else "Traced image"
+    try:
+        result = await _run_generation(
+            _trace_image_input, png_base64, path, colors, tolerance, min_area, max_size, title
+        )
+    except ValueError as e: # Unreadable input, or a TracingError
+        return {
+            "success": False,
+            "error": str(e),
+            "svg_code": None
+        }
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": _timeout_error(),
+            "svg_code": None
+        }
+
+    await ctx.info(
+        f"Traced {result['width']}x{result['height']} image at {result['traced_width']}x{result['traced_height']}: "
+        f"{len(result['colors'])} colors, {result['shapes']} shapes, {len(result['svg_code'])} characters"
+    )
+    return {"success": True, **result}
+_log("Tool 'trace_raster_to_svg' registered")
+# --- END TRACING ---
+
+# SVG markup passed in by clients is parsed or rendered, so its size is capped
+SVG_INPUT_MAX_BYTES = int(os.environ.get("SVG_MCP_INPUT_MAX_BYTES", 5 * 1024 * 1024))
+
+@mcp.tool()
+@tool_metrics.instrument
+async def optimize_svg(ctx: Context, svg_code: str, precision: int = 2) -> Dict[str, Any]:
+    """
+    Optimizes SVG markup without any external tooling (a built-in SVGO-style pass).
+
+    Removes comments, whitespace and unreferenced <defs> entries, rewrites path
+    data in its shortest form, rounds coordinates and lengths to `precision` decimals and moves
+    presentation attributes shared by all children of a group onto the group.
+    
+    Args:
+        ctx: The MCP context
+        svg_code: The SVG markup to optimize
+        precision: Number of decimals to keep in coordinates and lengths (0-6)
         
-        svg_parts.append(f'''
-        <!-- Star -->
-        <polygon points="{" ".join(points_str)}" fill="{palette['primary']}" stroke="{palette['secondary']}" stroke-width="1.5"/>
-        ''')
-        if dominant_style == "fantasy" or "sparkle" in prompt_lower:
-            svg_parts.append(f'<polygon points="{" ".join(points_str)}" fill="none" stroke="{palette[\'accent\']}" stroke-width="3" filter="url(#glow)" opacity="0.5" transform="scale(0.95)" transform-origin="{center_x} {center_y}"/>')
+    Returns:
+        A dictionary with the optimized SVG code and its size before and after, in bytes
+    """
+    await ctx.info(f"Optimizing SVG ({len(svg_code)} characters)")
+    
+    if not 0 <= precision <= 6:
+        return {
+            "success": False,
+            "error": "'precision' must be between 0 and 6",
+            "svg_code": None
+        }
+    if len(svg_code) > SVG_INPUT_MAX_BYTES:
+        return {
+            "success": False,
+            "error": f"SVG too large: {len(svg_code)} characters (maximum {SVG_INPUT_MAX_BYTES})",
+            "svg_code": None
+        }
+    
+    from svg_optimizer import optimize_svg as _optimize_svg_markup
+
+    try:
+        optimized = await _run_generation(_optimize_svg_markup, svg_code, precision)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "svg_code": None
+        }
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "error": _timeout_error(),
+            "svg_code": None
+        }
+    
+    original_bytes = optimized["original_bytes"]
+    saved_bytes = original_bytes - optimized["optimized_bytes"]
+    await ctx.info(f"Optimized SVG from {original_bytes} to {optimized['optimized_bytes']} bytes")
+    return {
+        "success": True,
+        **optimized,
+        "saved_bytes": saved_bytes,
+        "saved_percent": round(100 * saved_bytes / original_bytes, 1) if original_bytes else 0.0
+    }
+_log("Tool 'optimize_svg' registered")
 
-    # --- END SVG GENERATION FOR NEW OBJECTS ---
+@mcp.tool()
+@tool_metrics.instrument
+async def render_svg_to_png(ctx: Context, svg_code: str, width: Optional[int] = None,
+                            height: Optional[int] = None, output: str = "base64") -> Dict[str, Any]:
+    """
+    Rasterizes SVG markup to a PNG image on the server.
 
-    # Abstract design (default if no specific object detected)
-    else:
-        # Different abstract styles based on dominant style
-        if dominant_style == "cyberpunk":
-            svg_parts.append(f'''
-            <!-- Cyberpunk Abstract Design -->
-            <g transform="translate({center_x}, {center_y})">
-                <!-- Hexagonal grid pattern -->
-                <path d="M-50 -87 L0 -100 L50 -87 L50 -50 L0 -37 L-50 -50 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                <path d="M-50 -13 L0 -26 L50 -13 L50 24 L0 37 L-50 24 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                <path d="M-50 61 L0 48 L50 61 L50 98 L0 111 L-50 98 Z" fill="none" stroke="{palette['primary']}" stroke-width="2" opacity="0.8"/>
-                
-                <!-- Central circular element -->
-                <circle cx="0" cy="0" r="40" fill="none" stroke="{palette['secondary']}" stroke-width="3" stroke-dasharray="1,1"/>
-                <circle cx="0" cy="0" r="30" fill="none" stroke="{palette['accent']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="20" fill="url(#primaryGradient)" filter="url(#glow)"/>
-                
-                <!-- Decorative lines -->
-                <path d="M-100 0 L-50 0 M50 0 L100 0 M0 -100 L0 -50 M0 50 L0 100" stroke="{palette['accent']}" stroke-width="2" opacity="0.8"/>
-            </g>''')
-        elif dominant_style == "minimalist":
-            svg_parts.append(f'''
-            <!-- Minimalist Abstract Design -->
-            <g transform="translate({center_x}, {center_y})">
-                <rect x="-40" y="-40" width="80" height="80" fill="none" stroke="{palette['primary']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="25" fill="{palette['accent']}" opacity="0.8"/>
-                <line x1="-60" y1="-60" x2="60" y2="60" stroke="{palette['primary']}" stroke-width="1.5"/>
-                <line x1="-60" y1="60" x2="60" y2="-60" stroke="{palette['primary']}" stroke-width="1.5"/>
-            </g>''')
-        elif dominant_style == "retro":
-            svg_parts.append(f'''
-            <!-- Retro Abstract Design -->
-            <g transform="translate({center_x}, {center_y})" filter="url(#pixelate)">
-                <rect x="-50" y="-50" width="100" height="100" fill="{palette['secondary']}" stroke="{palette['primary']}" stroke-width="4"/>
-                <circle cx="0" cy="0" r="30" fill="{palette['primary']}"/>
-                <path d="M-30 -30 L30 30 M-30 30 L30 -30" stroke="{palette['accent']}" stroke-width="5"/>
-            </g>''')
-        elif dominant_style == "artdeco":
-            svg_parts.append(f'''
-            <!-- Art Deco Abstract Design -->
-            <g transform="translate({center_x}, {center_y})">
-                <!-- Symmetrical background lines -->
-                <path d="M {-svg_width*0.4} 0 L {svg_width*0.4} 0 M 0 {-svg_height*0.4} L 0 {svg_height*0.4}" stroke="{palette['secondary']}" stroke-width="1" opacity="0.5"/>
-                <rect x="-{svg_width*0.3}" y="-{svg_height*0.3}" width="{svg_width*0.6}" height="{svg_height*0.6}" fill="none" stroke="{palette['primary']}" stroke-width="3" rx="5"/>
-                
-                <!-- Sunburst/Radiating lines from center -->
-                {"".join([f'<line x1="0" y1="0" x2="{(_a := i * 2 * 3.14159 / 12) or math.cos(_a) * svg_width * 0.35}" y2="{(_a := i * 2 * 3.14159 / 12) or math.sin(_a) * svg_height * 0.35}" stroke="{palette["accent"]}" stroke-width="1.5" opacity="0.7"/>' for i in range(12)])}
-                
-                <circle cx="0" cy="0" r="{min(svg_width, svg_height)*0.1}" fill="{palette['primary']}" stroke="{palette['accent']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="{min(svg_width, svg_height)*0.05}" fill="{palette['background']}"/>
-                
-                <!-- Corner Elements -->
-                <rect x="-{svg_width*0.3 -5}" y="-{svg_height*0.3 -5}" width="15" height="15" fill="{palette['accent']}" opacity="0.6"/>
-                <rect x="{svg_width*0.3 -20}" y="-{svg_height*0.3 -5}" width="15" height="15" fill="{palette['accent']}" opacity="0.6"/>
-                <rect x="-{svg_width*0.3 -5}" y="{svg_height*0.3 -20}" width="15" height="15" fill="{palette['accent']}" opacity="0.6"/>
-                <rect x="{svg_width*0.3 -20}" y="{svg_height*0.3 -20}" width="15" height="15" fill="{palette['accent']}" opacity="0.6"/>
-            </g>''')
-        else:
-            svg_parts.append(f'''
-            <!-- Generic Abstract Design -->
-            <g transform="translate({center_x}, {center_y})">
-                <path d="M-50 -50 C-30 -70, 30 -70, 50 -50 C70 -30, 70 30, 50 50 C30 70, -30 70, -50 50 C-70 30, -70 -30, -50 -50 Z" 
-                      fill="none" stroke="{palette['primary']}" stroke-width="2"/>
-                <circle cx="0" cy="0" r="30" fill="{palette['secondary']}" opacity="0.3"/>
-                <path d="M-25 0 A25 25 0 0 0 25 0" fill="none" stroke="{palette['accent']}" stroke-width="2"/>
-                <path d="M-25 0 A25 25 0 0 1 25 0" fill="none" stroke="{palette['accent']}" stroke-width="2"/>
-            </g>''')
+    Rendering uses a locally installed renderer (CairoSVG, resvg, rsvg-convert or
+    Inkscape) in a bounded pool of processes, with a per-job timeout and a limit
+    on the output pixel count. Repeated renders are served from a cache.
+    
+    Args:
+        ctx: The MCP context
+        svg_code: The SVG markup to render
+        width: Output width in pixels; defaults to the document width, or follows the aspect ratio
+        height: Output height in pixels; defaults to the document height, or follows the aspect ratio
+        output: "base64" to return the PNG inline, or "path" to write it to a file on the server
+        
+    Returns:
+        A dictionary with the output size and either the base64-encoded PNG or its file path
+    """
+    await ctx.info(f"Rendering SVG to PNG ({len(svg_code)} characters)")
     
-    # Add supplementary effects based on prompt
-    if "glitch" in prompt_lower or "distorted" in prompt_lower:
-        svg_parts.append(f'<rect width="{svg_width}" height="{svg_height}" fill="none" stroke="none" filter="url(#glitchEffect)" opacity="0.7"/>')
+    if output not in ("base64", "path"):
+        return {
+            "success": False,
+            "error": f"Unknown output: {output}. Use 'base64' or 'path'"
+        }
+    if len(svg_code) > SVG_INPUT_MAX_BYTES:
+        return {
+            "success": False,
+            "error": f"SVG too large: {len(svg_code)} characters (maximum {SVG_INPUT_MAX_BYTES})"
+        }
     
-    if "glow" in prompt_lower or "neon" in prompt_lower:
-        svg_parts.append(f'<rect x="30" y="30" width="{svg_width-60}" height="{svg_height-60}" fill="none" stroke="{palette["accent"]}" stroke-width="2" filter="url(#glow)" opacity="0.7"/>')
+    try:
+        png = await _rasterize(svg_code, width, height, output)
+    except RasterizationError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
     
-    # Add style info at the bottom
-    # --- BEGIN MODIFICATION: Improved Caption ---
-    caption_text = prompt
-    max_caption_len = int((svg_width - 60) / 7) # Approximate chars based on font size and rect width
-    if len(caption_text) > max_caption_len:
-        caption_text = caption_text[:max_caption_len-3] + "..."
+    await ctx.info(f"Rendered {png['width']}x{png['height']} PNG ({png['png_bytes']} bytes)")
+    return {
+        "success": True,
+        "renderer": svg_rasterizer.renderer,
+        **png
+    }
+_log("Tool 'render_svg_to_png' registered")
+
+@mcp.tool()
+@tool_metrics.instrument
+async def svg_cache_stats(ctx: Context) -> Dict[str, Any]:
+    """
+    Reports hit/miss counters and occupancy of the generated SVG result cache,
+    of the artifact store behind svg:// URIs and of the store of PNG files.
+    
+    Args:
+        ctx: The MCP context
+        
+    Returns:
+        A dictionary with the cache, artifact store and PNG file store statistics
+    """
+    await ctx.info("Retrieving SVG result cache statistics")
+    
+    return {
+        "success": True,
+        "cache": svg_result_cache.stats(),
+        "artifacts": await asyncio.to_thread(svg_artifacts.stats),
+        "png_files": await asyncio.to_thread(svg_png_files.stats)
+    }
+_log("Tool 'svg_cache_stats' registered")
+
+@mcp.tool()
+async def server_stats(ctx: Context, reset: bool = False) -> Dict[str, Any]:
+    """
+    Reports per-tool metrics: call and error counts, latency, input and output
+    sizes, and how often each style and object was generated.
     
-    svg_parts.append(f'''
-    <!-- Caption/title with style info -->
-    <rect x="10" y="{svg_height - 35}" width="{svg_width - 20}" height="25" fill="#000000" opacity="0.6" rx="3"/>
-    <text x="50%" y="{svg_height - 22.5}" dominant-baseline="middle" text-anchor="middle" font-family="monospace" font-size="11px" fill="{palette['text']}">
-        {caption_text.replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')} [{dominant_style}]
-    </text></g>''') # Added closing </g> tag for text group (though might not be strictly necessary if not grouped before)
-    # Corrected caption, ensure text is inside the svg structure properly
-    # Let's assume the text element is directly within the main SVG or a generic group
-    svg_parts.append(f'''
-    <rect x="10" y="{svg_height - 35}" width="{svg_width - 20}" height="25" fill="#000000" opacity="0.6" rx="3"/>
-    <text x="50%" y="{svg_height - 22.5}" dominant-baseline="middle" text-anchor="middle" font-family="monospace" font-size="11px" fill="{palette['text']}">
-        {caption_text.replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')} [{dominant_style}]
-    </text>''')
-    # --- END MODIFICATION ---
+    Latency percentiles are estimated from histogram buckets. With multiple HTTP
+    workers, each worker reports its own numbers.
     
-    # Combine all SVG parts
-    svg_code = f'''<svg viewBox="0 0 {svg_width} {svg_height}" xmlns="http://www.w3.org/2000/svg">
-    <title>Generated from: {prompt.replace('"', '&quot;')}</title>
-    {' '.join(svg_parts)}
-</svg>'''
+    Args:
+        ctx: The MCP context
+        reset: Zero the metrics after reading them
+        
+    Returns:
+        A dictionary with the metrics and the result cache statistics
+    """
+    await ctx.info("Retrieving server metrics")
     
+    stats = tool_metrics.snapshot()
+    if reset:
+        tool_metrics.reset()
     return {
         "success": True,
-        "svg_code": svg_code,
-        "detected_style": dominant_style
+        **stats,
+        "cache": svg_result_cache.stats()
     }
-print("--- SVG MCP Server: Tool 'generate_svg_from_prompt' registered ---", file=sys.stderr)
+_log("Tool 'server_stats' registered")
 
-@mcp.resource("examples://svg-snippets")
+# Optional Prometheus endpoint, served by the HTTP transports only
+METRICS_PATH = os.environ.get("SVG_MCP_METRICS_PATH")
+
+if METRICS_PATH and tool_metrics.enabled:
+    from starlette.responses import PlainTextResponse
+
+    @mcp.custom_route(METRICS_PATH, methods=["GET"])
+    async def prometheus_metrics(request):
+        cache, raster_cache = svg_result_cache.stats(), svg_raster_cache.stats()
+        text = tool_metrics.to_prometheus({
+            "result_cache_entries": cache["entries"],
+            "result_cache_bytes": cache["bytes"],
+            "result_cache_hit_rate": cache["hit_rate"],
+            "raster_cache_entries": raster_cache["entries"],
+            "raster_cache_bytes": raster_cache["bytes"],
+        })
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+    _log(f"Prometheus metrics served at {METRICS_PATH}")
+
+@mcp.resource("examples://svg-snippets", mime_type="application/json")
 async def get_svg_snippets():
     """
     Returns useful SVG code snippets that can be used as building blocks.
     """
-    return {
-        "snippets": [
-            {
-                "name": "Basic Shape: Circle",
-                "description": "A simple circle with styling",
-                "code": '<circle cx="50" cy="50" r="40" stroke="blue" stroke-width="3" fill="red" />'
-            },
-            {
-                "name": "Basic Shape: Rectangle",
-                "description": "A rectangle with rounded corners",
-                "code": '<rect x="10" y="10" width="80" height="60" rx="5" fill="green" />'
-            },
-            {
-                "name": "Text Element",
-                "description": "Basic text with styling",
-                "code": '<text x="10" y="20" font-family="Arial" font-size="16" fill="black">Hello SVG</text>'
-            },
-            {
-                "name": "Linear Gradient",
-                "description": "Definition and use of a linear gradient",
-                "code": '<defs>\n  <linearGradient id="grad" x1="0%" y1="0%" x2="100%" y2="0%">\n    <stop offset="0%" style="stop-color:rgb(255,0,0);stop-opacity:1" />\n    <stop offset="100%" style="stop-color:rgb(0,0,255);stop-opacity:1" />\n  </linearGradient>\n</defs>\n<rect x="10" y="10" width="80" height="80" fill="url(#grad)" />'
-            },
-            {
-                "name": "Simple Path",
-                "description": "A path element creating a custom shape",
-                "code": '<path d="M10,30 A20,20 0,0,1 50,30 A20,20 0,0,1 90,30 Q90,60 50,90 Q10,60 10,30 z" fill="blue"/>'
-            },
-            {
-                "name": "Basic Animation",
-                "description": "A simple animation using animate",
-                "code": '<circle cx="50" cy="50" r="20" fill="red">\n  <animate attributeName="r" values="20;40;20" dur="2s" repeatCount="indefinite" />\n</circle>'
-            }
-        ]
-    }
-print("--- SVG MCP Server: Resource 'examples://svg-snippets' registered ---", file=sys.stderr)
+    return _svg_snippets_json()
+_log("Resource 'examples://svg-snippets' registered")
+
+@mcp.resource("svg://{sha256}", mime_type="image/svg+xml")
+async def get_svg_artifact(sha256: str) -> str:
+    """
+    Returns a generated SVG stored by `generate_svg_from_prompt` with output "uri".
+
+    The document is read from the artifact store; nothing is generated.
+    """
+    data = await asyncio.to_thread(svg_artifacts.get, sha256)
+    if data is None:
+        raise ResourceError(f"No stored SVG with hash {sha256}")
+    return data.decode("utf-8")
+_log("Resource template 'svg://{sha256}' registered")
+
+# --- BEGIN HTTP SERVING ---
+# Besides stdio, the server can run as one long-lived process (or several uvicorn
+# workers) over FastMCP's streamable HTTP or SSE transport, shared by many clients.
+
+def create_http_app():
+    """
+    ASGI application factory for HTTP serving, called by uvicorn in each worker.
+
+    Reads the transport from SVG_MCP_TRANSPORT ("http" or "sse"). With
+    SVG_MCP_STATELESS_HTTP=1, sessions are not kept between requests, which is
+    required when several workers share a port.
+    """
+    transport = os.environ.get("SVG_MCP_TRANSPORT", "http")
+    stateless = transport != "sse" and os.environ.get("SVG_MCP_STATELESS_HTTP") == "1"
+    return mcp.http_app(transport=transport, stateless_http=stateless or None)
+
+
+def serve_http(transport: str, host: str, port: int, workers: int, shutdown_timeout: float) -> None:
+    """
+    Serves the MCP server over HTTP with uvicorn.
+
+    On SIGINT/SIGTERM uvicorn stops accepting connections and lets in-flight
+    requests finish for up to `shutdown_timeout` seconds before exiting.
+
+    Args:
+        transport: "http" (streamable HTTP) or "sse"
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes; more than one requires the http transport
+        shutdown_timeout: Seconds to wait for in-flight requests on shutdown
+    """
+    import uvicorn
+
+    os.environ["SVG_MCP_TRANSPORT"] = transport
+    if workers > 1:
+        # Workers are separate processes that import this module by name and
+        # each keep their own caches; requests cannot rely on per-worker sessions
+        os.environ["SVG_MCP_STATELESS_HTTP"] = "1"
+        app: Any = "svg_mcp_server:create_http_app"
+    else:
+        app = create_http_app()
+    uvicorn.run(
+        app, factory=workers > 1, host=host, port=port, workers=workers if workers > 1 else None,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        timeout_graceful_shutdown=math.ceil(shutdown_timeout), log_level="info"
+    )
+
+
+def _parse_args(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SVG generator MCP server")
+    parser.add_argument("--transport", choices=("stdio", "http", "sse"),
+                        default=os.environ.get("SVG_MCP_TRANSPORT", "stdio"),
+                        help="stdio for a per-editor process, or http/sse to serve many clients (default: stdio)")
+    parser.add_argument("--host", default=os.environ.get("SVG_MCP_HOST", "127.0.0.1"),
+                        help="interface to bind for http/sse (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SVG_MCP_PORT", 8000)),
+                        help="port to bind for http/sse (default: 8000)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SVG_MCP_WORKERS", 1)),
+                        help="uvicorn worker processes for http (default: 1)")
+    parser.add_argument("--shutdown-timeout", type=float, default=float(os.environ.get("SVG_MCP_SHUTDOWN_TIMEOUT", 30)),
+                        help="seconds to let in-flight requests finish on shutdown (default: 30)")
+    parser.add_argument("--startup-profile", type=int, nargs="?", const=3, metavar="RUNS",
+                        help="print an import-time breakdown and the time to first responses of RUNS cold stdio servers (default: 3), then exit")
+    parser.add_argument("--build-snapshot", metavar="PATH",
+                        help="write the precomputed templates to PATH for SVG_MCP_SNAPSHOT, then exit")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and args.transport != "http":
+        parser.error("--workers > 1 requires --transport http (SSE sessions are bound to one process)")
+    return args
+# --- END HTTP SERVING ---
 
 if __name__ == "__main__":
-    print("--- SVG MCP Server: Entering main block ---", file=sys.stderr)
+    _log("Entering main block")
+    args = _parse_args()
+    if args.build_snapshot:
+        count = build_snapshot(args.build_snapshot)
+        print(f"--- SVG MCP Server: Wrote {count} templates to {args.build_snapshot} ---", file=sys.stderr)
+        sys.exit(0)
+    if args.startup_profile:
+        from svg_startup import profile_startup
+        print(profile_startup(os.path.abspath(__file__), args.startup_profile))
+        sys.exit(0)
     try:
-        print("--- SVG MCP Server: Attempting to start mcp.run(transport=\"stdio\") ---", file=sys.stderr)
-        mcp.run(transport="stdio")
-        print("--- SVG MCP Server: mcp.run() completed (this might not be reached if server runs indefinitely) ---", file=sys.stderr)
+        if args.transport == "stdio":
+            _log("Attempting to start mcp.run(transport=\"stdio\")")
+            # FastMCP's banner checks PyPI for a newer release, which can hold up the first response for seconds
+            mcp.run(transport="stdio", show_banner=False)
+        else:
+            _log(f"Serving {args.transport} on {args.host}:{args.port} with {args.workers} worker(s)")
+            serve_http(args.transport, args.host, args.port, args.workers, args.shutdown_timeout)
+        _log("mcp.run() completed (this might not be reached if server runs indefinitely)")
     except Exception as e:
         print(f"--- SVG MCP Server: CRITICAL ERROR during mcp.run(): {e} ---", file=sys.stderr)
         # Optionally, re-raise the exception if you want the script to exit with an error code
-        # raise 
\ No newline at end of file
+        # raise 
@@ -0,0 +1,290 @@
+"""
+SVG MCP Metrics
+
+Per-tool instrumentation: call and error counts, latency histograms, input
+sizes (prompt and SVG text) and output sizes (generated SVG bytes), plus how
+often each style and object branch of the generator was taken. The numbers are
+reported as a dictionary (for the `server_stats` tool) or in the Prometheus
+text exposition format.
+
+Tools are instrumented by decorating them with `ToolMetrics.instrument`; when
+metrics are disabled the decorator returns the tool unchanged, so it costs
+nothing. Tool handlers run on the event loop, so the counters need no lock.
+Each server process (or HTTP worker) keeps its own metrics.
+"""
+
+import functools
+import os
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram, as used by Prometheus.
+
+    Attributes:
+        bounds: Upper bounds of the buckets, ascending; an implicit last bucket holds the rest
+        counts: Observations per bucket (not cumulative)
+        total: Sum of all observed values
+        count: Number of observations
+    """
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by linear interpolation within the bucket it falls
+        in, like Prometheus' histogram_quantile.
+
+        Returns:
+            The estimate, the largest bound if it falls past the last one, or None without observations
+        """
+        if not self.count:
+            return None
+        rank, seen, lower = q * self.count, 0, 0.0
+        for bound, count in zip(self.bounds, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.bounds[-1]
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        """Yields (le, cumulative count) pairs, ending with "+Inf"."""
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            yield _format_bound(bound), seen
+        yield "+Inf", self.count
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(bound)
+
+
+def _is_numeric_array(value: Any) -> bool:
+    """Whether a list looks like numeric data (such as chart values or [x, y] pairs), judged by its first item."""
+    while isinstance(value, (list, tuple)) and value:
+        value = value[0]
+    return value.__class__ in (int, float)
+
+
+def _payload_size(value: Any) -> int:
+    """
+    Characters of text in an argument: strings, and strings nested in lists or
+    dicts. Numeric arrays hold no text and are not walked, which would cost a
+    call per number on large data.
+    """
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        if _is_numeric_array(value):
+            return 0
+        return sum(_payload_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_payload_size(item) for item in value.values())
+    return 0
+
+
+def _svg_results(result: Any) -> List[Dict[str, Any]]:
+    """The generation results inside a tool result: the result itself, or a batch's items."""
+    if not isinstance(result, dict):
+        return []
+    if isinstance(result.get("results"), list):
+        return [item for item in result["results"] if isinstance(item, dict)]
+    return [result]
+
+
+class ToolStats:
+    """Counters and histograms for one tool."""
+    __slots__ = ("calls", "errors", "latency", "input_size", "output_size")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.input_size = Histogram(SIZE_BUCKETS)
+        self.output_size = Histogram(SIZE_BUCKETS)
+
+
+class ToolMetrics:
+    """
+    Metrics for every instrumented tool.
+
+    Attributes:
+        enabled: Whether `instrument` wraps tools at all
+        tools: Tool name mapped to its statistics
+        styles: How often each detected style was generated
+        objects: How often each object was drawn
+        started_at: Wall-clock time the metrics were created
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.tools: Dict[str, ToolStats] = {}
+        self.styles: Counter = Counter()
+        self.objects: Counter = Counter()
+        self.started_at = time.time()
+
+    @classmethod
+    def from_env(cls) -> "ToolMetrics":
+        """Creates the metrics, disabled when SVG_MCP_METRICS is "0"."""
+        return cls(enabled=os.environ.get("SVG_MCP_METRICS", "1") != "0")
+
+    def instrument(self, tool: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        Decorates an async tool handler to record its calls.
+
+        Place it below `@mcp.tool()`. The handler's signature and docstring are
+        kept, so the tool schema does not change. A call counts as an error if
+        it raises or returns a dictionary with "success" false. Generation
+        results also record their detected style and objects, and their output
+        size whether the markup is inline, streamed or stored as an artifact.
+
+        Args:
+            tool: The tool handler
+
+        Returns:
+            The wrapped handler, or `tool` itself when metrics are disabled
+        """
+        if not self.enabled:
+            return tool
+        name, tools = tool.__name__, self.tools
+        tools[name] = ToolStats()
+
+        @functools.wraps(tool)
+        async def instrumented(*args: Any, **kwargs: Any) -> Any:
+            stats = tools[name]
+            started = time.perf_counter()
+            try:
+                result = await tool(*args, **kwargs)
+            except BaseException:
+                stats.latency.observe(time.perf_counter() - started)
+                stats.calls += 1
+                stats.errors += 1
+                raise
+            stats.latency.observe(time.perf_counter() - started)
+            stats.calls += 1
+            stats.input_size.observe(_payload_size(args) + _payload_size(kwargs))
+            self._record_result(stats, result)
+            return result
+
+        return instrumented
+
+    def _record_result(self, stats: ToolStats, result: Any) -> None:
+        if isinstance(result, dict) and result.get("success") is False:
+            stats.errors += 1
+        output_size = 0
+        for item in _svg_results(result):
+            if item.get("success") is False:
+                continue
+            svg_code, streamed = item.get("svg_code"), item.get("streamed")
+            # Streamed and stored results carry the size of the markup instead of the markup
+            if isinstance(svg_code, str):
+                output_size += len(svg_code) if svg_code.isascii() else len(svg_code.encode("utf-8"))
+            elif isinstance(item.get("svg_bytes"), int):
+                output_size += item["svg_bytes"]
+            elif isinstance(streamed, dict) and isinstance(streamed.get("bytes"), int):
+                output_size += streamed["bytes"]
+            if item.get("detected_style"):
+                self.styles[item["detected_style"]] += 1
+            self.objects.update(item.get("objects") or ())
+        if output_size:
+            stats.output_size.observe(output_size)
+
+    def reset(self) -> None:
+        """Zeroes every counter, keeping the instrumented tools."""
+        for name in self.tools:
+            self.tools[name] = ToolStats()
+        self.styles.clear()
+        self.objects.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a JSON-serializable dictionary.
+
+        Latency quantiles are estimated from the histogram buckets. Tools that
+        were never called are left out.
+        """
+        tools = {}
+        for name, stats in sorted(self.tools.items()):
+            if not stats.calls:
+                continue
+            latency = stats.latency
+            quantiles = {label: latency.quantile(q) for label, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))}
+            tools[name] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "latency_ms": {
+                    "mean": round(latency.total / latency.count * 1000, 3) if latency.count else None,
+                    **{label: round(value * 1000, 3) if value is not None else None for label, value in quantiles.items()},
+                    "total": round(latency.total * 1000, 3),
+                },
+                "input_chars": {"total": int(stats.input_size.total), "count": stats.input_size.count},
+                "output_bytes": {"total": int(stats.output_size.total), "count": stats.output_size.count},
+            }
+        return {
+            "enabled": self.enabled,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "tools": tools,
+            "styles": dict(self.styles.most_common()),
+            "objects": dict(self.objects.most_common()),
+        }
+
+    def to_prometheus(self, gauges: Optional[Dict[str, float]] = None, prefix: str = "svg_mcp") -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Args:
+            gauges: Extra name -> value pairs to expose as gauges (e.g. cache occupancy)
+            prefix: Prefix of every metric name
+
+        Returns:
+            The exposition text
+        """
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        metric = family("tool_calls_total", "counter", "Tool calls.")
+        lines.extend(f'{metric}{{tool="{name}"}} {stats.calls}' for name, stats in sorted(self.tools.items()))
+        metric = family("tool_errors_total", "counter", "Tool calls that raised or reported failure.")
+        lines.extend(f'{metric}{{tool="{name}"}} {stats.errors}' for name, stats in sorted(self.tools.items()))
+        for attribute, name, help_text in (
+            ("latency", "tool_latency_seconds", "Tool call latency."),
+            ("input_size", "tool_input_chars", "Characters of text in tool arguments."),
+            ("output_size", "tool_output_bytes", "Bytes of SVG markup returned by generation tools."),
+        ):
+            metric = family(name, "histogram", help_text)
+            for tool, stats in sorted(self.tools.items()):
+                histogram = getattr(stats, attribute)
+                lines.extend(f'{metric}_bucket{{tool="{tool}",le="{le}"}} {count}' for le, count in histogram.cumulative())
+                lines.append(f'{metric}_sum{{tool="{tool}"}} {histogram.total!r}')
+                lines.append(f'{metric}_count{{tool="{tool}"}} {histogram.count}')
+        metric = family("style_total", "counter", "Generated SVGs per detected style.")
+        lines.extend(f'{metric}{{style="{style}"}} {count}' for style, count in sorted(self.styles.items()))
+        metric = family("object_total", "counter", "Objects drawn per kind.")
+        lines.extend(f'{metric}{{object="{name}"}} {count}' for name, count in sorted(self.objects.items()))
+        for name, value in (gauges or {}).items():
+            metric = family(name, "gauge", name.replace("_", " ").capitalize() + ".")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
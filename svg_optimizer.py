@@ -0,0 +1,385 @@
+"""
+SVG Optimizer
+
+A pure-Python optimization pass for SVG markup, covering the SVGO passes that
+matter for generated graphics:
+
+- drops comments, the XML declaration and whitespace-only text
+- removes `<defs>` entries that nothing references via `url(#...)` or `href`
+- rewrites path data with the shortest absolute/relative commands
+- rounds numeric attributes to a fixed number of decimals, keeping more in
+  transforms, opacities and filter parameters
+- hoists presentation attributes shared by every child of a group onto the group
+
+The input is parsed with the standard library's ElementTree, so nothing outside
+the Python runtime is required.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Set, Tuple
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace("", SVG_NAMESPACE)
+ET.register_namespace("xlink", XLINK_NAMESPACE)
+
+_SVG = f"{{{SVG_NAMESPACE}}}"
+_HREF_ATTRIBUTES = ("href", f"{{{XLINK_NAMESPACE}}}href")
+
+# Attributes holding coordinates, lengths or lists of them
+_NUMERIC_ATTRIBUTES = frozenset((
+    "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "fx", "fy",
+    "width", "height", "points", "viewBox", "stroke-width", "stroke-dasharray", "stroke-dashoffset",
+    "font-size", "dx", "dy"
+))
+
+# Opacities, gradient offsets and filter parameters, which are mostly fractions:
+# rounding them like coordinates could make a shape invisible (fill-opacity .3 at
+# precision 0) or switch a filter off, so they keep at least PARAMETER_PRECISION decimals
+_PARAMETER_ATTRIBUTES = frozenset((
+    "offset", "opacity", "fill-opacity", "stroke-opacity", "stop-opacity",
+    "stdDeviation", "scale", "radius", "baseFrequency"
+))
+PARAMETER_PRECISION = 3
+
+# Transform lists, whose scale and matrix factors multiply every coordinate
+# they apply to and so keep more decimals than the coordinates themselves, as
+# svgo's transformPrecision does
+_TRANSFORM_ATTRIBUTES = frozenset(("transform", "gradientTransform", "patternTransform"))
+TRANSFORM_EXTRA_PRECISION = 3
+
+# Presentation attributes that are inherited, and so can move from children to their group
+_INHERITED_ATTRIBUTES = (
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity",
+    "stroke-dasharray", "stroke-linecap", "stroke-linejoin", "font-family", "font-size",
+    "text-anchor", "dominant-baseline"
+)
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_URL_REFERENCE = re.compile(r"url\(\s*['\"]?#([^)'\"\s]+)")
+_CSS_ID = re.compile(r"#([A-Za-z_][\w.:-]*)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Path data grammar: parameter count per command, and which parameters are arc flags
+_PATH_COMMAND = re.compile(r"[\s,]*([MmZzLlHhVvCcSsQqTtAa])")
+_PATH_NUMBER = re.compile(r"[\s,]*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+_PATH_FLAG = re.compile(r"[\s,]*([01])")
+_PATH_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+def format_number(value: float, precision: int) -> str:
+    """
+    Formats a number as compactly as possible at the given precision.
+
+    Trailing zeros and the leading zero of fractions are dropped, so 0.50
+    becomes ".5" and -0.25 becomes "-.25".
+    """
+    text = f"{round(value, precision):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text.startswith("0.") or text.startswith("-0."):
+        text = text.replace("0.", ".", 1)
+    return "0" if text in ("-0", "") else text
+
+
+def _round_numbers(value: str, precision: int) -> str:
+    """Rounds every number inside an attribute value, keeping units and separators."""
+    return _NUMBER.sub(lambda m: format_number(float(m.group()), precision), value)
+
+
+def _parse_path(d: str) -> List[Tuple[str, List[float]]]:
+    """
+    Parses path data into absolute (command, parameters) segments.
+
+    Relative commands are resolved against the current point, implicit repeats
+    are expanded, and an implicit lineto after a moveto becomes an explicit L.
+
+    Raises:
+        ValueError: If the path data is malformed
+    """
+    segments: List[Tuple[str, List[float]]] = []
+    x = y = start_x = start_y = 0.0
+    pos, end = 0, len(d.rstrip(" \t\r\n,"))
+    command = None
+    while pos < end:
+        match = _PATH_COMMAND.match(d, pos)
+        if match:
+            command = match.group(1)
+            pos = match.end()
+        elif command is None or command in "Zz":
+            raise ValueError(f"Unexpected path data at offset {pos}")
+        elif command == "M":
+            command = "L"
+        elif command == "m":
+            command = "l"
+
+        upper = command.upper()
+        relative = command != upper
+        params: List[float] = []
+        for index in range(_PATH_ARITY[upper]):
+            pattern = _PATH_FLAG if upper == "A" and index in (3, 4) else _PATH_NUMBER
+            number = pattern.match(d, pos)
+            if not number:
+                raise ValueError(f"Expected a number at offset {pos}")
+            params.append(float(number.group(1)))
+            pos = number.end()
+
+        if upper == "Z":
+            x, y = start_x, start_y
+            segments.append(("Z", params))
+            continue
+        if relative:
+            if upper == "H":
+                params[0] += x
+            elif upper == "V":
+                params[0] += y
+            elif upper == "A":
+                params[5] += x
+                params[6] += y
+            else:
+                for i in range(0, len(params), 2):
+                    params[i] += x
+                    params[i + 1] += y
+        if upper == "H":
+            x = params[0]
+        elif upper == "V":
+            y = params[0]
+        else:
+            x, y = params[-2], params[-1]
+        if upper == "M":
+            start_x, start_y = x, y
+        segments.append((upper, params))
+    return segments
+
+
+def _join_numbers(numbers: List[str]) -> str:
+    """Joins formatted numbers, omitting the separator where a sign or dot already splits them."""
+    parts = [numbers[0]]
+    for previous, number in zip(numbers, numbers[1:]):
+        if not (number[0] == "-" or (number[0] == "." and ("." in previous or "e" in previous))):
+            parts.append(" ")
+        parts.append(number)
+    return "".join(parts)
+
+
+def optimize_path_data(d: str, precision: int = 2) -> str:
+    """
+    Rewrites path data in its shortest form.
+
+    Every segment is emitted as either its absolute or its relative command,
+    whichever is shorter, with lines along an axis turned into H/V, repeated
+    command letters omitted and numbers rounded to `precision` decimals.
+    Relative offsets are computed from the rounded output positions, so
+    rounding errors never accumulate along the path.
+
+    Args:
+        d: The original path data
+        precision: Number of decimals to keep
+
+    Returns:
+        The optimized path data, or `d` unchanged if it cannot be parsed
+    """
+    try:
+        segments = _parse_path(d)
+    except ValueError:
+        return d
+
+    def fmt(value: float) -> str:
+        return format_number(value, precision)
+
+    def rounded(value: float) -> float:
+        return round(value, precision)
+
+    output: List[str] = []
+    previous_command = ""
+    last_number = ""
+    x = y = start_x = start_y = 0.0
+    for command, params in segments:
+        if command == "Z":
+            candidates = [("z", [])]
+            x, y = start_x, start_y
+        else:
+            params = [rounded(value) for value in params]
+            if command == "L" and params[0] == x:
+                command, params = "V", [params[1]]
+            elif command == "L" and params[1] == y:
+                command, params = "H", [params[0]]
+
+            if command == "H":
+                absolute = [fmt(params[0])]
+                relative = [fmt(params[0] - x)]
+                x = params[0]
+            elif command == "V":
+                absolute = [fmt(params[0])]
+                relative = [fmt(params[0] - y)]
+                y = params[0]
+            elif command == "A":
+                absolute = [fmt(value) for value in params]
+                relative = absolute[:5] + [fmt(params[5] - x), fmt(params[6] - y)]
+                x, y = params[5], params[6]
+            else:
+                absolute = [fmt(value) for value in params]
+                relative = [fmt(value - (x if i % 2 == 0 else y)) for i, value in enumerate(params)]
+                x, y = params[-2], params[-1]
+            if command == "M":
+                start_x, start_y = x, y
+            candidates = [(command, absolute), (command.lower(), relative)]
+
+        best = None
+        for letter, numbers in candidates:
+            # The letter can be dropped when it repeats, or for a lineto right after a
+            # moveto; a repeated moveto cannot, since its extra pairs mean lineto
+            implicit = (previous_command == letter and letter not in "Mm") or \
+                (previous_command, letter) in (("M", "L"), ("m", "l"))
+            if not numbers:
+                text = letter
+            elif implicit:
+                text = _join_numbers([last_number] + numbers)[len(last_number):]
+            else:
+                text = letter + _join_numbers(numbers)
+            if best is None or len(text) < len(best[0]):
+                best = (text, letter, numbers)
+
+        text, letter, numbers = best
+        output.append(text)
+        previous_command = letter
+        last_number = numbers[-1] if numbers else ""
+    return "".join(output)
+
+
+def _collect_references(root: ET.Element, skip: Set[int]) -> Set[str]:
+    """Collects the ids referenced anywhere outside the subtrees whose id() is in `skip`."""
+    references: Set[str] = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if id(element) in skip:
+            continue
+        for name, value in element.attrib.items():
+            if name in _HREF_ATTRIBUTES and value.startswith("#"):
+                references.add(value[1:])
+            elif "url(" in value:
+                references.update(_URL_REFERENCE.findall(value))
+        if element.tag in (f"{_SVG}style", "style") and element.text:
+            references.update(_CSS_ID.findall(element.text))
+        stack.extend(element)
+    return references
+
+
+def _remove_unused_defs(root: ET.Element) -> List[str]:
+    """
+    Removes `<defs>` children that nothing references, and then any empty `<defs>`.
+
+    Only children with an id are candidates: anything else, such as a
+    `<style>` sheet, takes effect without being referenced and is always kept.
+    Definitions only referenced by other unused definitions are removed as
+    well. Documents with scripts are left alone, since a script could look up
+    any id.
+
+    Returns:
+        The ids of the removed definitions, in document order
+    """
+    if any(element.tag in (f"{_SVG}script", "script") for element in root.iter()):
+        return []
+    defs_sections = [element for element in root.iter() if element.tag in (f"{_SVG}defs", "defs")]
+    candidates = [(defs, child) for defs in defs_sections for child in defs if child.get("id")]
+    unused: Dict[int, Tuple[ET.Element, ET.Element]] = {}
+    while True:
+        references = _collect_references(root, set(unused))
+        newly_unused = [
+            (defs, child) for defs, child in candidates
+            if id(child) not in unused
+            and not any(element.get("id") in references for element in child.iter())
+        ]
+        if not newly_unused:
+            break
+        for defs, child in newly_unused:
+            unused[id(child)] = (defs, child)
+
+    removed = []
+    for defs, child in candidates:
+        if id(child) in unused:
+            defs.remove(child)
+            removed.append(child.get("id"))
+    parents = {child: parent for parent in root.iter() for child in parent}
+    for defs in defs_sections:
+        if len(defs) == 0 and defs in parents:
+            parents[defs].remove(defs)
+    return removed
+
+
+def _hoist_shared_attributes(root: ET.Element) -> None:
+    """
+    Moves inherited presentation attributes that every child of a group sets to
+    the same value onto the group itself.
+    """
+    # Innermost groups first, so attributes can keep moving up through nested groups
+    for group in reversed(list(root.iter())):
+        if group.tag not in (f"{_SVG}g", "g") or len(group) < 2:
+            continue
+        children = list(group)
+        for name in _INHERITED_ATTRIBUTES:
+            if name in group.attrib:
+                continue
+            value = children[0].get(name)
+            if value is not None and all(child.get(name) == value for child in children[1:]):
+                group.set(name, value)
+                for child in children:
+                    del child.attrib[name]
+
+
+def _clean_element(element: ET.Element, precision: int) -> None:
+    """Rounds numeric attributes, optimizes path data and collapses whitespace."""
+    for item in element.iter():
+        attrib = item.attrib
+        for name, value in attrib.items():
+            if name in _NUMERIC_ATTRIBUTES:
+                attrib[name] = _round_numbers(value, precision)
+            elif name in _PARAMETER_ATTRIBUTES:
+                attrib[name] = _round_numbers(value, max(precision, PARAMETER_PRECISION))
+            elif name in _TRANSFORM_ATTRIBUTES:
+                attrib[name] = _round_numbers(value, precision + TRANSFORM_EXTRA_PRECISION)
+            elif name == "d":
+                attrib[name] = optimize_path_data(value, precision)
+        preserve = item.get("{http://www.w3.org/XML/1998/namespace}space") == "preserve"
+        if item.text is not None and not preserve:
+            item.text = None if (len(item) and not item.text.strip()) else _WHITESPACE.sub(" ", item.text)
+        if item.tail is not None and not item.tail.strip():
+            item.tail = None
+
+
+def optimize_svg(svg_code: str, precision: int = 2) -> Dict[str, Any]:
+    """
+    Optimizes an SVG document.
+
+    Args:
+        svg_code: The SVG markup to optimize
+        precision: Number of decimals to keep in coordinates and lengths;
+            transforms keep TRANSFORM_EXTRA_PRECISION more, and opacities and
+            filter parameters at least PARAMETER_PRECISION
+
+    Returns:
+        A dictionary with the optimized `svg_code`, the `original_bytes` and
+        `optimized_bytes` sizes (UTF-8) and the ids of the `removed_defs`
+
+    Raises:
+        ValueError: If the markup is not well-formed XML
+    """
+    try:
+        root = ET.fromstring(svg_code)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid SVG markup: {e}") from e
+
+    removed_defs = _remove_unused_defs(root)
+    _clean_element(root, precision)
+    _hoist_shared_attributes(root)
+
+    optimized = ET.tostring(root, encoding="unicode").replace(" />", "/>")
+    return {
+        "svg_code": optimized,
+        "original_bytes": len(svg_code.encode("utf-8")),
+        "optimized_bytes": len(optimized.encode("utf-8")),
+        "removed_defs": removed_defs
+    }
@@ -0,0 +1,206 @@
+"""
+SVG Rasterizer
+
+Renders SVG markup to PNG with whichever renderer is available locally:
+CairoSVG (when libcairo is installed), resvg, rsvg-convert or Inkscape.
+
+Every job runs as a separate process that reads the SVG on stdin and writes the
+PNG to stdout. The number of concurrent jobs is bounded and each job has a
+timeout after which its process is killed, so a pathological document can
+neither block the event loop nor pile up work.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import sys
+from typing import Callable, List, Optional, Tuple
+
+# Renderer name, and a function building its command line for a given output size.
+# Tried in this order when no renderer is configured.
+RENDERER_COMMANDS = (
+    ("cairosvg", lambda width, height: [
+        sys.executable, "-m", "cairosvg", "-", "-f", "png", "-o", "-",
+        "--output-width", str(width), "--output-height", str(height)
+    ]),
+    ("resvg", lambda width, height: ["resvg", "-w", str(width), "-h", str(height), "-", "-c"]),
+    ("rsvg-convert", lambda width, height: ["rsvg-convert", "-f", "png", "-w", str(width), "-h", str(height)]),
+    ("inkscape", lambda width, height: [
+        "inkscape", "--pipe", "--export-type=png", "--export-filename=-", "-w", str(width), "-h", str(height)
+    ]),
+)
+
+_SVG_START_TAG = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+_DIMENSION = re.compile(r'\b(width|height|viewBox)\s*=\s*["\']([^"\']*)["\']')
+_LENGTH = re.compile(r"\s*([0-9]*\.?[0-9]+)\s*(px)?\s*$")
+
+
+class RasterizationError(RuntimeError):
+    """Raised when an SVG cannot be rendered."""
+
+
+def _renderer_available(name: str) -> bool:
+    if name == "cairosvg":
+        try:
+            import cairosvg  # noqa: F401 - fails with OSError when libcairo is missing
+        except (ImportError, OSError):
+            return False
+        return True
+    return shutil.which(name) is not None
+
+
+def find_renderer(preferred: Optional[str] = None) -> Optional[str]:
+    """
+    Picks the renderer to use.
+
+    Args:
+        preferred: A renderer name from RENDERER_COMMANDS, or None to use the
+                   first one that is installed
+
+    Returns:
+        The renderer name, or None if no renderer is available
+    """
+    names = [name for name, _ in RENDERER_COMMANDS]
+    if preferred:
+        names = [preferred] if preferred in names else []
+    return next((name for name in names if _renderer_available(name)), None)
+
+
+def intrinsic_size(svg_code: str) -> Optional[Tuple[float, float]]:
+    """
+    Reads the document size from the root element's width/height, or its viewBox.
+
+    Relative lengths such as percentages are ignored.
+
+    Returns:
+        A (width, height) tuple, or None if the document does not declare a size
+    """
+    match = _SVG_START_TAG.search(svg_code)
+    if not match:
+        return None
+    attributes = dict(_DIMENSION.findall(match.group()))
+    width, height = (_LENGTH.match(attributes.get(name, "")) for name in ("width", "height"))
+    if width and height:
+        return float(width.group(1)), float(height.group(1))
+    view_box = attributes.get("viewBox", "").replace(",", " ").split()
+    if len(view_box) == 4:
+        try:
+            return float(view_box[2]), float(view_box[3])
+        except ValueError:
+            return None
+    return None
+
+
+def resolve_output_size(svg_code: str, width: Optional[int], height: Optional[int]) -> Tuple[int, int]:
+    """
+    Works out the output size in pixels.
+
+    A missing dimension is derived from the document's aspect ratio; without
+    either, the document's own size is used (300x300 if it declares none).
+    """
+    size = intrinsic_size(svg_code)
+    if width and height:
+        return width, height
+    if size and size[0] > 0 and size[1] > 0:
+        if width:
+            return width, max(1, round(width * size[1] / size[0]))
+        if height:
+            return max(1, round(height * size[0] / size[1])), height
+        return max(1, round(size[0])), max(1, round(size[1]))
+    return width or height or 300, height or width or 300
+
+
+class SVGRasterizer:
+    """
+    A bounded pool of renderer processes.
+
+    Attributes:
+        renderer: The renderer name, or None to detect one on first use
+        workers: Maximum number of renders running at once
+        timeout: Seconds a render may take before its process is killed
+        max_pixels: Largest accepted output area (width * height)
+    """
+
+    def __init__(self, renderer: Optional[str] = None, workers: int = 2,
+                 timeout: float = 20.0, max_pixels: int = 4_000_000):
+        self.renderer = renderer
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pixels = max_pixels
+        self._detected = False
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_env(cls) -> "SVGRasterizer":
+        """
+        Creates a rasterizer configured from SVG_MCP_RASTER_* environment variables.
+
+        SVG_MCP_RASTER_RENDERER forces a renderer; SVG_MCP_RASTER_WORKERS,
+        SVG_MCP_RASTER_TIMEOUT (seconds) and SVG_MCP_RASTER_MAX_PIXELS set the limits.
+        """
+        return cls(
+            renderer=os.environ.get("SVG_MCP_RASTER_RENDERER") or None,
+            workers=int(os.environ.get("SVG_MCP_RASTER_WORKERS", 0)) or min(4, os.cpu_count() or 1),
+            timeout=float(os.environ.get("SVG_MCP_RASTER_TIMEOUT", 20)),
+            max_pixels=int(os.environ.get("SVG_MCP_RASTER_MAX_PIXELS", 4_000_000))
+        )
+
+    def resolve_renderer(self) -> Optional[str]:
+        """Returns the renderer to use, detecting it once."""
+        if not self._detected:
+            self.renderer = find_renderer(self.renderer)
+            self._detected = True
+        return self.renderer
+
+    def check_size(self, width: int, height: int) -> None:
+        """
+        Raises:
+            RasterizationError: If the output size is not positive or exceeds max_pixels
+        """
+        if width < 1 or height < 1:
+            raise RasterizationError("Output width and height must be positive")
+        if width * height > self.max_pixels:
+            raise RasterizationError(
+                f"Output of {width}x{height} pixels exceeds the limit of {self.max_pixels} pixels"
+            )
+
+    async def render(self, svg_code: str, width: int, height: int) -> bytes:
+        """
+        Renders SVG markup to PNG bytes at the given size.
+
+        Raises:
+            RasterizationError: If no renderer is available, the size is out of
+                                bounds, the renderer fails or the job times out
+        """
+        self.check_size(width, height)
+        renderer = self.resolve_renderer()
+        if renderer is None:
+            raise RasterizationError(
+                "No SVG renderer available; install cairosvg (with libcairo), resvg or rsvg-convert"
+            )
+        build_command: Callable[[int, int], List[str]] = dict(RENDERER_COMMANDS)[renderer]
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            process = await asyncio.create_subprocess_exec(
+                *build_command(width, height),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                png, errors = await asyncio.wait_for(process.communicate(svg_code.encode("utf-8")), self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise RasterizationError(f"Rendering timed out after {self.timeout:g} seconds")
+            except asyncio.CancelledError:
+                process.kill() # Never leave an orphaned renderer behind a cancelled request
+                raise
+
+        if process.returncode != 0 or not png.startswith(b"\x89PNG"):
+            detail = errors.decode("utf-8", "replace").strip().splitlines()
+            raise RasterizationError(
+                f"{renderer} failed with exit code {process.returncode}" + (f": {detail[-1]}" if detail else "")
+            )
+        return png
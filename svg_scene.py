@@ -0,0 +1,416 @@
+"""
+SVG Scene Graph
+
+Lightweight node classes for building SVG documents as inspectable trees, and a
+single streaming serializer that writes them out with minimal whitespace.
+
+Keyword attributes use Python spelling and are converted to SVG spelling once,
+at construction: underscores become hyphens (``stroke_width`` -> ``stroke-width``)
+and a trailing underscore is dropped (``in_`` -> ``in``). Float values are
+written with at most two decimals.
+"""
+
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+
+class _AttributeNames(dict):
+    """Memoizes the conversion of Python keyword names to SVG attribute names."""
+
+    def __missing__(self, key: str) -> str:
+        name = self[key] = key.rstrip("_").replace("_", "-")
+        return name
+
+
+_ATTR_NAMES = _AttributeNames()
+_ATTR_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", '"': "&quot;"})
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_URL_REFERENCE = re.compile(r"url\(#([^)]+)\)")
+_SLOT = re.compile(r"\x00(\w+)\x00")
+
+
+def format_number(value: float) -> str:
+    """
+    Formats a coordinate or length with at most two decimals and no trailing zeros.
+    """
+    if type(value) is int:
+        return str(value)
+    if value.is_integer():
+        return str(int(value))
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class Node:
+    """
+    Base class for every element in the scene graph.
+
+    Attributes:
+        attrs: SVG attribute names mapped to their values, in output order
+        children: Child nodes, serialized in order
+    """
+    __slots__ = ("attrs", "children")
+    tag = ""
+
+    def __init__(self, attrs: Optional[Dict[str, Any]] = None, children: Optional[List["Node"]] = None):
+        # Python keyword names become SVG attribute names; None values are dropped
+        self.attrs = {_ATTR_NAMES[key]: value for key, value in attrs.items() if value is not None} if attrs else {}
+        self.children = children if children is not None else []
+
+    def append(self, *nodes: "Node") -> "Node":
+        """Appends child nodes, skipping None, and returns self for chaining."""
+        self.children.extend(node for node in nodes if node is not None)
+        return self
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.tag} {self.attrs!r} children={len(self.children)}>"
+
+
+class Element(Node):
+    """A generic element for tags without a dedicated class (filters, gradients, stops...)."""
+    __slots__ = ("tag",)
+
+    def __init__(self, tag: str, *children: Node, **attrs: Any):
+        Node.__init__(self, attrs, [child for child in children if child is not None])
+        self.tag = tag
+
+
+class Group(Node):
+    """A `<g>` element."""
+    __slots__ = ()
+    tag = "g"
+
+    def __init__(self, *children: Node, **attrs: Any):
+        Node.__init__(self, attrs, [child for child in children if child is not None])
+
+
+class Defs(Node):
+    """A `<defs>` section holding reusable definitions."""
+    __slots__ = ()
+    tag = "defs"
+
+    def __init__(self, *children: Node):
+        Node.__init__(self, None, [child for child in children if child is not None])
+
+
+class Rect(Node):
+    """A `<rect>` element."""
+    __slots__ = ()
+    tag = "rect"
+
+    def __init__(self, **attrs: Any):
+        Node.__init__(self, attrs)
+
+
+class Circle(Node):
+    """A `<circle>` element."""
+    __slots__ = ()
+    tag = "circle"
+
+    def __init__(self, **attrs: Any):
+        Node.__init__(self, attrs)
+
+
+class Ellipse(Node):
+    """An `<ellipse>` element."""
+    __slots__ = ()
+    tag = "ellipse"
+
+    def __init__(self, **attrs: Any):
+        Node.__init__(self, attrs)
+
+
+class Line(Node):
+    """A `<line>` element."""
+    __slots__ = ()
+    tag = "line"
+
+    def __init__(self, **attrs: Any):
+        Node.__init__(self, attrs)
+
+
+class Path(Node):
+    """A `<path>` element; `d` holds the path data."""
+    __slots__ = ()
+    tag = "path"
+
+    def __init__(self, d: str, **attrs: Any):
+        Node.__init__(self, {"d": d, **attrs})
+
+
+class Polygon(Node):
+    """A `<polygon>` element; `points` holds the "x,y x,y ..." point list."""
+    __slots__ = ()
+    tag = "polygon"
+
+    def __init__(self, points: str, **attrs: Any):
+        Node.__init__(self, {"points": points, **attrs})
+
+
+class Text(Node):
+    """A `<text>` element (or `<title>`, via the `tag` argument) with escaped content."""
+    __slots__ = ("tag", "content")
+
+    def __init__(self, content: str, tag: str = "text", **attrs: Any):
+        Node.__init__(self, attrs)
+        self.tag = tag
+        self.content = content
+
+
+class Fragment(Node):
+    """
+    Pre-serialized markup written out verbatim.
+
+    Used to memoize subtrees that are expensive to rebuild but never change for
+    a given set of inputs; build one with `Fragment.of(node)`.
+
+    Attributes:
+        markup: The serialized subtree
+        references: Ids the markup points at, reported by `collect_references`
+    """
+    __slots__ = ("markup", "references")
+
+    def __init__(self, markup: str, references: FrozenSet[str] = frozenset()):
+        Node.__init__(self)
+        self.markup = markup
+        self.references = references
+
+    @classmethod
+    def of(cls, node: Node) -> "Fragment":
+        """Serializes `node` once and wraps the result."""
+        return cls(to_svg_string(node), frozenset(collect_references(node)))
+
+
+def slot(name: str) -> str:
+    """Returns the placeholder for a template slot, to be used as an attribute value."""
+    return f"\x00{name}\x00"
+
+
+class Template:
+    """
+    A serialized subtree with named slots, filled in by joining strings.
+
+    Build the subtree once with `slot(name)` wherever a variable value goes: as
+    an attribute value, as text content, or as `Fragment(slot(name))` for
+    markup. Compile it, and every later rendering is a single join instead of
+    a tree build and serialization.
+
+    Attributes:
+        parts: Literal markup at even indexes and slot names at odd indexes
+        references: Ids the compiled subtree points at
+    """
+    __slots__ = ("parts", "escapes", "references")
+
+    def __init__(self, node: Node):
+        self._compile(_SLOT.split(to_svg_string(node)), frozenset(collect_references(node)))
+
+    @classmethod
+    def from_parts(cls, parts: List[str], references: Iterable[str] = ()) -> "Template":
+        """Rebuilds a compiled template from its `parts` and `references`, e.g. as saved to a file."""
+        template = cls.__new__(cls)
+        template._compile(list(parts), frozenset(references))
+        return template
+
+    def _compile(self, parts: List[str], references: FrozenSet[str]) -> None:
+        self.parts = parts
+        # A slot right after an opening quote is an attribute value, anything else is content
+        self.escapes = {
+            index: _ATTR_ESCAPES if parts[index - 1].endswith('"') else _TEXT_ESCAPES
+            for index in range(1, len(parts), 2)
+        }
+        self.references = references
+
+    def fill(self, values: Mapping[str, Any]) -> Fragment:
+        """
+        Substitutes every slot.
+
+        String values are escaped for where their slot appears; Fragment values
+        are inserted verbatim and other nodes serialized, and their references
+        carried over.
+
+        Raises:
+            KeyError: If a slot has no value
+        """
+        parts = self.parts[:]
+        references = self.references
+        for index, escapes in self.escapes.items():
+            value = values[parts[index]]
+            if value.__class__ is Fragment:
+                parts[index] = value.markup
+                if value.references:
+                    references = references | value.references
+            elif isinstance(value, Node):
+                parts[index] = to_svg_string(value)
+                references = references | collect_references(value)
+            elif "&" in value or "<" in value or '"' in value or ">" in value:
+                parts[index] = value.translate(escapes)
+            else:
+                parts[index] = value
+        return Fragment("".join(parts), references)
+
+    def iter_fill(self, values: Mapping[str, Any]) -> Iterator[str]:
+        """
+        Substitutes every slot like `fill`, yielding the markup piece by piece.
+
+        Node values are serialized with `iter_svg` as they are reached, so the
+        document is never joined into one string. References are not collected.
+
+        Raises:
+            KeyError: If a slot has no value
+        """
+        parts, escapes = self.parts, self.escapes
+        for index in range(1, len(parts), 2):
+            yield parts[index - 1]
+            value = values[parts[index]]
+            if value.__class__ is Fragment:
+                yield value.markup
+            elif isinstance(value, Node):
+                yield from iter_svg(value)
+            elif "&" in value or "<" in value or '"' in value or ">" in value:
+                yield value.translate(escapes[index])
+            else:
+                yield value
+        yield parts[-1]
+
+
+class Svg(Node):
+    """The root `<svg>` element of a document."""
+    __slots__ = ()
+    tag = "svg"
+
+    def __init__(self, width: float, height: float, *children: Node, **attrs: Any):
+        Node.__init__(
+            self,
+            {"viewBox": f"0 0 {format_number(width)} {format_number(height)}", "xmlns": SVG_NAMESPACE, **attrs},
+            [child for child in children if child is not None]
+        )
+
+
+def collect_references(node: Node) -> Set[str]:
+    """
+    Collects the ids a subtree points at through `url(#id)` values or `href="#id"`.
+
+    Pre-serialized fragments contribute the references recorded when they were built.
+
+    Args:
+        node: The root of the subtree to scan
+
+    Returns:
+        The referenced ids
+    """
+    references: Set[str] = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is Fragment:
+            references.update(node.references)
+            continue
+        for name, value in node.attrs.items():
+            if value.__class__ is str:
+                if "url(#" in value:
+                    references.update(_URL_REFERENCE.findall(value))
+                elif name == "href" and value.startswith("#"):
+                    references.add(value[1:])
+        stack.extend(node.children)
+    return references
+
+
+def iter_svg(node: Node) -> Iterator[str]:
+    """
+    Serializes a node and its subtree with minimal whitespace, piece by piece.
+
+    The tree is walked iteratively, yielding one piece per start tag and
+    closing tag (and each pre-serialized fragment whole), so deep or wide
+    documents cost no Python recursion and are never held as one string.
+
+    Args:
+        node: The root of the subtree to serialize
+
+    Yields:
+        Successive pieces of the markup
+    """
+    stack: List[Any] = [node]
+    pop, push, extend = stack.pop, stack.append, stack.extend
+    while stack:
+        node = pop()
+        if node.__class__ is str: # A pending closing tag
+            yield node
+            continue
+        if node.__class__ is Fragment:
+            yield node.markup
+            continue
+        tag = node.tag
+        parts = ["<", tag]
+        for name, value in node.attrs.items():
+            kind = value.__class__
+            if kind is str:
+                if '"' in value or "&" in value or "<" in value:
+                    value = value.translate(_ATTR_ESCAPES)
+            elif kind is float:
+                value = format_number(value)
+            elif kind is not int:
+                value = str(value).translate(_ATTR_ESCAPES)
+            parts.append(f' {name}="{value}"')
+        if node.__class__ is Text:
+            parts.append(f">{node.content.translate(_TEXT_ESCAPES)}</{tag}>")
+            yield "".join(parts)
+        elif node.children:
+            parts.append(">")
+            yield "".join(parts)
+            push(f"</{tag}>")
+            extend(reversed(node.children))
+        else:
+            parts.append("/>")
+            yield "".join(parts)
+
+
+def write_svg(node: Node, write: Callable[[str], Any]) -> None:
+    """
+    Streams a node and its subtree to `write` with minimal whitespace.
+
+    Args:
+        node: The root of the subtree to serialize
+        write: A callable receiving successive output fragments, such as
+               `list.append` or `io.StringIO.write`
+    """
+    for piece in iter_svg(node):
+        write(piece)
+
+
+def to_svg_string(node: Node) -> str:
+    """
+    Serializes a node and its subtree to a string.
+    """
+    return "".join(iter_svg(node))
+
+
+def iter_chunks(pieces: Iterable[str], size: int) -> Iterator[str]:
+    """
+    Regroups markup pieces into chunks of exactly `size` characters, except the last.
+
+    Small pieces are buffered and large ones split, so at most one chunk's worth
+    of text is held besides the piece being split.
+
+    Args:
+        pieces: The markup, in order, such as from `iter_svg` or `Template.iter_fill`
+        size: Characters per chunk
+
+    Yields:
+        The chunks
+    """
+    buffer: List[str] = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            text = "".join(buffer)
+            end = length - length % size
+            for start in range(0, end, size):
+                yield text[start:start + size]
+            buffer = [text[end:]]
+            length -= end
+    if length:
+        yield "".join(buffer)
@@ -0,0 +1,128 @@
+"""
+SVG Knowledge Search
+
+A small in-memory full-text index with BM25 ranking (Robertson et al.), used
+to search the server's static content (prompt examples, best practices, guide
+points and snippets) so clients can fetch the few entries they need instead of
+whole listings.
+
+The index is inverted: every term maps to the documents containing it and its
+frequency in each. A query only visits the postings of its own terms, so
+searching costs little however large the corpus is. Titles count twice, which
+is a simple form of field weighting.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "into", "is", "it", "its", "of",
+    "on", "or", "that", "the", "this", "to", "use", "using", "with", "you", "your"
+))
+
+
+class Document(NamedTuple):
+    """
+    An indexed entry.
+
+    Attributes:
+        id: Unique identifier, such as "best_practice:3"
+        kind: The kind of entry, which searches can filter on
+        title: Short heading, weighted above the text
+        text: Body text to index
+        payload: What a search result returns for this entry
+    """
+    id: str
+    kind: str
+    title: str
+    text: str
+    payload: Dict[str, Any]
+
+
+def _stem(word: str) -> str:
+    """Folds simple English plurals ("icons", "categories") onto their singular."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word terms of a text, without stopwords, with plurals folded."""
+    return [_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+class SearchIndex:
+    """
+    A BM25-ranked inverted index over a fixed set of documents.
+
+    Args:
+        documents: The documents to index; their order breaks score ties
+    """
+
+    def __init__(self, documents: Iterable[Document]):
+        self.documents: List[Document] = list(documents)
+        self.kinds: Tuple[str, ...] = tuple(dict.fromkeys(document.kind for document in self.documents))
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list) # term -> [(document, frequency)]
+        self.lengths: List[int] = []
+        for number, document in enumerate(self.documents):
+            terms = Counter(tokenize(document.text))
+            for term in tokenize(document.title):
+                terms[term] += TITLE_WEIGHT
+            for term, frequency in terms.items():
+                self.postings[term].append((number, frequency))
+            self.lengths.append(sum(terms.values()))
+        self.postings = dict(self.postings)
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency, in the always-positive form used by Lucene."""
+        count = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - count + 0.5) / (count + 0.5))
+
+    def scores(self, query: str, kinds: Optional[Sequence[str]] = None) -> Dict[int, float]:
+        """BM25 score of every document matching at least one query term, by document number."""
+        scores: Dict[int, float] = defaultdict(float)
+        allowed = set(kinds) if kinds else None
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for number, frequency in postings:
+                if allowed is not None and self.documents[number].kind not in allowed:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[number] / self.average_length)
+                scores[number] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, query: str, limit: int = 5, offset: int = 0,
+               kinds: Optional[Sequence[str]] = None) -> Tuple[List[Tuple[Document, float]], int]:
+        """
+        Ranks the documents matching a query.
+
+        Only the requested page is sorted: the top `offset + limit` matches are
+        selected with a heap.
+
+        Args:
+            query: Free text; documents matching any of its terms are returned
+            limit: Results per page
+            offset: Results to skip, for pagination
+            kinds: Document kinds to search, or None for all
+
+        Returns:
+            The page of (document, score) pairs, best first, and the total number of matches
+        """
+        scores = self.scores(query, kinds)
+        page = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))[offset:]
+        return [(self.documents[number], score) for number, score in page], len(scores)
@@ -0,0 +1,192 @@
+"""
+SVG MCP Startup
+
+Cold-start support for the stdio server, which editors spawn fresh for every
+session: a snapshot file of precomputed tables that a new process loads instead
+of rebuilding them, and the measurements behind `--startup-profile`.
+
+The snapshot is plain JSON tagged with a hash of the sources that produced it;
+a snapshot written by different code is ignored rather than trusted.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SNAPSHOT_FORMAT = 1
+
+
+def snapshot_key(paths: Iterable[str], version: str) -> str:
+    """
+    Hashes the source files whose output a snapshot holds, with a format version.
+
+    Args:
+        paths: The source files
+        version: Bumped when the output changes for reasons other than these sources
+
+    Returns:
+        A hex-encoded SHA-256 digest
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{version}:{sys.version_info[:2]}".encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_snapshot(path: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads a snapshot file.
+
+    Returns:
+        The saved tables, or None if the file is missing, unreadable or was written for another key
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("key") != key:
+        return None
+    return snapshot.get("tables")
+
+
+def write_snapshot(path: str, key: str, tables: Dict[str, Any]) -> None:
+    """Writes a snapshot file atomically, so a starting server never reads a partial one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "tables": tables}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _import_breakdown(script: str) -> Tuple[List[Tuple[str, float]], float, float]:
+    """
+    Imports the server module in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        (package, milliseconds) for every package the module imports directly,
+        slowest first, the module's own body time and the interpreter's startup
+        imports, in milliseconds
+    """
+    directory, module = os.path.split(os.path.abspath(script))
+    module = os.path.splitext(module)[0]
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=directory, capture_output=True, text=True, check=True
+    )
+    packages: Dict[str, float] = defaultdict(float)
+    pending: List[Tuple[str, int]] = []
+    interpreter = body = 0.0
+    # Lines are "import time: <self us> | <cumulative us> | <indented name>", children before parents
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            pending.append((name, int(fields[1])))
+        elif depth == 0:
+            if name == module:
+                for child, cumulative in pending:
+                    packages[child.split(".")[0]] += cumulative / 1000
+                body = int(fields[0].split(":")[1]) / 1000
+            else:
+                interpreter += int(fields[1]) / 1000
+            pending = []
+    return sorted(packages.items(), key=lambda item: -item[1]), body, interpreter
+
+
+def _request(method: str, request_id: Optional[int] = None, **params: Any) -> bytes:
+    message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method, "params": params}
+    if request_id is not None:
+        message["id"] = request_id
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+def _read_response(process: "subprocess.Popen[bytes]", request_id: int) -> Dict[str, Any]:
+    """Reads stdout lines until the response to a request, skipping log notifications."""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited with code {process.wait()} before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def _time_first_responses(script: str, prompt: str) -> Dict[str, float]:
+    """
+    Spawns the server over stdio like an editor does and times its first responses.
+
+    Returns:
+        Milliseconds from spawning the process to the initialize response, the
+        tool list and the first generated SVG
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, script, "--transport", "stdio"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    timings = {}
+    try:
+        process.stdin.write(_request("initialize", 1, protocolVersion="2025-06-18", capabilities={},
+                                     clientInfo={"name": "startup-profile", "version": "1"}))
+        process.stdin.flush()
+        _read_response(process, 1)
+        timings["initialize"] = (time.perf_counter() - started) * 1000
+        process.stdin.write(_request("notifications/initialized") + _request("tools/list", 2))
+        process.stdin.flush()
+        _read_response(process, 2)
+        timings["tools/list"] = (time.perf_counter() - started) * 1000
+        process.stdin.write(_request("tools/call", 3, name="generate_svg_from_prompt", arguments={"prompt": prompt}))
+        process.stdin.flush()
+        _read_response(process, 3)
+        timings["first SVG"] = (time.perf_counter() - started) * 1000
+    finally:
+        process.kill()
+        process.wait()
+    return timings
+
+
+def profile_startup(script: str, runs: int = 3, prompt: str = "A steampunk gear") -> str:
+    """
+    Measures the server's cold start and formats a report.
+
+    The import breakdown comes from one fresh interpreter; the response times
+    are medians over `runs` freshly spawned stdio servers, measured from
+    process creation.
+
+    Args:
+        script: Path of the server script
+        runs: Number of servers to spawn
+        prompt: Prompt of the first generation request
+
+    Returns:
+        The report text
+    """
+    packages, body, interpreter = _import_breakdown(script)
+    lines = ["Import time of a cold process (ms):", f"  {'interpreter startup':<28}{interpreter:9.1f}"]
+    lines += [f"  {package:<28}{ms:9.1f}" for package, ms in packages]
+    lines.append(f"  {'module body':<28}{body:9.1f}")
+    lines.append(f"  {'total':<28}{interpreter + body + sum(ms for _, ms in packages):9.1f}")
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(runs):
+        for step, ms in _time_first_responses(script, prompt).items():
+            samples[step].append(ms)
+    lines.append(f"Time from spawn to response over stdio (ms, median of {runs}):")
+    lines += [f"  {step:<28}{sorted(values)[len(values) // 2]:9.1f}" for step, values in samples.items()]
+    return "\n".join(lines)
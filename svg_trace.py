@@ -0,0 +1,475 @@
+"""
+SVG Tracing
+
+Converts raster images (PNG, or any format Pillow reads) into filled SVG paths:
+
+1. Colors are quantized with k-means, fitted on a fixed sample of the pixels.
+   Pixels that are mostly transparent are left out.
+2. Each color becomes a layer, largest first. A layer's shape is every pixel
+   of its color or of a layer drawn above it, so layers stack without seams.
+3. The outline of each layer is found with marching squares. Every cell of the
+   pixel grid is classified with NumPy and the boundary segments are chained
+   into closed loops by pointer jumping, so no per-pixel Python code runs.
+4. The loops are simplified with Douglas-Peucker, run on all loops at once one
+   level of recursion per round.
+
+Memory stays bounded for large images. Images are first scaled down to a
+working size, and quantization and cell classification run over bands of rows,
+so their temporary arrays are bounded by TRACE_BAND_PIXELS. Only the label of
+each pixel and the boundary segments of one layer are held in full.
+
+Pillow is needed to decode images; it is imported on first use.
+"""
+
+import io
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from svg_geometry import format_rows
+from svg_scene import Path, Rect, Svg, Text, to_svg_string
+
+# Pixels per band of rows processed at once
+TRACE_BAND_PIXELS = 1 << 18
+# Pixels sampled to fit the color clusters
+KMEANS_SAMPLE = 1 << 16
+KMEANS_ITERATIONS = 12
+# Alpha below which a pixel counts as transparent
+ALPHA_THRESHOLD = 128
+MAX_COLORS = 32
+
+# Marching squares: boundary segments per cell code, as (start edge, end edge)
+# pairs. Corner bits are top-left 8, top-right 4, bottom-right 2, bottom-left 1;
+# edges are top 0, right 1, bottom 2, left 3. Segments keep the inside on their
+# right, so every loop is closed. Saddles (5, 10) join their inside corners.
+_CELL_SEGMENTS = {
+    1: ((3, 2),), 2: ((2, 1),), 3: ((3, 1),), 4: ((1, 0),), 5: ((3, 0), (1, 2)), 6: ((2, 0),), 7: ((3, 0),),
+    8: ((0, 3),), 9: ((0, 2),), 10: ((0, 1), (2, 3)), 11: ((0, 1),), 12: ((1, 3),), 13: ((1, 2),), 14: ((2, 3),)
+}
+
+
+def _segment_table(slot: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end edges of each code's first (slot 0) or second (slot 1) segment; -1 when absent."""
+    starts, ends = np.full(16, -1, dtype=np.int64), np.full(16, -1, dtype=np.int64)
+    for code, segments in _CELL_SEGMENTS.items():
+        if slot < len(segments):
+            starts[code], ends[code] = segments[slot]
+    return starts, ends
+
+
+_SEGMENT_TABLES = (_segment_table(0), _segment_table(1))
+
+
+class TracingError(ValueError):
+    """Raised when an image cannot be decoded or traced."""
+
+
+def _band_rows(width: int) -> int:
+    return max(1, TRACE_BAND_PIXELS // max(width, 1))
+
+
+def load_image(data: bytes, max_size: int, max_pixels: int) -> Tuple[np.ndarray, int, int]:
+    """
+    Decodes an image to RGBA pixels, scaled down so its longer side is at most `max_size`.
+
+    Returns:
+        The pixels (height x width x 4, uint8) and the original width and height
+
+    Raises:
+        TracingError: If Pillow is missing, or the image is unreadable or larger than `max_pixels`
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise TracingError("Tracing images needs Pillow, which is not installed (pip install \"Pillow>=9.1\")") from None
+
+    try:
+        image = Image.open(io.BytesIO(data)) # Only reads the header
+        width, height = image.size
+        if width * height > max_pixels:
+            raise TracingError(f"Image too large: {width}x{height} pixels (maximum {max_pixels} pixels)")
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        scale = max_size / max(width, height)
+        if scale < 1:
+            image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))),
+                                 Image.Resampling.BOX, reducing_gap=2.0)
+        pixels = np.asarray(image.convert("RGBA"))
+    except Image.UnidentifiedImageError:
+        raise TracingError("Could not read the image: unknown or unsupported format") from None
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        if isinstance(e, TracingError):
+            raise
+        raise TracingError(f"Could not read the image: {e}") from None
+    return pixels, width, height
+
+
+def _opaque_sample(pixels: np.ndarray) -> np.ndarray:
+    """A fixed, evenly strided sample of the opaque pixels' colors, as float32 RGB."""
+    flat = pixels.reshape(-1, 4)
+    stride = max(1, flat.shape[0] // (KMEANS_SAMPLE * 2))
+    sample = flat[::stride]
+    return sample[sample[:, 3] >= ALPHA_THRESHOLD, :3].astype(np.float32)
+
+
+def _nearest(colors: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the nearest center for each color (squared distance, the colors' own norm left out)."""
+    return np.argmin(np.sum(centers * centers, axis=1) - 2 * colors @ centers.T, axis=1)
+
+
+def fit_palette(sample: np.ndarray, count: int) -> np.ndarray:
+    """
+    Finds up to `count` representative colors with k-means.
+
+    The clusters are fitted on the distinct colors of the sample, weighted by
+    how often each occurs, which is far fewer points than pixels for logos and
+    icons. The first center is the most common color and each next one the
+    color farthest from the centers so far, which picks out flat colors
+    deterministically. Fewer centers are returned when the sample has fewer
+    distinct colors.
+
+    Args:
+        sample: Colors to fit, as float32 RGB rows
+        count: Number of colors wanted
+
+    Returns:
+        The centers, as float32 RGB rows
+    """
+    packed, weights = np.unique(sample.astype(np.int64) @ np.array([1 << 16, 1 << 8, 1]), return_counts=True)
+    colors = np.column_stack((packed >> 16, (packed >> 8) & 255, packed & 255)).astype(np.float32)
+
+    centers = [colors[np.argmax(weights)]]
+    distances = np.sum((colors - centers[0]) ** 2, axis=1)
+    while len(centers) < count:
+        farthest = int(np.argmax(distances))
+        if distances[farthest] < 1.0:
+            break
+        centers.append(colors[farthest])
+        distances = np.minimum(distances, np.sum((colors - colors[farthest]) ** 2, axis=1))
+    centers = np.array(centers, dtype=np.float32)
+
+    for _ in range(KMEANS_ITERATIONS):
+        nearest = _nearest(colors, centers)
+        sizes = np.bincount(nearest, weights=weights, minlength=len(centers))
+        sums = np.stack([np.bincount(nearest, weights=weights * colors[:, channel], minlength=len(centers))
+                         for channel in range(3)], axis=1)
+        moved = np.where(sizes[:, None] > 0, sums / np.maximum(sizes, 1)[:, None], centers).astype(np.float32)
+        if np.allclose(moved, centers, atol=0.5):
+            break
+        centers = moved
+    return centers
+
+
+def _label_layers(pixels: np.ndarray, centers: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Assigns every pixel to its layer, band by band.
+
+    Layers are numbered by decreasing pixel count, so layer 0 is drawn first.
+
+    Returns:
+        The layer of each pixel (-1 for transparent pixels) in an int8 array with
+        a one-pixel border of -1 on every side, the center of each layer and the
+        pixel count of each layer
+    """
+    height, width = pixels.shape[:2]
+    labels = np.full((height + 2, width + 2), -1, dtype=np.int8)
+    counts = np.zeros(len(centers), dtype=np.int64)
+    rows = _band_rows(width)
+    for top in range(0, height, rows):
+        band = pixels[top:top + rows].reshape(-1, 4)
+        nearest = _nearest(band[:, :3].astype(np.float32), centers).astype(np.int8)
+        nearest[band[:, 3] < ALPHA_THRESHOLD] = -1
+        counts += np.bincount(nearest[nearest >= 0], minlength=len(centers))
+        labels[1 + top:1 + top + len(band) // width, 1:-1] = nearest.reshape(-1, width)
+
+    # Renumber by decreasing size; index -1 picks the last entry, which keeps transparent pixels at -1
+    order = np.argsort(-counts, kind="stable")
+    renumber = np.full(len(centers) + 1, -1, dtype=np.int8)
+    renumber[order] = np.arange(len(centers), dtype=np.int8)
+    for top in range(0, height + 2, rows):
+        labels[top:top + rows] = renumber[labels[top:top + rows]]
+    return labels, centers[order], counts[order]
+
+
+def _boundary_segments(labels: np.ndarray, layer: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Marching squares over the shape of `layer`: every pixel of that layer or above.
+
+    Cells are the 2x2 blocks of pixel centers of the bordered label array. The
+    segment end points are the midpoints of the cell edges, numbered
+    2 * (row * columns + column) for horizontal edges and that plus one for
+    vertical ones, so neighboring cells share them.
+
+    Returns:
+        The start and end point of every boundary segment
+    """
+    columns = labels.shape[1]
+    edge_offsets = np.array([0, 3, 2 * columns, 1], dtype=np.int64) # Top, right, bottom, left
+    starts, ends = [], []
+    rows = _band_rows(columns)
+    for top in range(0, labels.shape[0] - 1, rows):
+        inside = (labels[top:top + rows + 1] >= layer).view(np.uint8)
+        codes = (inside[:-1, :-1] << 3) | (inside[:-1, 1:] << 2) | (inside[1:, 1:] << 1) | inside[1:, :-1]
+        cell_rows, cell_columns = np.nonzero((codes != 0) & (codes != 15))
+        codes = codes[cell_rows, cell_columns]
+        base = 2 * ((cell_rows + top).astype(np.int64) * columns + cell_columns)
+        for start_edges, end_edges in _SEGMENT_TABLES:
+            present = start_edges[codes] >= 0
+            starts.append(base[present] + edge_offsets[start_edges[codes[present]]])
+            ends.append(base[present] + edge_offsets[end_edges[codes[present]]])
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def _chain_loops(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Orders boundary segments into closed loops.
+
+    Every point starts exactly one segment and ends one, so "the segment
+    starting where this one ends" is a permutation made of cycles. Each cycle is
+    labeled by its smallest segment index and ranked from it by pointer jumping,
+    in O(log n) vectorized rounds. Segments drop out of the rounds as soon as
+    they are done, so the many short loops of a detailed image cost little
+    next to its long ones.
+
+    Returns:
+        The start points of the segments in loop order, and the offset at which each loop begins
+    """
+    count = len(starts)
+    order = np.argsort(starts, kind="stable")
+    successor = order[np.searchsorted(starts[order], ends)]
+
+    # Label every cycle with its smallest member. Each segment holds the minimum
+    # of the window from itself up to its jump target; when its window and its
+    # target's have the same minimum they overlap, so together they cover the
+    # whole cycle and the segment is done.
+    loop = np.arange(count)
+    jump = successor.copy()
+    active = loop.copy()
+    while len(active):
+        target = jump[active]
+        own, reached = loop[active], loop[target]
+        loop[active] = np.minimum(own, reached)
+        jump[active] = jump[target]
+        active = active[own != reached]
+
+    # Cut every cycle before its smallest member and count the steps to the cut
+    last = np.flatnonzero(loop[successor] == successor)
+    successor[last] = last
+    at_cut = np.zeros(count, dtype=bool)
+    at_cut[last] = True
+    steps = (~at_cut).astype(np.int64)
+    jump = successor
+    active = np.flatnonzero(~at_cut[jump])
+    while len(active):
+        target = jump[active]
+        steps[active] += steps[target]
+        jump[active] = jump[target]
+        active = active[~at_cut[jump[active]]]
+
+    # Sort by loop, then by steps to the cut, descending
+    ordered = np.argsort(loop * count + (count - 1 - steps))
+    offsets = np.flatnonzero(np.diff(loop[ordered], prepend=-1))
+    return starts[ordered], offsets
+
+
+def _point_coordinates(points: np.ndarray, columns: int) -> np.ndarray:
+    """Image coordinates of edge midpoints, numbered as in `_boundary_segments`."""
+    cells, vertical = np.divmod(points, 2)
+    row, column = np.divmod(cells, columns)
+    return np.column_stack((column - 0.5 * vertical, row - 0.5 * (1 - vertical))).astype(np.float64)
+
+
+def _offsets(lengths: np.ndarray) -> np.ndarray:
+    """Index of the first point of each loop, from the loops' lengths."""
+    return (np.cumsum(lengths) - lengths).astype(np.int64)
+
+
+def _loop_neighbors(offsets: np.ndarray, total: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of the previous and next point of every point, wrapping around within its loop."""
+    lengths = np.diff(np.append(offsets, total))
+    first = np.repeat(offsets, lengths)
+    last = first + np.repeat(lengths, lengths) - 1
+    index = np.arange(total)
+    return np.where(index == first, last, index - 1), np.where(index == last, first, index + 1)
+
+
+def _drop_straight_points(xy: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Removes the points in the middle of straight runs, which the pixel grid produces in bulk."""
+    previous, following = _loop_neighbors(offsets, len(xy))
+    before, after = xy - xy[previous], xy[following] - xy
+    turns = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0] != 0
+    lengths = np.add.reduceat(turns.astype(np.int64), offsets) if len(offsets) else np.zeros(0, dtype=np.int64)
+    return xy[turns], _offsets(lengths)
+
+
+def _loop_areas(xy: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Unsigned area of every loop (shoelace formula)."""
+    _, following = _loop_neighbors(offsets, len(xy))
+    cross = xy[:, 0] * xy[following, 1] - xy[following, 0] * xy[:, 1]
+    return np.abs(np.add.reduceat(cross, offsets)) / 2
+
+
+def _select_loops(xy: np.ndarray, offsets: np.ndarray, keep: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.diff(np.append(offsets, len(xy)))
+    xy = xy[np.repeat(keep, lengths)]
+    return xy, _offsets(lengths[keep])
+
+
+def simplify_loops(xy: np.ndarray, offsets: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simplifies closed loops with Douglas-Peucker, all loops at once.
+
+    Each loop is closed by a copy of its first point and split at its first
+    and middle points. Every round then looks at all spans between kept points
+    together: the point farthest from its span's chord is kept when it is more
+    than `tolerance` away, and spans with no such point are done. This is one
+    level of the usual recursion per round, as whole-array operations.
+
+    Args:
+        xy: Points of all loops, one after the other
+        offsets: Index of the first point of each loop
+        tolerance: Largest allowed distance between a dropped point and the simplified outline
+
+    Returns:
+        The kept points and the offset of each loop among them; loops left with
+        fewer than three points are dropped
+    """
+    lengths = np.diff(np.append(offsets, len(xy)))
+    loop_of = np.repeat(np.arange(len(offsets)), lengths)
+    closed_offsets = offsets + np.arange(len(offsets))
+    closed = np.empty((len(xy) + len(offsets), 2))
+    closed[np.arange(len(xy)) + loop_of] = xy
+    closed[closed_offsets + lengths] = xy[offsets]
+
+    kept = np.zeros(len(closed), dtype=bool)
+    kept[closed_offsets] = kept[closed_offsets + lengths // 2] = kept[closed_offsets + lengths] = True
+    open_points = ~kept
+    while True:
+        candidates = np.flatnonzero(open_points)
+        if not len(candidates):
+            break
+        anchors = np.flatnonzero(kept)
+        span = np.searchsorted(anchors, candidates)
+        start, end = closed[anchors[span - 1]], closed[anchors[span]]
+        chord = end - start
+        offset = closed[candidates] - start
+        length = np.hypot(chord[:, 0], chord[:, 1])
+        distance = np.where(
+            length > 0,
+            np.abs(chord[:, 0] * offset[:, 1] - chord[:, 1] * offset[:, 0]) / np.where(length > 0, length, 1),
+            np.hypot(offset[:, 0], offset[:, 1])
+        )
+        groups = np.flatnonzero(np.diff(span, prepend=-1))
+        group_of = np.repeat(np.arange(len(groups)), np.diff(np.append(groups, len(span))))
+        farthest = np.maximum.reduceat(distance, groups)
+        splits = farthest > tolerance
+        chosen = np.flatnonzero((distance == farthest[group_of]) & splits[group_of])
+        chosen = chosen[np.diff(group_of[chosen], prepend=-1) != 0] # The first farthest point per span
+        kept[candidates[chosen]] = True
+        open_points[candidates[chosen]] = False
+        open_points[candidates[~splits[group_of]]] = False
+
+    kept[closed_offsets + lengths] = False # Drop the closing copies again
+    counts = np.add.reduceat(kept.astype(np.int64), closed_offsets) if len(offsets) else np.zeros(0, dtype=np.int64)
+    points = closed[kept]
+    new_offsets = _offsets(counts)
+    return _select_loops(points, new_offsets, counts >= 3)
+
+
+def trace_layer(labels: np.ndarray, layer: int, tolerance: float, min_area: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Traces the outline of one layer's shape.
+
+    Args:
+        labels: The bordered layer array from `_label_layers`
+        layer: The layer to trace; its shape includes every layer above it
+        tolerance: Simplification tolerance, in pixels
+        min_area: Loops enclosing less than this many square pixels are dropped
+
+    Returns:
+        The outline points in image coordinates, and the offset of each loop
+    """
+    starts, ends = _boundary_segments(labels, layer)
+    if not len(starts):
+        return np.zeros((0, 2)), np.zeros(0, dtype=np.int64)
+    points, offsets = _chain_loops(starts, ends)
+    xy = _point_coordinates(points, labels.shape[1])
+    xy, offsets = _drop_straight_points(xy, offsets)
+    xy, offsets = _select_loops(xy, offsets, _loop_areas(xy, offsets) >= max(min_area, 1e-9))
+    if not len(offsets):
+        return xy, offsets
+    return simplify_loops(xy, offsets, tolerance)
+
+
+def _path_data(xy: np.ndarray, offsets: np.ndarray) -> str:
+    """Path data with one subpath per loop; filled subpaths close themselves, so no "Z" is needed."""
+    prefixes = np.empty(xy.shape, dtype=np.uint8)
+    prefixes[:, 0], prefixes[:, 1] = ord(" "), ord(",")
+    prefixes[offsets, 0] = ord("M")
+    return format_rows(xy, prefixes)
+
+
+def _hex_color(rgb: np.ndarray) -> str:
+    red, green, blue = (int(round(float(channel))) for channel in rgb)
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def trace_image(data: bytes, colors: int = 8, tolerance: float = 1.0, min_area: float = 4.0,
+                max_size: int = 1024, max_pixels: int = 25_000_000, title: str = "Traced image") -> Dict[str, Any]:
+    """
+    Traces an image into an SVG of filled paths, one per color.
+
+    The document has the image's original size; it is traced at a working size
+    of at most `max_size` pixels on the longer side and scaled back up. Layers
+    are drawn largest first; on an opaque image the largest one becomes the
+    background rectangle.
+
+    Args:
+        data: The encoded image (PNG, or any format Pillow reads)
+        colors: Number of colors to reduce the image to (1-32)
+        tolerance: Simplification tolerance, in pixels of the working size
+        min_area: Smallest loop kept, in square pixels of the working size
+        max_size: Longer side of the working size
+        max_pixels: Largest accepted image, in pixels
+        title: The document title
+
+    Returns:
+        A dictionary with the SVG code, the original and traced sizes, the
+        colors from bottom to top, and the number of shapes (outlines and holes) drawn
+
+    Raises:
+        TracingError: If the image cannot be decoded or has no opaque pixels
+    """
+    pixels, width, height = load_image(data, max_size, max_pixels)
+    traced_height, traced_width = pixels.shape[:2]
+    sample = _opaque_sample(pixels)
+    if not len(sample):
+        raise TracingError("The image has no opaque pixels to trace")
+    centers = fit_palette(sample, max(1, min(colors, MAX_COLORS)))
+    labels, centers, counts = _label_layers(pixels, centers)
+    layer_colors = [_hex_color(center) for center in centers]
+    opaque = not (labels[1:-1, 1:-1] < 0).any()
+    scale = np.array([width / traced_width, height / traced_height])
+
+    nodes: List[Any] = []
+    if opaque:
+        nodes.append(Rect(width=width, height=height, fill=layer_colors[0]))
+    loops = 0
+    for layer in range(1 if opaque else 0, len(layer_colors)):
+        if not counts[layer]:
+            continue
+        xy, offsets = trace_layer(labels, layer, tolerance, min_area)
+        if len(offsets):
+            nodes.append(Path(_path_data(xy * scale, offsets), fill=layer_colors[layer], fill_rule="evenodd"))
+            loops += len(offsets)
+
+    document = Svg(width, height, Text(title, tag="title"), *nodes)
+    return {
+        "svg_code": to_svg_string(document),
+        "width": width,
+        "height": height,
+        "traced_width": traced_width,
+        "traced_height": traced_height,
+        "colors": [color for color, count in zip(layer_colors, counts.tolist()) if count],
+        "shapes": loops
+    }
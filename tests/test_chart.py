@@ -0,0 +1,97 @@
+"""
+Tests for chart rendering (svg_chart.py) and the generate_chart_svg tool.
+"""
+
+import asyncio
+import math
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+from fastmcp import Client
+
+import svg_mcp_server as server
+from svg_chart import CHART_TYPES, nice_ticks, parse_chart_data, render_chart
+
+PALETTE = server.COLOR_PALETTES["general"]
+AXIS_CHARTS = ("bar", "line", "area", "scatter")
+_COORDINATE = re.compile(r'\b(?:x|y|cx|cy|width|height)="([^"]*)"')
+
+
+def _call_chart(**arguments):
+    async def call():
+        async with Client(server.mcp) as client:
+            return (await client.call_tool("generate_chart_svg", arguments)).structured_content
+    return asyncio.run(call())
+
+
+def _assert_drawable(svg_code):
+    ET.fromstring(svg_code)
+    assert not re.search(r"nan|inf", svg_code, re.IGNORECASE)
+    assert all(math.isfinite(float(value)) for value in _COORDINATE.findall(svg_code))
+
+
+@pytest.mark.parametrize("data", [[], "", "label,value\n"])
+def test_empty_data_is_rejected(data):
+    with pytest.raises(ValueError):
+        parse_chart_data(data)
+
+
+@pytest.mark.parametrize("chart_type", CHART_TYPES)
+def test_constant_series(chart_type):
+    result = render_chart(chart_type, [5, 5, 5, 5], PALETTE)
+    assert result["drawn_points"] == 4
+    _assert_drawable(result["svg_code"])
+
+
+@pytest.mark.parametrize("chart_type", CHART_TYPES)
+def test_non_finite_points_are_dropped(chart_type):
+    result = render_chart(chart_type, [1, float("nan"), 3, float("inf"), 2], PALETTE)
+    assert (result["points"], result["drawn_points"]) == (3, 3)
+    _assert_drawable(result["svg_code"])
+
+
+def test_only_non_finite_points_are_rejected():
+    with pytest.raises(ValueError):
+        parse_chart_data([float("nan"), float("-inf")])
+
+
+@pytest.mark.parametrize("chart_type", AXIS_CHARTS)
+@pytest.mark.parametrize("data", [[1e308, -1e308], [[1e308, 1], [-1e308, 2]], [0, 1e-300]])
+def test_extreme_ranges_are_rejected(chart_type, data):
+    with pytest.raises(ValueError):
+        render_chart(chart_type, data, PALETTE)
+
+
+@pytest.mark.parametrize("chart_type", AXIS_CHARTS)
+@pytest.mark.parametrize("data", [[1e20, 3e20], [-1e150, 1e150], [1e-9, 3e-9]])
+def test_large_and_small_ranges_render(chart_type, data):
+    _assert_drawable(render_chart(chart_type, data, PALETTE)["svg_code"])
+
+
+def test_nice_ticks_cover_the_range_in_round_steps():
+    ticks = nice_ticks(3, 97)
+    assert ticks[0] <= 3 and ticks[-1] >= 97
+    step = ticks[1] - ticks[0]
+    assert step in (10, 20, 25)
+    assert list(nice_ticks(0, 3, min_step=1.0)) == [0, 1, 2, 3]
+
+
+def test_extreme_range_is_a_tool_error():
+    result = _call_chart(chart_type="line", data=[1e308, -1e308])
+    assert result["success"] is False
+    assert "range" in result["error"] or "within" in result["error"]
+
+
+@pytest.mark.parametrize("chart_type", CHART_TYPES)
+@pytest.mark.parametrize("size", [(50, 50), (100, 60), (2000, 50)])
+def test_small_canvases_stay_on_canvas(chart_type, size):
+    width, height = size
+    data = [[i % 97, (i * 37) % 101] for i in range(5000)] if chart_type == "scatter" else [3, 1, 4, 1, 5]
+    result = render_chart(chart_type, data, PALETTE, width, height)
+    _assert_drawable(result["svg_code"])
+    root = ET.fromstring(result["svg_code"])
+    for element in root.iter():
+        for name, limit in (("x", width), ("cx", width), ("y", height), ("cy", height)):
+            if element.get(name) is not None and element.tag.endswith(("rect", "circle")):
+                assert 0 <= float(element.get(name)) <= limit
@@ -0,0 +1,93 @@
+"""
+Tests for prompt color parsing and role binding (svg_colors.py).
+"""
+
+import pytest
+
+from svg_colors import ROLE_WINDOW, find_color_roles, parse_color
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("#abc", "#aabbcc"),
+    ("#aabbcc", "#aabbcc"),
+    ("#abcf", "#aabbcc"),
+    ("#aabbccff", "#aabbcc"),
+    ("#aabbcc80", "rgba(170,187,204,0.502)"),
+    ("#0000", "rgba(0,0,0,0)"),
+    ("#abcde", None),
+    ("#gggggg", None),
+])
+def test_hex_literals(token, expected):
+    assert parse_color(token) == expected
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("rgb(255, 0, 0)", "#ff0000"),
+    ("rgb(100% 50% 0%)", "#ff8000"),
+    ("rgba(10,20,30,0.25)", "rgba(10,20,30,0.25)"),
+    ("rgb(10 20 30 / 50%)", "rgba(10,20,30,0.5)"),
+    ("rgb(300, -5, 0)", "#ff0000"),
+    ("hsl(120, 100%, 50%)", "#00ff00"),
+    ("hsl(0.5turn 100% 50%)", "#00ffff"),
+    ("hsla(240,100%,50%,1)", "#0000ff"),
+    ("hsl(240 100% 50% / .5)", "rgba(0,0,255,0.5)"),
+    ("rgb(1, 2)", None),
+    ("hsl(red, 1%, 2%)", None),
+])
+def test_color_functions(token, expected):
+    assert parse_color(token) == expected
+
+
+def test_named_colors():
+    assert parse_color("rebeccapurple") == "#663399"
+    assert parse_color("notacolor") is None
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("a light sea green star", {"primary": "#20b2aa"}),
+    ("an orange red sunset", {"primary": "#ff4500"}),
+    ("a dark slate gray background", {"background": "#2f4f4f"}),
+    ("a lightseagreen star", {"primary": "#20b2aa"}),
+])
+def test_multi_word_names(prompt, expected):
+    assert find_color_roles(prompt) == expected
+
+
+def test_keyword_on_either_side():
+    assert find_color_roles("a blue background") == {"background": "#0000ff"}
+    assert find_color_roles("background in blue") == {"background": "#0000ff"}
+    assert find_color_roles("background: #1e90ff") == {"background": "#1e90ff"}
+
+
+def test_role_window():
+    filler = " ".join(["x"] * (ROLE_WINDOW - 1))
+    assert find_color_roles(f"red {filler} background") == {"background": "#ff0000"}
+    # One word further and the color is no longer bound to the keyword
+    assert find_color_roles(f"red {filler} x background") == {"primary": "#ff0000"}
+
+
+def test_clause_boundaries():
+    assert find_color_roles("a red star, background") == {"primary": "#ff0000"}
+    assert find_color_roles("red; accent") == {"primary": "#ff0000"}
+    assert find_color_roles("a red star. blue accent") == {"primary": "#ff0000", "accent": "#0000ff"}
+
+
+def test_closest_pairs_bind_first():
+    roles = find_color_roles("blue background with red accent and a green star")
+    assert roles == {"background": "#0000ff", "accent": "#ff0000", "primary": "#008000"}
+
+
+def test_fallback_to_primary():
+    assert find_color_roles("a purple and gold crown") == {"primary": "#800080"}
+    assert find_color_roles("a gold crown", default_role="accent") == {"accent": "#ffd700"}
+    # An explicit primary is not overridden by an unbound color
+    assert find_color_roles("teal primary and a pink star") == {"primary": "#008080"}
+
+
+def test_literals_in_prompts():
+    roles = find_color_roles("a star with a #ff000080 background and hsl(240 100% 50% / .5) accent")
+    assert roles == {"background": "rgba(255,0,0,0.502)", "accent": "rgba(0,0,255,0.5)"}
+
+
+def test_no_colors():
+    assert find_color_roles("a star on a background") == {}
@@ -0,0 +1,75 @@
+"""
+Tests for sharing repeated geometry through <defs> and <use> (svg_dedup.py).
+"""
+
+import asyncio
+import copy
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+import pytest
+from fastmcp import Client
+
+import svg_mcp_server as server
+from svg_dedup import deduplicate
+from svg_scene import to_svg_string
+
+SVG = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# Prompts whose objects repeat shapes, alone and next to other objects in one scene
+PROMPTS = (
+    "a cyberpunk city at night",
+    "a cyberpunk city with a neon heart",
+    "a retro heart and a fantasy star",
+    "a gatsby art deco style poster",
+)
+
+
+def _generate(prompt: str, **arguments) -> str:
+    async def call() -> str:
+        async with Client(server.mcp) as client:
+            result = await client.call_tool("generate_svg_from_prompt", {"prompt": prompt, **arguments})
+            return result.structured_content["svg_code"]
+    return asyncio.run(call())
+
+
+def test_city_is_smaller_with_dedup():
+    palette = server.COLOR_PALETTES["cyberpunk"]
+    drawing = server._render_city(palette, "cyberpunk")
+    plain = to_svg_string(drawing)
+    shared = to_svg_string(deduplicate(copy.deepcopy(drawing), "city-"))
+    assert "<use" in shared
+    assert len(shared.encode("utf-8")) < len(plain.encode("utf-8"))
+
+
+def test_dedup_keeps_unique_shapes():
+    palette = server.COLOR_PALETTES["cyberpunk"]
+    drawing = server._render_city(palette, "cyberpunk")
+    shared = to_svg_string(deduplicate(copy.deepcopy(drawing), "city-", min_count=10 ** 6))
+    assert shared == to_svg_string(drawing)
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_every_use_resolves_to_one_definition(prompt):
+    svg_code = _generate(prompt)
+    root = ET.fromstring(svg_code)
+    ids = Counter(element.get("id") for element in root.iter() if element.get("id"))
+    assert all(count == 1 for count in ids.values()), [name for name, count in ids.items() if count > 1]
+
+    uses = [element for element in root.iter(f"{SVG}use")]
+    assert uses, "expected repeated shapes to be shared"
+    for use in uses:
+        href = use.get("href") or use.get(XLINK_HREF)
+        assert href and href.startswith("#")
+        assert ids[href[1:]] == 1, href
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_url_references_resolve(prompt):
+    svg_code = _generate(prompt, optimize=True)
+    root = ET.fromstring(svg_code)
+    ids = {element.get("id") for element in root.iter() if element.get("id")}
+    for reference in re.findall(r'(?:href="|url\(#)#?([^")]+)', svg_code):
+        assert reference in ids, reference
@@ -0,0 +1,75 @@
+"""
+Loopback tests for serving over streamable HTTP and SSE (serve_http in svg_mcp_server.py).
+"""
+
+import asyncio
+import os
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+
+import pytest
+from fastmcp import Client
+
+from conftest import ROOT
+
+SERVER_SCRIPT = os.path.join(ROOT, "svg_mcp_server.py")
+# uvicorn's startup line, which carries the port it bound when asked for port 0
+_LISTENING = re.compile(r"Uvicorn running on http://127\.0\.0\.1:(\d+)")
+_PATHS = {"http": "/mcp", "sse": "/sse"}
+
+
+def _start_server(transport: str):
+    """Spawns the server on an ephemeral port; returns the process, the port, its output reader and the lines read so far."""
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--transport", transport, "--host", "127.0.0.1", "--port", "0",
+         "--shutdown-timeout", "5"],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    lines: "queue.Queue[str]" = queue.Queue()
+    reader = threading.Thread(target=lambda: [lines.put(line) for line in process.stdout], daemon=True)
+    reader.start()
+    log = []
+    while True:
+        try:
+            line = lines.get(timeout=60)
+        except queue.Empty:
+            process.kill()
+            pytest.fail("The server did not start listening:\n" + "".join(log))
+        log.append(line)
+        match = _LISTENING.search(line)
+        if match:
+            return process, int(match.group(1)), reader, lines, log
+
+
+@pytest.mark.parametrize("transport", ["http", "sse"])
+def test_loopback_call_and_clean_shutdown(transport):
+    process, port, reader, lines, log = _start_server(transport)
+    try:
+        async def call():
+            async with Client(f"http://127.0.0.1:{port}{_PATHS[transport]}") as client:
+                return await client.call_tool("generate_svg_from_prompt", {"prompt": "a red star"})
+
+        result = asyncio.run(call()).structured_content
+        assert result["success"] is True
+        assert result["svg_code"].startswith("<svg")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            returncode = process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            raise
+
+    reader.join(timeout=10)
+    while not lines.empty():
+        log.append(lines.get())
+    output = "".join(log)
+    # Recent uvicorn versions re-raise the signal once shut down, so the exit reports it
+    assert returncode in (0, -signal.SIGTERM), output
+    assert "Application shutdown complete" in output
+    assert "Finished server process" in output
+    assert "Traceback" not in output
@@ -0,0 +1,174 @@
+"""
+Tests for the built-in SVG optimizer (svg_optimizer.py).
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from svg_optimizer import optimize_path_data, optimize_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+_COMMAND = re.compile(r"[\s,]*([MmZzLlHhVvCcSsQqTtAa])")
+_NUMBER = re.compile(r"[\s,]*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+_FLAG = re.compile(r"[\s,]*([01])")
+_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+def resolve(d):
+    """
+    Resolves path data to absolute segments, independently of the optimizer.
+
+    H and V become L with both coordinates, so a line reads the same whichever
+    form it was written in. Arcs keep their radii, rotation and flags.
+    """
+    segments = []
+    x = y = start_x = start_y = 0.0
+    pos, end, command = 0, len(d.rstrip(" ,")), None
+    while pos < end:
+        match = _COMMAND.match(d, pos)
+        if match:
+            command, pos = match.group(1), match.end()
+        elif command in "Mm":
+            command = "L" if command == "M" else "l"
+        upper, relative = command.upper(), command.islower()
+        params = []
+        for index in range(_ARITY[upper]):
+            number = (_FLAG if upper == "A" and index in (3, 4) else _NUMBER).match(d, pos)
+            params.append(float(number.group(1)))
+            pos = number.end()
+        if upper == "Z":
+            x, y = start_x, start_y
+            segments.append(("Z", ()))
+            continue
+        if upper == "H":
+            params, upper = [params[0] + (x if relative else 0), y], "L"
+        elif upper == "V":
+            params, upper = [x, params[0] + (y if relative else 0)], "L"
+        elif upper == "A":
+            if relative:
+                params[5:] = [params[5] + x, params[6] + y]
+        elif relative:
+            params = [value + (x if i % 2 == 0 else y) for i, value in enumerate(params)]
+        x, y = params[-2], params[-1]
+        if upper == "M":
+            start_x, start_y = x, y
+        segments.append((upper, tuple(params)))
+    return segments
+
+
+def assert_same_path(original, optimized, tolerance):
+    expected, actual = resolve(original), resolve(optimized)
+    assert [command for command, _ in actual] == [command for command, _ in expected], optimized
+    for (_, want), (_, got) in zip(expected, actual):
+        assert got == pytest.approx(want, abs=tolerance), optimized
+
+
+PATHS = [
+    # Arcs, absolute and relative, with flags written without separators
+    "M10 10 A5 5 0 0 1 20 10 a5 5 30 1110 10",
+    "M0 0a25 25 0 1 0 50 0a25 25 0 1 0-50 0z",
+    # Smooth curves right after a close path start from the subpath's first point
+    "M10 10 C20 0 30 0 40 10 Z S60 20 70 10 z T90 30",
+    "M10 10 Q20 0 30 10 Z t20 0 s10 10 20 0",
+    # Relative moveto after closepath, and implicit linetos after movetos
+    "m10 10 l10 0 0 10 z m5 5 10 0 0 10 z m-20 -20 h5 v5",
+    "M100 100 L100 200 L200 200 L200 100 Z M150 150 H175 V175 H150 Z",
+    # Exponent notation, signs and dots as separators
+    "M1e2 2E1 L1.5e1-3e-1 l-.5.5.25-.25 C1e1,2e1 3e1,4e1 5e1,6e1",
+    "M.5.5L-.5-.5l+1+1",
+]
+
+
+@pytest.mark.parametrize("d", PATHS)
+def test_path_round_trip(d):
+    assert_same_path(d, optimize_path_data(d, precision=3), tolerance=1e-9)
+
+
+@pytest.mark.parametrize("d", PATHS)
+def test_path_round_trip_at_low_precision(d):
+    # Positions are rounded once, absolutely; relative offsets never accumulate error
+    assert_same_path(d, optimize_path_data(d, precision=1), tolerance=0.05 + 1e-9)
+
+
+def test_path_uses_axis_lines_and_drops_repeated_letters():
+    assert optimize_path_data("M0 0 L10 0 L10 10 L20 20 L30 30") == "M0 0H10V10L20 20 30 30"
+
+
+def test_malformed_path_is_left_alone():
+    assert optimize_path_data("M10 10 L") == "M10 10 L"
+
+
+def _optimize(body, **options):
+    document = f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">{body}</svg>'
+    return optimize_svg(document, **options)
+
+
+def test_unused_defs_are_removed_and_referenced_ones_kept():
+    result = _optimize(
+        '<defs>'
+        '<style>.a{fill:red}</style>'
+        '<linearGradient id="used"><stop offset="0" stop-color="red"/></linearGradient>'
+        '<linearGradient id="unused"><stop offset="0" stop-color="blue"/></linearGradient>'
+        '<linearGradient id="base"><stop offset="1" stop-color="green"/></linearGradient>'
+        '<linearGradient id="orphan" xlink:href="#base"/>'
+        '<path id="shape" d="M0 0H10"/>'
+        '</defs>'
+        '<rect class="a" fill="url(#used)" width="1" height="1"/><use href="#shape"/>'
+    )
+    root = ET.fromstring(result["svg_code"])
+    ids = {element.get("id") for element in root.iter() if element.get("id")}
+    assert ids == {"used", "shape"}
+    # Definitions only referenced by removed definitions go too
+    assert result["removed_defs"] == ["unused", "base", "orphan"]
+    assert root.find(f"{SVG}defs/{SVG}style").text == ".a{fill:red}"
+
+
+def test_defs_are_kept_in_documents_with_scripts():
+    result = _optimize('<defs><linearGradient id="g"/></defs><script>document.getElementById("g")</script>')
+    assert result["removed_defs"] == []
+    assert 'id="g"' in result["svg_code"]
+
+
+def test_empty_defs_are_removed():
+    result = _optimize('<defs><filter id="f"/></defs><rect width="1" height="1"/>')
+    assert "defs" not in result["svg_code"]
+
+
+def test_low_precision_keeps_opacities_and_filter_parameters():
+    result = _optimize(
+        '<filter id="f"><feGaussianBlur stdDeviation=".4"/><feTurbulence baseFrequency=".05"/></filter>'
+        '<linearGradient id="g"><stop offset=".25" stop-opacity=".125"/></linearGradient>'
+        '<rect x="1.26" width="10.4" height="3" fill="url(#g)" fill-opacity="0.3" opacity=".7" filter="url(#f)"/>',
+        precision=0
+    )
+    root = ET.fromstring(result["svg_code"])
+    rect = root.find(f"{SVG}rect")
+    assert (rect.get("x"), rect.get("width")) == ("1", "10")
+    assert (rect.get("fill-opacity"), rect.get("opacity")) == (".3", ".7")
+    assert root.find(f"{SVG}filter/{SVG}feGaussianBlur").get("stdDeviation") == ".4"
+    assert root.find(f"{SVG}filter/{SVG}feTurbulence").get("baseFrequency") == ".05"
+    stop = root.find(f"{SVG}linearGradient/{SVG}stop")
+    assert (stop.get("offset"), stop.get("stop-opacity")) == (".25", ".125")
+
+
+def test_transforms_keep_extra_precision():
+    result = _optimize('<g transform="translate(10.123456 3) scale(0.0167)"><rect width="1.234" height="1"/></g>')
+    assert 'transform="translate(10.12346 3) scale(.0167)"' in result["svg_code"]
+    assert 'width="1.23"' in result["svg_code"]
+
+
+def test_shared_attributes_are_hoisted_onto_the_group():
+    result = _optimize('<g><rect fill="red" stroke="#000" width="1" height="1"/>'
+                       '<circle fill="red" stroke="#fff" r="1"/></g>')
+    group = ET.fromstring(result["svg_code"]).find(f"{SVG}g")
+    assert group.get("fill") == "red"
+    assert [child.get("fill") for child in group] == [None, None]
+    assert [child.get("stroke") for child in group] == ["#000", "#fff"]
+
+
+def test_invalid_markup_raises_value_error():
+    with pytest.raises(ValueError):
+        optimize_svg("<svg><rect></svg>")
@@ -0,0 +1,121 @@
+"""
+Tests for the BM25 knowledge index (svg_search.py).
+"""
+
+import math
+
+import pytest
+
+from svg_search import BM25_B, BM25_K1, TITLE_WEIGHT, Document, SearchIndex, tokenize
+
+
+def _document(id, kind, title, text):
+    return Document(id, kind, title, text, {"id": id})
+
+
+CORPUS = [
+    _document("practice:0", "practice", "Gradients", "Smooth color gradient fills for backgrounds"),
+    _document("practice:1", "practice", "Icons", "Keep icon strokes consistent across a set of icons"),
+    _document("practice:2", "practice", "Accessibility", "Add a title element so an icon is announced"),
+    _document("example:0", "example", "Star", "A star icon with a gradient fill and a long descriptive body text"),
+    _document("example:1", "example", "Categories", "Browse the example categories"),
+    _document("example:2", "example", "Badge", "A round badge with a gradient ring"),
+]
+
+
+def _reference_scores(documents, query):
+    """Plain BM25 over the documents, recomputed from scratch for every term."""
+    bags = []
+    for document in documents:
+        terms = tokenize(document.text) + tokenize(document.title) * TITLE_WEIGHT
+        bags.append(terms)
+    average = sum(map(len, bags)) / len(bags)
+    scores = {}
+    for term in set(tokenize(query)):
+        matching = sum(term in bag for bag in bags)
+        idf = math.log(1 + (len(bags) - matching + 0.5) / (matching + 0.5))
+        for number, bag in enumerate(bags):
+            frequency = bag.count(term)
+            if frequency:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * len(bag) / average)
+                scores[number] = scores.get(number, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+    return scores
+
+
+def _ids(results):
+    return [document.id for document, _ in results]
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("The Icons, categories AND glass stars") == ["icon", "category", "glass", "star"]
+    # Short words are left alone
+    assert tokenize("gas ties") == ["gas", "tie"]
+
+
+@pytest.mark.parametrize("query", ["gradient", "icon", "gradient icon", "categories", "color badge"])
+def test_scores_match_reference_bm25(query):
+    index = SearchIndex(CORPUS)
+    expected = _reference_scores(CORPUS, query)
+    assert index.scores(query).keys() == expected.keys()
+    for number, score in index.scores(query).items():
+        assert score == pytest.approx(expected[number])
+
+
+def test_ranking_order():
+    index = SearchIndex(CORPUS)
+    results, total = index.search("gradient", limit=10)
+    # Title match first, then the short body before the long one
+    assert _ids(results) == ["practice:0", "example:2", "example:0"]
+    assert total == 3
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_plurals_match_singulars():
+    index = SearchIndex(CORPUS)
+    assert _ids(index.search("icons", limit=10)[0]) == _ids(index.search("icon", limit=10)[0])
+    assert _ids(index.search("category", limit=10)[0]) == ["example:1"]
+
+
+def test_title_match_outranks_body_match():
+    documents = [
+        _document("body", "practice", "Shapes", "Prefer a viewbox over fixed sizes"),
+        _document("title", "practice", "Viewbox", "Prefer shapes over fixed sizes"),
+    ]
+    results, _ = SearchIndex(documents).search("viewbox")
+    assert _ids(results) == ["title", "body"]
+
+
+def test_kind_filter():
+    index = SearchIndex(CORPUS)
+    results, total = index.search("gradient", limit=10, kinds=["example"])
+    assert _ids(results) == ["example:2", "example:0"]
+    assert total == 2
+    assert index.kinds == ("practice", "example")
+
+
+def test_unknown_terms_match_nothing():
+    index = SearchIndex(CORPUS)
+    assert index.search("zebra the and") == ([], 0)
+    assert SearchIndex([]).search("gradient") == ([], 0)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_pages_do_not_overlap(limit):
+    # Identical documents tie, so only document order separates them across pages
+    documents = [_document(f"star:{number}", "example", "Star", "A star") for number in range(5)]
+    documents += [_document(f"sky:{number}", "example", "Sky", "A sky with a star " + "x " * number)
+                  for number in range(6)]
+    index = SearchIndex(documents)
+    everything, total = index.search("star", limit=len(documents))
+    assert total == len(documents)
+
+    paged = []
+    for offset in range(0, total, limit):
+        page, page_total = index.search("star", limit=limit, offset=offset)
+        assert page_total == total
+        assert len(page) == min(limit, total - offset)
+        paged.extend(page)
+    assert _ids(paged) == _ids(everything)
+    assert len(set(_ids(paged))) == total
+    assert index.search("star", limit=limit, offset=total) == ([], total)